@@ -0,0 +1,37 @@
+import random
+import timeit
+from holmes_extractor.topic_matching import ActivationScorer
+
+# Compares the array-based topic scoring used by Holmes with the iterative algorithm it
+# replaces on randomly generated documents of increasing size. Each row gives the number of
+# matches, the number of distinct phraselets and the number of words the matches are spread
+# over, followed by the best time of each method and whether they returned identical scores.
+
+MAXIMUM_ACTIVATION_DISTANCE = 75
+REPEATS = 5
+
+if __name__ in ('__main__', 'benchmark_activation_scoring'):
+
+    random.seed(1)
+    activation_scorer = ActivationScorer(MAXIMUM_ACTIVATION_DISTANCE)
+    print('{:>8} {:>10} {:>8} {:>12} {:>12} {:>8} {:>10}'.format(
+        'matches', 'phraselets', 'words', 'iterative', 'array', 'speedup', 'identical'))
+    for number_of_matches, number_of_phraselets, number_of_words in (
+            (40, 10, 400), (200, 30, 2000), (2000, 150, 20000), (5000, 300, 20000),
+            (20000, 500, 100000)):
+        positions = sorted(random.randrange(number_of_words) for _ in range(number_of_matches))
+        phraselet_labels = ['phraselet {}'.format(random.randrange(number_of_phraselets))
+            for _ in range(number_of_matches)]
+        scores = [random.random() * 300 for _ in range(number_of_matches)]
+        iterative_time = min(timeit.repeat(
+            lambda: activation_scorer.get_topic_scores_iteratively(
+                positions, phraselet_labels, scores), number=1, repeat=REPEATS))
+        array_time = min(timeit.repeat(
+            lambda: activation_scorer.get_topic_scores(
+                positions, phraselet_labels, scores), number=1, repeat=REPEATS))
+        identical = activation_scorer.get_topic_scores_iteratively(
+            positions, phraselet_labels, scores) == activation_scorer.get_topic_scores(
+            positions, phraselet_labels, scores)
+        print('{:>8} {:>10} {:>8} {:>11.4f}s {:>11.4f}s {:>7.1f}x {:>10}'.format(
+            number_of_matches, number_of_phraselets, number_of_words, iterative_time,
+            array_time, iterative_time / array_time, str(identical)))
@@ -1,5 +1,11 @@
 from .about import __version__
 from .manager import Manager
+from .async_manager import AsyncManager
 from .ontology import Ontology
+from .placement import (
+    PlacementPolicy,
+    RoundRobinPlacementPolicy,
+    BalancedPlacementPolicy,
+)
 import os
 os.environ["TOKENIZERS_PARALLELISM"] = "True"
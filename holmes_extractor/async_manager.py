@@ -0,0 +1,223 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import asyncio
+from spacy.tokens import Doc
+from .parsing import SearchPhrase
+
+
+class AsyncManager:
+    """An *asyncio* interface to a *Manager* that is obtained using *Manager.aio* rather than
+    being instantiated directly. Its methods are coroutines that are backed by the same
+    worker processes as the equivalent *Manager* methods and that wait for replies from the
+    worker processes without blocking a thread, so that a single event loop can have many
+    requests in flight at once.
+
+    Cancelling a coroutine that only reads from the worker processes, e.g. *match()* or
+    *topic_match_documents_against()*, stops the caller waiting and any replies that arrive
+    later are discarded. Cancelling a coroutine that changes the documents or search phrases
+    stops the caller waiting, but the change itself is completed in the background so that
+    the *Manager* remains consistent with its worker processes.
+
+    Parameters:
+
+    manager -- the *Manager* whose worker processes are used.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def _run(self, method: Callable, *args, **kwargs) -> Any:
+        return await self.manager._run_operation_async(
+            method.__wrapped__(self.manager, *args, **kwargs)
+        )
+
+    async def _run_to_completion(self, method: Callable, *args, **kwargs) -> Any:
+        return await asyncio.shield(self._run(method, *args, **kwargs))
+
+    async def register_serialized_documents(
+        self, document_dictionary: Dict[str, bytes]
+    ) -> None:
+        """See *Manager.register_serialized_documents()*."""
+        await self._run_to_completion(
+            self.manager.register_serialized_documents, document_dictionary
+        )
+
+    async def register_serialized_document(
+        self, serialized_document: bytes, label: str
+    ) -> None:
+        """See *Manager.register_serialized_document()*."""
+        await self.register_serialized_documents({label: serialized_document})
+
+    async def parse_and_register_document(
+        self, document_text: str, label: str = ""
+    ) -> None:
+        """See *Manager.parse_and_register_document()*. Parsing takes place on the event
+        loop's default executor."""
+        doc = await asyncio.get_running_loop().run_in_executor(
+            None, self.manager.nlp, document_text
+        )
+        await self.register_serialized_document(doc.to_bytes(), label)
+
+    async def parse_and_register_documents(
+        self,
+        documents: Union[Dict[str, str], Iterable[Tuple[str, str]]],
+        batch_size: int = 100,
+    ) -> None:
+        """See *Manager.parse_and_register_documents()*."""
+        await self._run_to_completion(
+            self.manager.parse_and_register_documents, documents, batch_size
+        )
+
+    async def remove_document(self, label: str) -> None:
+        """See *Manager.remove_document()*."""
+        await self.remove_documents([label])
+
+    async def remove_documents(self, labels: List[str]) -> None:
+        """See *Manager.remove_documents()*."""
+        await self._run_to_completion(self.manager.remove_documents, labels)
+
+    async def remove_all_documents(self, labels_starting: str = None) -> None:
+        """See *Manager.remove_all_documents()*."""
+        await self._run_to_completion(
+            self.manager.remove_all_documents, labels_starting
+        )
+
+    async def rebalance_documents(self, maximum_skew: float = 1.25) -> int:
+        """See *Manager.rebalance_documents()*."""
+        return await self._run_to_completion(
+            self.manager.rebalance_documents, maximum_skew
+        )
+
+    async def serialize_document(self, label: str) -> Optional[bytes]:
+        """See *Manager.serialize_document()*."""
+        return await self._run(self.manager.serialize_document, label)
+
+    async def get_document(self, label: str = "") -> Optional[Doc]:
+        """See *Manager.get_document()*."""
+        serialized_document = await self.serialize_document(label)
+        return (
+            None
+            if serialized_document is None
+            else Doc(self.manager.nlp.vocab).from_bytes(serialized_document)
+        )
+
+    async def register_search_phrase(
+        self, search_phrase_text: str, label: str = None
+    ) -> SearchPhrase:
+        """See *Manager.register_search_phrase()*."""
+        return await self._run_to_completion(
+            self.manager.register_search_phrase, search_phrase_text, label
+        )
+
+    async def remove_all_search_phrases_with_label(self, label: str) -> None:
+        """See *Manager.remove_all_search_phrases_with_label()*."""
+        await self._run_to_completion(
+            self.manager.remove_all_search_phrases_with_label, label
+        )
+
+    async def remove_all_search_phrases(self) -> None:
+        """See *Manager.remove_all_search_phrases()*."""
+        await self._run_to_completion(self.manager.remove_all_search_phrases)
+
+    async def get_match_plans(self) -> List[Dict]:
+        """See *Manager.get_match_plans()*."""
+        return await self._run(self.manager.get_match_plans)
+
+    async def get_match_memo_statistics(self) -> Dict[str, int]:
+        """See *Manager.get_match_memo_statistics()*."""
+        return await self._run(self.manager.get_match_memo_statistics)
+
+    async def match(
+        self,
+        search_phrase_text: str = None,
+        document_text: str = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[Dict]:
+        """See *Manager.match()*."""
+        return await self._run(
+            self.manager.match, search_phrase_text, document_text, fields
+        )
+
+    async def iter_matches(
+        self,
+        search_phrase_text: str = None,
+        document_text: str = None,
+        limit: int = None,
+        cursor: Optional[Iterable] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict]:
+        """See *Manager.iter_matches()*."""
+        return self.manager._merge_match_streams(
+            await self._run(
+                self.manager._get_match_streams,
+                search_phrase_text,
+                document_text,
+                limit,
+                cursor,
+                fields,
+            ),
+            limit,
+        )
+
+    async def count_matches(
+        self, search_phrase_text: str = None, document_text: str = None
+    ) -> Dict[str, int]:
+        """See *Manager.count_matches()*."""
+        return await self._run(
+            self.manager.count_matches, search_phrase_text, document_text
+        )
+
+    async def any_match(
+        self, search_phrase_text: str = None, document_text: str = None
+    ) -> bool:
+        """See *Manager.any_match()*."""
+        return await self._run(self.manager.any_match, search_phrase_text, document_text)
+
+    async def match_documents(
+        self,
+        document_texts: List[str],
+        search_phrase_text: str = None,
+        batch_size: int = 100,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[List[Dict]]:
+        """See *Manager.match_documents()*."""
+        return await self._run(
+            self.manager.match_documents,
+            document_texts,
+            search_phrase_text,
+            batch_size,
+            fields,
+        )
+
+    async def topic_match_documents_against(
+        self, text_to_match: str, **kwargs
+    ) -> List[Dict]:
+        """See *Manager.topic_match_documents_against()*, which defines the keyword
+        parameters."""
+        return await self._run(
+            self.manager.topic_match_documents_against, text_to_match, **kwargs
+        )
+
+    async def topic_match_documents_against_many(
+        self, texts_to_match: List[str], **kwargs
+    ) -> List[List[Dict]]:
+        """See *Manager.topic_match_documents_against_many()*, which defines the keyword
+        parameters."""
+        return await self._run(
+            self.manager.topic_match_documents_against_many, texts_to_match, **kwargs
+        )
+
+    async def get_phraselet_match_cache_statistics(
+        self,
+    ) -> Optional[List[Dict[str, int]]]:
+        """See *Manager.get_phraselet_match_cache_statistics()*."""
+        return await self._run(self.manager.get_phraselet_match_cache_statistics)
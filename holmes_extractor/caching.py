@@ -0,0 +1,68 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """A thread-safe cache that holds at most *maximum_size* entries. When the cache is full,
+    the least recently used entry is discarded to make room for a new entry.
+
+    Parameters:
+
+    maximum_size -- the maximum number of entries.
+    """
+
+    def __init__(self, maximum_size: int):
+        if maximum_size <= 0:
+            raise ValueError("maximum_size must be a positive integer.")
+        self.maximum_size = maximum_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the value stored for *key*, or *None* if there is none."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maximum_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def remove(self, key: Hashable) -> None:
+        """Discards the entry for *key* if there is one."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Returns the keys and values of the entries from the least to the most recently used
+        without affecting their order or the statistics."""
+        with self.lock:
+            return list(self.entries.items())
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Returns a dictionary with the keys *hits*, *misses*, *evictions*, *size* and
+        *maximum_size*."""
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maximum_size": self.maximum_size,
+            }
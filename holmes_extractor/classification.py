@@ -22,7 +22,7 @@ from .errors import (
 from .structural_matching import Match, StructuralMatcher
 from .ontology import Ontology
 from .parsing import (
-    CorpusWordPosition,
+    ReverseDictionary,
     LinguisticObjectFactory,
     SearchPhrase,
     SemanticAnalyzer,
@@ -202,7 +202,7 @@ class SupervisedTopicTrainingUtils:
             this_document_dict: Dict[int, int] = {}
             doc = training_document_labels_to_documents[doc_label]
             document_labels_to_documents = {doc_label: doc}
-            reverse_dict: Dict[str, List[CorpusWordPosition]] = {}
+            reverse_dict = ReverseDictionary()
             semantic_matching_helper.add_to_reverse_dict(reverse_dict, doc, doc_label)
             for (
                 label,
@@ -333,7 +333,7 @@ class SupervisedTopicTrainingBasis:
         self.verbose = verbose
 
         self.training_document_labels_to_documents: Dict[str, Doc] = {}
-        self.reverse_dict: Dict[str, List[CorpusWordPosition]] = {}
+        self.reverse_dict = ReverseDictionary()
         self.training_documents_labels_to_classifications_dict: Dict[str, str] = {}
         self.additional_classification_labels: Set[str] = set()
         self.classification_implication_dict: Dict[str, List[str]] = {}
@@ -0,0 +1,182 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from collections.abc import Mapping
+from threading import Lock
+import mmap
+import os
+import tempfile
+import weakref
+from spacy.tokens import Doc
+
+# The offset and length in bytes of a serialized document within a *DocumentArena*.
+ArenaLocation = Tuple[int, int]
+
+
+def _remove_arena_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class DocumentArena:
+    """A file-backed store for serialized documents that is owned by *Manager*. Worker processes
+    map the file into memory read-only using *ArenaDocumentDictionary* so that the serialized
+    documents are held once by the operating system rather than once per worker.
+
+    Space freed when documents are removed is reused for later documents. The file is deleted
+    when *close()* is called or the arena is garbage-collected.
+    """
+
+    def __init__(self):
+        file_descriptor, self.path = tempfile.mkstemp(prefix="holmes-", suffix=".arena")
+        self.file = os.fdopen(file_descriptor, "r+b")
+        self.size = 0
+        # Sorted by offset; adjacent free blocks are always merged.
+        self.free_blocks: List[ArenaLocation] = []
+        self.lock = Lock()
+        self._finalizer = weakref.finalize(self, _remove_arena_file, self.path)
+
+    def store(self, serialized_document: bytes) -> ArenaLocation:
+        """Writes *serialized_document* to the arena and returns its location."""
+        length = len(serialized_document)
+        with self.lock:
+            offset = self._allocate(length)
+            self.file.seek(offset)
+            self.file.write(serialized_document)
+            self.file.flush()
+        return offset, length
+
+    def read(self, location: ArenaLocation) -> bytes:
+        offset, length = location
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(length)
+
+    def release(self, location: ArenaLocation) -> None:
+        """Makes the space at *location* available for reuse. Must only be called once no worker
+        process can access the document stored there any more."""
+        offset, length = location
+        if length == 0:
+            return
+        with self.lock:
+            index = 0
+            while (
+                index < len(self.free_blocks) and self.free_blocks[index][0] < offset
+            ):
+                index += 1
+            self.free_blocks.insert(index, (offset, length))
+            if (
+                index + 1 < len(self.free_blocks)
+                and offset + length == self.free_blocks[index + 1][0]
+            ):
+                self.free_blocks[index] = (
+                    offset,
+                    length + self.free_blocks.pop(index + 1)[1],
+                )
+            if (
+                index > 0
+                and sum(self.free_blocks[index - 1]) == self.free_blocks[index][0]
+            ):
+                previous_offset, previous_length = self.free_blocks[index - 1]
+                self.free_blocks[index - 1] = (
+                    previous_offset,
+                    previous_length + self.free_blocks.pop(index)[1],
+                )
+
+    def close(self) -> None:
+        self.file.close()
+        self._finalizer()
+
+    def _allocate(self, length: int) -> int:
+        """Must be called with 'self.lock'."""
+        for index, (free_offset, free_length) in enumerate(self.free_blocks):
+            if free_length >= length:
+                if free_length == length:
+                    self.free_blocks.pop(index)
+                else:
+                    self.free_blocks[index] = (
+                        free_offset + length,
+                        free_length - length,
+                    )
+                return free_offset
+        offset = self.size
+        self.size += length
+        return offset
+
+
+class ArenaDocumentDictionary(Mapping):
+    """Used by a worker process in place of a dictionary from labels to documents when documents
+    are stored in a *DocumentArena*. Documents are deserialized from the memory-mapped arena file
+    on demand.
+
+    Up to *cache_size* of the most recently used documents are retained to avoid deserializing
+    them again. Other documents are released as soon as nothing refers to them any more, so that
+    matching against the whole corpus never holds more deserialized documents in memory than
+    the cache and the matches being built. As long as a document is still referred to, e.g. by a
+    match, the same *Doc* object is returned for each request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        deserialize_function: Callable[[memoryview], Doc],
+        cache_size: int,
+    ):
+        self.path = path
+        self.deserialize_function = deserialize_function
+        self.cache_size = cache_size
+        self.labels_to_locations: Dict[str, ArenaLocation] = {}
+        self.cached_documents: OrderedDict = OrderedDict()
+        self.live_documents: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.mapped_file: Optional[mmap.mmap] = None
+
+    def read(self, location: ArenaLocation) -> memoryview:
+        """Returns a view onto the serialized document at *location* without copying it."""
+        offset, length = location
+        if self.mapped_file is None or offset + length > len(self.mapped_file):
+            with open(self.path, "rb") as file:
+                # Any previous mapping is closed once no views onto it remain.
+                self.mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self.mapped_file)[offset : offset + length]
+
+    def add(self, label: str, location: ArenaLocation, doc: Doc) -> None:
+        self.labels_to_locations[label] = location
+        self.live_documents[label] = doc
+        self._cache(label, doc)
+
+    def get_serialized_document(self, label: str) -> bytes:
+        return bytes(self.read(self.labels_to_locations[label]))
+
+    def clear(self) -> None:
+        self.labels_to_locations = {}
+        self.cached_documents = OrderedDict()
+        self.live_documents = weakref.WeakValueDictionary()
+
+    def _cache(self, label: str, doc: Doc) -> None:
+        self.cached_documents[label] = doc
+        self.cached_documents.move_to_end(label)
+        while len(self.cached_documents) > self.cache_size:
+            self.cached_documents.popitem(last=False)
+
+    def __getitem__(self, label: str) -> Doc:
+        doc = self.live_documents.get(label)
+        if doc is None:
+            doc = self.deserialize_function(self.read(self.labels_to_locations[label]))
+            self.live_documents[label] = doc
+        self._cache(label, doc)
+        return doc
+
+    def __delitem__(self, label: str) -> None:
+        del self.labels_to_locations[label]
+        self.cached_documents.pop(label, None)
+        self.live_documents.pop(label, None)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self.labels_to_locations
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.labels_to_locations)
+
+    def __len__(self) -> int:
+        return len(self.labels_to_locations)
@@ -1,12 +1,34 @@
-from typing import List, Dict, Optional, Any, cast
-from multiprocessing import Process, Queue, Manager as MultiprocessingManager, cpu_count
-from threading import Lock
+from typing import (
+    List,
+    Dict,
+    Optional,
+    Tuple,
+    Any,
+    Iterable,
+    Set,
+    Union,
+    Generator,
+    Callable,
+    Iterator,
+    cast,
+)
+from multiprocessing import Process, Queue, Pipe, cpu_count
+from multiprocessing.connection import Connection, wait
+from collections import deque
+from itertools import islice
+import heapq
+from functools import wraps
+from queue import Empty
+from threading import Condition, Lock, Thread
+from weakref import WeakValueDictionary
+import asyncio
 from string import punctuation
 from math import sqrt
 import traceback
 import sys
 import os
 import pickle
+from copy import deepcopy
 import pkg_resources
 import spacy
 import coreferee
@@ -16,7 +38,16 @@ from spacy.tokens import Doc, Token
 from wasabi import Printer  # type: ignore[import]
 from thinc.api import Config
 from .errors import *
-from .structural_matching import StructuralMatcher
+from .structural_matching import (
+    StructuralMatcher,
+    VocabularyVectorMatrix,
+    SearchPhraseIndex,
+    MatchPlan,
+)
+from .document_storage import DocumentArena, ArenaDocumentDictionary
+from .placement import PlacementPolicy, RoundRobinPlacementPolicy, get_token_count
+from .caching import LRUCache
+from .async_manager import AsyncManager
 from .ontology import Ontology
 from .parsing import (
     SemanticAnalyzerFactory,
@@ -24,10 +55,18 @@ from .parsing import (
     SemanticMatchingHelperFactory,
     LinguisticObjectFactory,
     SearchPhrase,
+    ReverseDictionary,
+    RelationIndex,
+    PhraseletInfo,
     SERIALIZED_DOCUMENT_VERSION,
 )
 from .classification import SupervisedTopicTrainingBasis, SupervisedTopicClassifier
-from .topic_matching import TopicMatcher, TopicMatchDictionaryOrderer
+from .topic_matching import (
+    TopicMatcher,
+    TopicMatchDictionaryOrderer,
+    InitialPhraseletMatcher,
+    PhraseletMatchCache,
+)
 from .consoles import HolmesConsoles
 from .word_matching.derivation import DerivationWordMatchingStrategy
 from .word_matching.direct import DirectWordMatchingStrategy
@@ -39,6 +78,11 @@ from .word_matching.ontology import OntologyWordMatchingStrategy
 
 TIMEOUT_SECONDS = 180
 
+# The maximum number of topic matching requests for which a worker process retains topic
+# matchers between returning topic match summaries and returning the selected topic match
+# dictionaries.
+MAXIMUM_PENDING_TOPIC_MATCHERS = 100
+
 absolute_config_filename = pkg_resources.resource_filename(__name__, "config.cfg")
 config = Config().from_disk(absolute_config_filename)
 vector_nlps_config_dict = config["vector_nlps"]
@@ -80,6 +124,117 @@ def get_semantic_analyzer(nlp: Language) -> SemanticAnalyzer:
         return MODEL_NAMES_TO_SEMANTIC_ANALYZERS[model_name]
 
 
+class ReplyQueue:
+    """Receives the replies to a single request sent to one or more worker processes. Replies
+    can be awaited either by blocking the calling thread or from within an event loop."""
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+        self.replies: deque = deque()
+        self.condition = Condition()
+        self.waiting_future: Optional[asyncio.Future] = None
+
+    def put(self, reply: Tuple) -> None:
+        with self.condition:
+            self.replies.append(reply)
+            self.condition.notify()
+            if self.waiting_future is not None:
+                try:
+                    self.waiting_future.get_loop().call_soon_threadsafe(
+                        self._wake_waiting_future, self.waiting_future
+                    )
+                except RuntimeError:
+                    # The event loop has been closed in the meantime.
+                    pass
+                self.waiting_future = None
+
+    @staticmethod
+    def _wake_waiting_future(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
+
+    def get(self, timeout: float) -> Tuple:
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.replies) > 0, timeout):
+                raise Empty
+            return self.replies.popleft()
+
+    async def get_async(self, timeout: float) -> Tuple:
+        while True:
+            with self.condition:
+                if len(self.replies) > 0:
+                    return self.replies.popleft()
+                self.waiting_future = asyncio.get_running_loop().create_future()
+                waiting_future = self.waiting_future
+            try:
+                await asyncio.wait_for(waiting_future, timeout)
+            except asyncio.TimeoutError:
+                # Timeouts are reported in the same way as by get().
+                raise Empty from None
+
+
+class ReplyDispatcher:
+    """Reads the replies that worker processes send over their persistent reply connections
+    on a background thread and passes each reply to the *ReplyQueue* of the request it answers.
+    A request is forgotten as soon as its *ReplyQueue* is no longer referenced.
+    """
+
+    def __init__(self, reply_connections: List[Connection]):
+        self.reply_connections = reply_connections
+        self.request_ids_to_reply_queues: WeakValueDictionary = WeakValueDictionary()
+        self.next_request_id = 0
+        self.lock = Lock()
+        Thread(target=self._read_replies, daemon=True).start()
+
+    def open_request(self) -> ReplyQueue:
+        with self.lock:
+            reply_queue = ReplyQueue(self.next_request_id)
+            self.next_request_id += 1
+            self.request_ids_to_reply_queues[reply_queue.request_id] = reply_queue
+        return reply_queue
+
+    def _read_replies(self) -> None:
+        open_connections = list(self.reply_connections)
+        while len(open_connections) > 0:
+            for connection in wait(open_connections):
+                try:
+                    request_id, *reply = connection.recv()
+                except (EOFError, OSError):
+                    # The worker process has terminated.
+                    open_connections.remove(connection)
+                    continue
+                with self.lock:
+                    reply_queue = self.request_ids_to_reply_queues.get(request_id)
+                # Replies to requests that have timed out are discarded.
+                if reply_queue is not None:
+                    reply_queue.put(tuple(reply))
+
+
+def operation(generator_function):
+    """Decorates a *Manager* method written as a generator that yields the arguments to
+    *Manager._handle_response()* whenever it needs to wait for replies from worker processes
+    and receives the return values in exchange. The decorated method blocks until the
+    operation has completed; the generator function remains available as *__wrapped__* so that
+    *AsyncManager* can run the same operation from within an event loop.
+    """
+
+    @wraps(generator_function)
+    def run_operation(self, *args, **kwargs):
+        return self._run_operation(generator_function(self, *args, **kwargs))
+
+    return run_operation
+
+
+def _advance_operation(operation: Generator, value: Any) -> Tuple[bool, Any]:
+    """Returns *(True, return value)* if *operation* has completed, otherwise *(False,
+    arguments to Manager._handle_response())*. *StopIteration* may not be raised into a future,
+    which is why it is caught here."""
+    try:
+        return False, operation.send(value)
+    except StopIteration as stop_iteration:
+        return True, stop_iteration.value
+
+
 class Manager:
     """The facade class for the Holmes library.
 
@@ -110,6 +265,42 @@ class Manager:
         e.g. {"GPE": "place"} that reflect the meanings of those labels, or *None* if 
         the standard dictionaries should be used. The standard dictionaries are recommended 
         unless bespoke entity labels are being used.
+    use_shared_document_arena -- *True* if serialized documents should be stored in a
+        memory-mapped file shared by all worker processes rather than being held in deserialized
+        form by each worker process, which greatly reduces memory usage for large corpora at the
+        cost of deserializing documents when they are matched. Defaults to *False*.
+    arena_document_cache_size -- the maximum number of recently used deserialized documents each
+        worker process retains when *use_shared_document_arena* is *True*. Other documents are
+        released as soon as they are no longer needed. Defaults to *100*.
+    placement_policy -- a *PlacementPolicy* object that decides which worker process holds each
+        registered document, or *None* if documents should be distributed between the worker
+        processes in turn. Defaults to *None*.
+    topic_match_cache_size -- the maximum number of results of calls to
+        *topic_match_documents_against()* to retain so that repeated calls with the same text and
+        parameters can be answered without matching, or *0* if no results should be retained.
+        Retained results are discarded whenever documents are registered or removed.
+        Defaults to *0*.
+    share_dependency_tests -- *True* if the tests on document dependencies that are carried out
+        during matching should be evaluated once per document position and dependency label and
+        shared between all the search phrases or topic-matching phraselets being matched, which
+        speeds up matching large numbers of search phrases with common structure at the cost of
+        retaining the test results in memory for the duration of each call. Matching results are
+        unaffected. Defaults to *False*.
+    phraselet_match_cache_size -- the maximum number of topic matching phraselets whose
+        structural matches each worker process retains between calls to
+        *topic_match_documents_against()* so that phraselets shared by successive texts only
+        have to be matched once, or *0* if no matches should be retained. Retained matches are
+        updated whenever documents are registered or removed. Ignored if
+        *use_shared_document_arena* is *True*. Defaults to *0*.
+    use_relation_index -- *True* if each worker process should index the semantic dependencies
+        within the documents it holds by dependency label and by the words at either end when
+        the documents are registered, so that the positions at which the root token of a search
+        phrase or topic-matching phraselet can match together with its children are found by
+        lookups and structural matching is only attempted at those positions. The index is not
+        used when embedding-based matching is active, i.e. when the relevant similarity
+        threshold is below *1.0*. This speeds up matching search phrases and relation
+        phraselets whose words are frequent in the corpus at the cost of memory and of time
+        spent registering documents. Matching results are unaffected. Defaults to *False*.
     """
 
     def __init__(
@@ -124,9 +315,17 @@ class Manager:
         use_reverse_dependency_matching: bool = True,
         number_of_workers: int = None,
         verbose: bool = False,
-        entity_labels_to_corresponding_lexemes: Optional[Dict[str, str]] = None
+        entity_labels_to_corresponding_lexemes: Optional[Dict[str, str]] = None,
+        use_shared_document_arena: bool = False,
+        arena_document_cache_size: int = 100,
+        placement_policy: Optional[PlacementPolicy] = None,
+        topic_match_cache_size: int = 0,
+        share_dependency_tests: bool = False,
+        phraselet_match_cache_size: int = 0,
+        use_relation_index: bool = False,
     ):
         self.verbose = verbose
+        self.model = model
         self.nlp = get_nlp(model)
         with pipeline_components_lock:
             if not self.nlp.has_pipe("coreferee"):
@@ -246,6 +445,7 @@ class Manager:
             analyze_derivational_morphology,
             perform_coreference_resolution,
             use_reverse_dependency_matching,
+            share_dependency_tests,
         )
         self.document_labels_to_worker_queues: Dict[str, int] = {}
         self.search_phrases: List[SearchPhrase] = []
@@ -268,20 +468,44 @@ class Manager:
             raise ValueError("number_of_workers must be a positive integer.")
         self.number_of_workers = number_of_workers
         self.next_worker_to_use = 0
-        self.multiprocessing_manager = MultiprocessingManager()
+        self.placement_policy = (
+            placement_policy
+            if placement_policy is not None
+            else RoundRobinPlacementPolicy()
+        )
+        # The load on each worker is the total number of tokens in the documents it holds.
+        self.worker_loads = [0] * number_of_workers
+        self.document_labels_to_sizes: Dict[str, int] = {}
         self.worker = (
             Worker()
         )  # will be copied to worker processes by value (Windows) or
         # by reference (Linux)
         self.workers: List[Process] = []
         self.input_queues: List[Queue] = []
-        self.word_dictionaries_need_rebuilding = False
+        reply_connections: List[Connection] = []
+        self.document_arena = DocumentArena() if use_shared_document_arena else None
+        self.document_labels_to_arena_locations: Dict[str, Tuple[int, int]] = {}
+        # Maintained incrementally from the changes reported by the worker processes when
+        # documents are registered and removed.
         self.words_to_corpus_frequencies: Dict[str, int] = {}
         self.maximum_corpus_frequency = 0
+        self.maximum_corpus_frequency_needs_recalculating = False
+        # Incremented whenever documents have been registered or removed.
+        self.corpus_version = 0
+        self.corpus_frequency_lock = Lock()
+        if topic_match_cache_size < 0:
+            raise ValueError("topic_match_cache_size may not be negative.")
+        self.topic_match_cache = (
+            LRUCache(topic_match_cache_size) if topic_match_cache_size > 0 else None
+        )
+        if phraselet_match_cache_size < 0:
+            raise ValueError("phraselet_match_cache_size may not be negative.")
 
         for counter in range(0, self.number_of_workers):
             input_queue: Queue = Queue()
             self.input_queues.append(input_queue)
+            reply_connection, worker_reply_connection = Pipe(duplex=False)
+            reply_connections.append(reply_connection)
             worker_label = " ".join(("Worker", str(counter)))
             this_worker = Process(
                 target=self.worker.listen,
@@ -290,16 +514,29 @@ class Manager:
                     self.overall_similarity_threshold,
                     self.entity_label_to_vector_dict,
                     self.nlp.vocab,
+                    self.model,
                     self.semantic_analyzer.get_model_name(),
                     SERIALIZED_DOCUMENT_VERSION,
                     input_queue,
+                    worker_reply_connection,
                     worker_label,
+                    self.document_arena.path
+                    if self.document_arena is not None
+                    else None,
+                    arena_document_cache_size,
+                    phraselet_match_cache_size,
+                    use_relation_index,
                 ),
                 daemon=True,
             )
             self.workers.append(this_worker)
             this_worker.start()
+            # Only the worker process writes to the connection, which means the dispatcher is
+            # notified when the worker process terminates.
+            worker_reply_connection.close()
+        self.reply_dispatcher = ReplyDispatcher(reply_connections)
         self.lock = Lock()
+        self.aio = AsyncManager(self)
 
     def _next_worker_queue_number(self) -> int:
         """Must be called with 'self.lock'."""
@@ -308,20 +545,114 @@ class Manager:
             self.next_worker_to_use = 0
         return self.next_worker_to_use
 
+    def _place_document(self, label: str, size: int) -> int:
+        """Must be called with 'self.lock'."""
+        worker_index = self.placement_policy.select_worker_index(
+            self.placement_policy.get_worker_indexes_for_label(
+                label, self.number_of_workers
+            ),
+            self.worker_loads,
+        )
+        self.document_labels_to_worker_queues[label] = worker_index
+        self.document_labels_to_sizes[label] = size
+        self.worker_loads[worker_index] += size
+        return worker_index
+
+    def _resize_document(self, label: str, size: int) -> None:
+        """Must be called with 'self.lock'."""
+        self.worker_loads[self.document_labels_to_worker_queues[label]] += (
+            size - self.document_labels_to_sizes[label]
+        )
+        self.document_labels_to_sizes[label] = size
+
+    def _forget_document(self, label: str) -> int:
+        """Must be called with 'self.lock'."""
+        worker_index = self.document_labels_to_worker_queues.pop(label)
+        self.worker_loads[worker_index] -= self.document_labels_to_sizes.pop(label)
+        return worker_index
+
+    def _run_operation(self, operation: Generator) -> Any:
+        """Runs a method decorated with *@operation*, blocking while it waits for replies. If
+        waiting fails, the operation is closed so that it can clean up."""
+        try:
+            response_arguments = next(operation)
+            while True:
+                try:
+                    return_values = self._handle_response(*response_arguments)
+                except BaseException:
+                    operation.close()
+                    raise
+                response_arguments = operation.send(return_values)
+        except StopIteration as stop_iteration:
+            return stop_iteration.value
+
+    async def _run_operation_async(self, operation: Generator) -> Any:
+        """Runs a method decorated with *@operation* from within an event loop. The code between
+        the points where the operation waits for replies, which may involve parsing, runs on
+        the event loop's default executor, while replies are awaited without blocking a thread.
+        If waiting fails, the operation is closed so that it can clean up.
+        """
+        loop = asyncio.get_running_loop()
+        return_values = None
+        while True:
+            finished, value = await loop.run_in_executor(
+                None, _advance_operation, operation, return_values
+            )
+            if finished:
+                return value
+            try:
+                return_values = await self._handle_response_async(*value)
+            except BaseException:
+                # Also reached if the caller is cancelled while waiting for replies.
+                operation.close()
+                raise
+
     def _handle_response(
-        self, reply_queue, number_of_messages: int, method_name: str
+        self,
+        reply_queue: ReplyQueue,
+        number_of_messages: int,
+        method_name: str,
+        return_values_are_corpus_frequency_changes: bool = False,
+    ) -> List[Any]:
+        return self._evaluate_replies(
+            [reply_queue.get(TIMEOUT_SECONDS) for _ in range(number_of_messages)],
+            method_name,
+            return_values_are_corpus_frequency_changes,
+        )
+
+    async def _handle_response_async(
+        self,
+        reply_queue: ReplyQueue,
+        number_of_messages: int,
+        method_name: str,
+        return_values_are_corpus_frequency_changes: bool = False,
+    ) -> List[Any]:
+        replies = []
+        for _ in range(number_of_messages):
+            replies.append(await reply_queue.get_async(TIMEOUT_SECONDS))
+        return self._evaluate_replies(
+            replies, method_name, return_values_are_corpus_frequency_changes
+        )
+
+    def _evaluate_replies(
+        self,
+        replies: List[Tuple],
+        method_name: str,
+        return_values_are_corpus_frequency_changes: bool,
     ) -> List[Any]:
+        """If *return_values_are_corpus_frequency_changes* is *True*, the changes returned by
+        the worker processes that succeeded are applied before any deserialization error is
+        raised so that the corpus frequencies continue to reflect the registered documents."""
         return_values = []
         exception_worker_label = None
-        for _ in range(number_of_messages):
-            worker_label, return_value, return_info = reply_queue.get(
-                timeout=TIMEOUT_SECONDS
-            )
+        deserialization_error = None
+        for worker_label, return_value, return_info in replies:
             if isinstance(
                 return_info,
                 (WrongModelDeserializationError, WrongVersionDeserializationError),
             ):
-                raise return_info
+                if deserialization_error is None:
+                    deserialization_error = return_info
             elif isinstance(return_info, Exception):
                 if exception_worker_label is None:
                     exception_worker_label = worker_label
@@ -343,8 +674,13 @@ class Manager:
                         )
                     )
                 )
+        if return_values_are_corpus_frequency_changes:
+            self._update_corpus_frequencies(return_values)
+        if deserialization_error is not None:
+            raise deserialization_error
         return return_values
 
+    @operation
     def register_serialized_documents(
         self, document_dictionary: Dict[str, bytes]
     ) -> None:
@@ -354,25 +690,49 @@ class Manager:
 
         document_dictionary -- a dictionary from labels to serialized documents.
         """
-        reply_queue = self.multiprocessing_manager.Queue()
+        document_sizes = {
+            label: get_token_count(serialized_doc)
+            for label, serialized_doc in document_dictionary.items()
+        }
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
-            for label, serialized_doc in document_dictionary.items():
+            # All labels are checked before any document is sent to a worker process so that
+            # a duplicate label does not leave the batch partially registered.
+            for label in document_dictionary:
                 if label in self.document_labels_to_worker_queues:
                     raise DuplicateDocumentError(label)
+            for label, serialized_doc in document_dictionary.items():
+                worker_queue_number = self._place_document(label, document_sizes[label])
+                if self.document_arena is not None:
+                    self._register_arena_document(
+                        label, serialized_doc, worker_queue_number, reply_queue.request_id
+                    )
                 else:
-                    worker_queue_number = self._next_worker_queue_number()
-                    self.document_labels_to_worker_queues[label] = worker_queue_number
-                    self.word_dictionaries_need_rebuilding = True
                     self.input_queues[worker_queue_number].put(
                         (
                             self.worker.register_serialized_document,
                             (serialized_doc, label),
-                            reply_queue,
+                            reply_queue.request_id,
                         ),
                         timeout=TIMEOUT_SECONDS,
                     )
-        self._handle_response(
-            reply_queue, len(document_dictionary), "register_serialized_documents"
+        yield (
+            reply_queue,
+            len(document_dictionary),
+            "register_serialized_documents",
+            True,
+        )
+
+    def _register_arena_document(
+        self, label: str, serialized_doc: bytes, worker_index: int, request_id: int
+    ) -> None:
+        """Stores *serialized_doc* in the arena and asks the worker process with *worker_index*
+        to register it. Must be called with 'self.lock'."""
+        location = self.document_arena.store(serialized_doc)
+        self.document_labels_to_arena_locations[label] = location
+        self.input_queues[worker_index].put(
+            (self.worker.register_arena_document, (location, label), request_id),
+            timeout=TIMEOUT_SECONDS,
         )
 
     def register_serialized_document(
@@ -398,24 +758,198 @@ class Manager:
         doc = self.nlp(document_text)
         self.register_serialized_document(doc.to_bytes(), label)
 
+    @operation
+    def parse_and_register_documents(
+        self,
+        documents: Union[Dict[str, str], Iterable[Tuple[str, str]]],
+        batch_size: int = 100,
+    ) -> None:
+        """Parses and registers several documents. Unlike *parse_and_register_document()*,
+        parsing takes place within the worker processes, each of which loads the spaCy model
+        the first time it is required and parses the documents assigned to it using
+        *nlp.pipe()*. This is the most efficient way of loading documents that have not already
+        been parsed because parsing throughput scales with the number of worker processes.
+
+        Parameters:
+
+        documents -- a dictionary from labels to raw document texts, or an iterable of
+            *(label, document_text)* tuples.
+        batch_size -- the maximum number of documents sent to a worker process in a single
+            message and parsed together by *nlp.pipe()*. Defaults to *100*.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+        if isinstance(documents, dict):
+            labels_and_texts = list(documents.items())
+        else:
+            labels_and_texts = list(documents)
+        reply_queue = self.reply_dispatcher.open_request()
+        worker_indexes_to_labels_and_texts: Dict[int, List[Tuple[str, str]]] = {}
+        number_of_messages = 0
+        with self.lock:
+            labels = set()
+            for label, _ in labels_and_texts:
+                if label in self.document_labels_to_worker_queues or label in labels:
+                    raise DuplicateDocumentError(label)
+                labels.add(label)
+            for counter, (label, document_text) in enumerate(labels_and_texts):
+                # The labels are reserved while the documents are being parsed. The number of
+                # tokens is estimated before each document is parsed and corrected afterwards.
+                worker_index = self._place_document(label, len(document_text.split()))
+                if self.document_arena is not None:
+                    # The parsed documents are returned to be stored in the arena and are then
+                    # registered on the worker processes where they were placed.
+                    worker_index = counter % self.number_of_workers
+                worker_indexes_to_labels_and_texts.setdefault(worker_index, []).append(
+                    (label, document_text)
+                )
+            method = (
+                self.worker.parse_and_register_documents
+                if self.document_arena is None
+                else self.worker.parse_documents
+            )
+            for (
+                worker_index,
+                worker_labels_and_texts,
+            ) in worker_indexes_to_labels_and_texts.items():
+                for start_index in range(0, len(worker_labels_and_texts), batch_size):
+                    self.input_queues[worker_index].put(
+                        (
+                            method,
+                            (
+                                worker_labels_and_texts[
+                                    start_index : start_index + batch_size
+                                ],
+                            ),
+                            reply_queue.request_id,
+                        ),
+                        timeout=TIMEOUT_SECONDS,
+                    )
+                    number_of_messages += 1
+        try:
+            return_values = yield (
+                reply_queue,
+                number_of_messages,
+                "parse_and_register_documents",
+            )
+        except GeneratorExit:
+            if self.document_arena is not None:
+                # The parsed documents will never be registered, so their labels are released.
+                with self.lock:
+                    for label, _ in labels_and_texts:
+                        if (
+                            label in self.document_labels_to_worker_queues
+                            and label not in self.document_labels_to_arena_locations
+                        ):
+                            self._forget_document(label)
+            raise
+        if self.document_arena is None:
+            self._update_corpus_frequencies(
+                [corpus_frequency_changes for _, corpus_frequency_changes in return_values]
+            )
+            labels_to_token_counts = {
+                label: token_count
+                for worker_labels_to_token_counts, _ in return_values
+                for label, token_count in worker_labels_to_token_counts.items()
+            }
+            with self.lock:
+                for label, _ in labels_and_texts:
+                    if label not in self.document_labels_to_worker_queues:
+                        # The document has been removed in the meantime.
+                        continue
+                    if label in labels_to_token_counts:
+                        self._resize_document(label, labels_to_token_counts[label])
+                    else:
+                        # The documents from batches that failed on their worker processes
+                        # are forgotten so that their labels can be registered again.
+                        self._forget_document(label)
+        else:
+            labels_to_serialized_documents = {
+                label: serialized_doc
+                for labels_and_serialized_docs in return_values
+                for label, serialized_doc in labels_and_serialized_docs
+            }
+            labels_to_token_counts = {
+                label: get_token_count(serialized_doc)
+                for label, serialized_doc in labels_to_serialized_documents.items()
+            }
+            reply_queue = self.reply_dispatcher.open_request()
+            number_of_messages = 0
+            with self.lock:
+                for label, _ in labels_and_texts:
+                    if label not in self.document_labels_to_worker_queues:
+                        # The document has been removed in the meantime.
+                        continue
+                    if label in labels_to_serialized_documents:
+                        self._resize_document(label, labels_to_token_counts[label])
+                        self._register_arena_document(
+                            label,
+                            labels_to_serialized_documents[label],
+                            self.document_labels_to_worker_queues[label],
+                            reply_queue.request_id,
+                        )
+                        number_of_messages += 1
+                    else:
+                        # The labels of documents from batches that failed on their worker
+                        # processes are released so that they can be registered again.
+                        self._forget_document(label)
+            yield (
+                reply_queue,
+                number_of_messages,
+                "parse_and_register_documents",
+                True,
+            )
+
     def remove_document(self, label: str) -> None:
         """Parameters:
 
         label -- the label of the document to be removed.
         """
-        reply_queue = self.multiprocessing_manager.Queue()
+        self.remove_documents([label])
+
+    @operation
+    def remove_documents(self, labels: List[str]) -> None:
+        """Removes several documents with a single request to each worker process, which is
+        considerably more efficient than calling *remove_document()* for each document.
+
+        Parameters:
+
+        labels -- the labels of the documents to be removed. Labels that do not belong to
+            registered documents are ignored.
+        """
+        reply_queue = self.reply_dispatcher.open_request()
+        worker_indexes_to_labels: Dict[int, List[str]] = {}
         with self.lock:
-            if label in self.document_labels_to_worker_queues:
-                self.input_queues[self.document_labels_to_worker_queues[label]].put(
-                    (self.worker.remove_document, (label,), reply_queue),
+            for label in labels:
+                if label in self.document_labels_to_worker_queues:
+                    worker_index = self._forget_document(label)
+                    if (
+                        self.document_arena is not None
+                        and label not in self.document_labels_to_arena_locations
+                    ):
+                        # The document is still being parsed and is not yet held by any
+                        # worker process.
+                        continue
+                    worker_indexes_to_labels.setdefault(worker_index, []).append(label)
+            for worker_index, worker_labels in worker_indexes_to_labels.items():
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.remove_documents,
+                        (worker_labels,),
+                        reply_queue.request_id,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
-                del self.document_labels_to_worker_queues[label]
-                self.word_dictionaries_need_rebuilding = True
-            else:
-                return
-        self._handle_response(reply_queue, 1, "remove_document")
+        yield reply_queue, len(worker_indexes_to_labels), "remove_documents", True
+        self._release_arena_locations(
+            [
+                label
+                for worker_labels in worker_indexes_to_labels.values()
+                for label in worker_labels
+            ]
+        )
 
+    @operation
     def remove_all_documents(self, labels_starting: str = None) -> None:
         """
         Parameters:
@@ -425,22 +959,203 @@ class Manager:
         """
         if labels_starting is None:
             labels_starting = ""
-        reply_queue = self.multiprocessing_manager.Queue()
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
             for worker_index in range(self.number_of_workers):
                 self.input_queues[worker_index].put(
-                    (self.worker.remove_all_documents, (labels_starting,), reply_queue),
+                    (
+                        self.worker.remove_all_documents,
+                        (labels_starting,),
+                        reply_queue.request_id,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
-            self.word_dictionaries_need_rebuilding = True
-            self.document_labels_to_worker_queues = {
-                key: value
-                for key, value in self.document_labels_to_worker_queues.items()
-                if not key.startswith(labels_starting)
-            }
-        self._handle_response(
-            reply_queue, self.number_of_workers, "remove_all_documents"
-        )
+            removed_labels = [
+                key
+                for key in self.document_labels_to_worker_queues
+                if key.startswith(labels_starting)
+            ]
+            for label in removed_labels:
+                self._forget_document(label)
+        yield reply_queue, self.number_of_workers, "remove_all_documents", True
+        self._release_arena_locations(removed_labels)
+
+    def _release_arena_locations(self, labels: List[str]) -> None:
+        """Called once the worker processes have confirmed the removal of the documents with
+        *labels*, which they will therefore no longer read from the arena."""
+        if self.document_arena is None:
+            return
+        with self.lock:
+            locations = [
+                self.document_labels_to_arena_locations.pop(label)
+                for label in labels
+                if label in self.document_labels_to_arena_locations
+            ]
+        for location in locations:
+            self.document_arena.release(location)
+
+    @operation
+    def rebalance_documents(self, maximum_skew: float = 1.25) -> int:
+        """Moves documents between worker processes if the load on the most heavily loaded
+        worker process, i.e. the total number of tokens in the documents it holds, is more than
+        *maximum_skew* times the mean load. Documents are only moved to worker processes
+        permitted by the placement policy. A document that cannot be registered on its target
+        worker process remains on its source worker process. Returns the number of documents
+        moved.
+
+        Parameters:
+
+        maximum_skew -- the ratio between the highest load and the mean load above which
+            documents are moved. Defaults to *1.25*.
+        """
+        if maximum_skew < 1.0:
+            raise ValueError("maximum_skew must be at least 1.0.")
+        with self.lock:
+            moves = self._plan_rebalancing(maximum_skew)
+        if len(moves) == 0:
+            return 0
+        labels_to_serialized_documents: Dict[str, Optional[bytes]] = {}
+        if self.document_arena is None:
+            for label, _, _ in moves:
+                labels_to_serialized_documents[
+                    label
+                ] = yield from self.serialize_document.__wrapped__(self, label)
+
+        def get_registration_message(label: str, request_id: int) -> Tuple:
+            if self.document_arena is not None:
+                return (
+                    self.worker.register_arena_document,
+                    (self.document_labels_to_arena_locations[label], label),
+                    request_id,
+                )
+            return (
+                self.worker.register_serialized_document,
+                (labels_to_serialized_documents[label], label),
+                request_id,
+            )
+
+        reply_queue = self.reply_dispatcher.open_request()
+        # Each registration has its own reply queue so that moves that fail can be identified.
+        completed_moves: List[Tuple[str, int, int, ReplyQueue]] = []
+        with self.lock:
+            for label, source_worker_index, target_worker_index in moves:
+                if (
+                    self.document_labels_to_worker_queues.get(label)
+                    != source_worker_index
+                ):
+                    # The document has been removed in the meantime.
+                    continue
+                if self.document_arena is not None:
+                    if label not in self.document_labels_to_arena_locations:
+                        # The document is still being parsed.
+                        continue
+                elif labels_to_serialized_documents[label] is None:
+                    continue
+                registration_reply_queue = self.reply_dispatcher.open_request()
+                # Both messages are sent while holding the lock so that any other request
+                # reaches the two worker processes either before or after the move.
+                self.input_queues[target_worker_index].put(
+                    get_registration_message(label, registration_reply_queue.request_id),
+                    timeout=TIMEOUT_SECONDS,
+                )
+                self.input_queues[source_worker_index].put(
+                    (self.worker.remove_documents, ([label],), reply_queue.request_id),
+                    timeout=TIMEOUT_SECONDS,
+                )
+                size = self.document_labels_to_sizes[label]
+                self.worker_loads[source_worker_index] -= size
+                self.worker_loads[target_worker_index] += size
+                self.document_labels_to_worker_queues[label] = target_worker_index
+                completed_moves.append(
+                    (
+                        label,
+                        source_worker_index,
+                        target_worker_index,
+                        registration_reply_queue,
+                    )
+                )
+        failed_moves = []
+        for move in completed_moves:
+            if len((yield move[3], 1, "rebalance_documents", True)) == 0:
+                failed_moves.append(move)
+        yield reply_queue, len(completed_moves), "rebalance_documents", True
+        if len(failed_moves) > 0:
+            # Documents that could not be registered on their target worker processes are
+            # registered on their source worker processes again.
+            reply_queue = self.reply_dispatcher.open_request()
+            number_of_messages = 0
+            with self.lock:
+                for label, source_worker_index, target_worker_index, _ in failed_moves:
+                    if (
+                        self.document_labels_to_worker_queues.get(label)
+                        != target_worker_index
+                    ):
+                        # The document has been removed in the meantime.
+                        continue
+                    self.input_queues[source_worker_index].put(
+                        get_registration_message(label, reply_queue.request_id),
+                        timeout=TIMEOUT_SECONDS,
+                    )
+                    size = self.document_labels_to_sizes[label]
+                    self.worker_loads[target_worker_index] -= size
+                    self.worker_loads[source_worker_index] += size
+                    self.document_labels_to_worker_queues[label] = source_worker_index
+                    number_of_messages += 1
+            yield reply_queue, number_of_messages, "rebalance_documents", True
+        return len(completed_moves) - len(failed_moves)
+
+    def _plan_rebalancing(self, maximum_skew: float) -> List[Tuple[str, int, int]]:
+        """Returns a list of *(label, source_worker_index, target_worker_index)* tuples. Each
+        planned move lowers the higher of the two loads concerned, so planning always terminates.
+        Must be called with 'self.lock'."""
+        worker_loads = list(self.worker_loads)
+        maximum_load = maximum_skew * sum(worker_loads) / self.number_of_workers
+        # Dictionaries with no values rather than sets so that planning is deterministic.
+        worker_indexes_to_labels: Dict[int, Dict[str, None]] = {
+            worker_index: {} for worker_index in range(self.number_of_workers)
+        }
+        for label, worker_index in self.document_labels_to_worker_queues.items():
+            worker_indexes_to_labels[worker_index][label] = None
+        labels_to_original_worker_indexes: Dict[str, int] = {}
+        labels_to_target_worker_indexes: Dict[str, int] = {}
+        while max(worker_loads) > maximum_load:
+            source_worker_index = worker_loads.index(max(worker_loads))
+            best_move = None
+            for label in worker_indexes_to_labels[source_worker_index]:
+                size = self.document_labels_to_sizes[label]
+                target_worker_index = min(
+                    self.placement_policy.get_worker_indexes_for_label(
+                        label, self.number_of_workers
+                    ),
+                    key=lambda worker_index: worker_loads[worker_index],
+                )
+                new_higher_load = max(
+                    worker_loads[source_worker_index] - size,
+                    worker_loads[target_worker_index] + size,
+                )
+                if new_higher_load < worker_loads[source_worker_index] and (
+                    best_move is None or new_higher_load < best_move[0]
+                ):
+                    best_move = (new_higher_load, label, target_worker_index)
+            if best_move is None:
+                break
+            _, label, target_worker_index = best_move
+            size = self.document_labels_to_sizes[label]
+            worker_loads[source_worker_index] -= size
+            worker_loads[target_worker_index] += size
+            del worker_indexes_to_labels[source_worker_index][label]
+            worker_indexes_to_labels[target_worker_index][label] = None
+            labels_to_original_worker_indexes.setdefault(label, source_worker_index)
+            labels_to_target_worker_indexes[label] = target_worker_index
+        return [
+            (
+                label,
+                labels_to_original_worker_indexes[label],
+                target_worker_index,
+            )
+            for label, target_worker_index in labels_to_target_worker_indexes.items()
+            if target_worker_index != labels_to_original_worker_indexes[label]
+        ]
 
     def list_document_labels(self) -> List[str]:
         """Returns a list of the labels of the currently registered documents."""
@@ -448,6 +1163,7 @@ class Manager:
             unsorted_labels = self.document_labels_to_worker_queues.keys()
         return sorted(unsorted_labels)
 
+    @operation
     def serialize_document(self, label: str) -> Optional[bytes]:
         """Returns a serialized representation of a Holmes document that can be persisted to
             a file. If *label* is not the label of a registered document, *None* is returned
@@ -457,16 +1173,24 @@ class Manager:
 
         label -- the label of the document to be serialized.
         """
-        reply_queue = self.multiprocessing_manager.Queue()
+        if self.document_arena is not None:
+            with self.lock:
+                location = self.document_labels_to_arena_locations.get(label)
+            return None if location is None else self.document_arena.read(location)
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
             if label in self.document_labels_to_worker_queues:
                 self.input_queues[self.document_labels_to_worker_queues[label]].put(
-                    (self.worker.get_serialized_document, (label,), reply_queue),
+                    (
+                        self.worker.get_serialized_document,
+                        (label,),
+                        reply_queue.request_id,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
             else:
                 return None
-        return self._handle_response(reply_queue, 1, "serialize_document")[0]
+        return (yield reply_queue, 1, "serialize_document")[0]
 
     def get_document(self, label: str = "") -> Optional[Doc]:
         """Returns a Holmes document. If *label* is not the label of a registered document, *None*
@@ -508,6 +1232,7 @@ class Manager:
         )
         return search_phrase
 
+    @operation
     def register_search_phrase(
         self, search_phrase_text: str, label: str = None
     ) -> SearchPhrase:
@@ -521,28 +1246,31 @@ class Manager:
         """
         search_phrase = self._create_search_phrase(search_phrase_text, label)
         search_phrase.pack()
-        reply_queue = self.multiprocessing_manager.Queue()
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
             for worker_index in range(self.number_of_workers):
                 self.input_queues[worker_index].put(
-                    (self.worker.register_search_phrase, (search_phrase,), reply_queue),
+                    (
+                        self.worker.register_search_phrase,
+                        (search_phrase,),
+                        reply_queue.request_id,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
             self.search_phrases.append(search_phrase)
-        self._handle_response(
-            reply_queue, self.number_of_workers, "register_search_phrase"
-        )
+        (yield reply_queue, self.number_of_workers, "register_search_phrase")
         return search_phrase
 
+    @operation
     def remove_all_search_phrases_with_label(self, label: str) -> None:
-        reply_queue = self.multiprocessing_manager.Queue()
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
             for worker_index in range(self.number_of_workers):
                 self.input_queues[worker_index].put(
                     (
                         self.worker.remove_all_search_phrases_with_label,
                         (label,),
-                        reply_queue,
+                        reply_queue.request_id,
                     ),
                     timeout=TIMEOUT_SECONDS,
                 )
@@ -551,22 +1279,27 @@ class Manager:
                 for search_phrase in self.search_phrases
                 if search_phrase.label != label
             ]
-        self._handle_response(
-            reply_queue, self.number_of_workers, "remove_all_search_phrases_with_label"
+        yield (
+            reply_queue,
+            self.number_of_workers,
+            "remove_all_search_phrases_with_label",
         )
 
+    @operation
     def remove_all_search_phrases(self) -> None:
-        reply_queue = self.multiprocessing_manager.Queue()
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
             for worker_index in range(self.number_of_workers):
                 self.input_queues[worker_index].put(
-                    (self.worker.remove_all_search_phrases, None, reply_queue),
+                    (
+                        self.worker.remove_all_search_phrases,
+                        None,
+                        reply_queue.request_id,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
             self.search_phrases = []
-        self._handle_response(
-            reply_queue, self.number_of_workers, "remove_all_search_phrases"
-        )
+        (yield reply_queue, self.number_of_workers, "remove_all_search_phrases")
 
     def list_search_phrase_labels(self) -> List[str]:
         with self.lock:
@@ -574,8 +1307,64 @@ class Manager:
                 list({search_phrase.label for search_phrase in self.search_phrases})
             )
 
+    @operation
+    def get_match_plans(self) -> List[Dict]:
+        """Returns a dictionary for each registered search phrase describing the plan used to
+        match it against the registered documents, which can help to understand the performance
+        of *match()*. Each dictionary has the keys *search_phrase_label*, *search_phrase_text*,
+        *anchor_word* and *steps*, which is a list of dictionaries with the keys *token_index*,
+        *word*, *is_root* and *posting_size* in the order in which the steps are evaluated.
+        Each worker process plans matching against its own documents, so the posting sizes
+        returned are totals across the worker processes. The plans are built by the same code
+        that *match()* uses, so the root token posting size includes any embedding-based
+        matches and only the root token is planned for search phrases with a single matchable
+        word. Search phrases whose root token is *ENTITYNOUN* are matched by examining every
+        noun and have no plan.
+        """
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            for worker_index in range(self.number_of_workers):
+                self.input_queues[worker_index].put(
+                    (self.worker.get_match_plans, None, reply_queue.request_id),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        worker_match_plan_dicts_lists = (
+            yield reply_queue, self.number_of_workers, "get_match_plans"
+        )
+        return [
+            MatchPlan.merge(match_plan_dicts).to_dict()
+            for match_plan_dicts in zip(*worker_match_plan_dicts_lists)
+        ]
+
+    @operation
+    def get_match_memo_statistics(self) -> Dict[str, int]:
+        """Returns a dictionary with the keys *word_match_hits*, *word_match_misses*,
+        *subtree_hits* and *subtree_misses* describing how often results were reused during
+        structural matching since the *Manager* was created, totalled across the worker
+        processes. Word matches are the results of comparing a search phrase word with a
+        document word, and subtree matches are the results of matching a search phrase word
+        together with all the search phrase words beneath it."""
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            for worker_index in range(self.number_of_workers):
+                self.input_queues[worker_index].put(
+                    (self.worker.get_match_memo_statistics, None, reply_queue.request_id),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        worker_statistics_list = (
+            yield reply_queue, self.number_of_workers, "get_match_memo_statistics"
+        )
+        return {
+            key: sum(worker_statistics[key] for worker_statistics in worker_statistics_list)
+            for key in worker_statistics_list[0]
+        }
+
+    @operation
     def match(
-        self, search_phrase_text: str = None, document_text: str = None
+        self,
+        search_phrase_text: str = None,
+        document_text: str = None,
+        fields: Optional[Iterable[str]] = None,
     ) -> List[Dict]:
         """Matches search phrases to documents and returns the result as match dictionaries.
 
@@ -585,8 +1374,119 @@ class Manager:
             preloaded search phrases should be used for matching.
         document_text -- a text from which to generate a document, or *None* if the preloaded
             documents should be used for matching.
+        fields -- the keys to include in each match dictionary, or *None* if all keys should be
+            included. *word_matches* includes all the keys of each word match dictionary, while
+            e.g. *word_matches.document_word* only includes the *document_word* key. The keys
+            *document* and *overall_similarity_measure* are always included. Values that are
+            not included, e.g. *sentences_within_document*, *document_phrase* and
+            *explanation*, are never determined, which makes matching faster.
         """
 
+        if fields is not None:
+            fields = list(fields)
+            StructuralMatcher.get_match_dictionary_fields(fields)
+        reply_queue, number_of_replies = self._send_match_requests(
+            self.worker.match, search_phrase_text, document_text, fields
+        )
+        worker_match_dicts_lists = (yield reply_queue, number_of_replies, "match")
+        match_dicts = []
+        for worker_match_dicts in worker_match_dicts_lists:
+            match_dicts.extend(worker_match_dicts)
+        return sorted(
+            match_dicts,
+            key=lambda match_dict: (
+                1 - float(match_dict["overall_similarity_measure"]),
+                match_dict["document"],
+            ),
+        )
+
+    def iter_matches(
+        self,
+        search_phrase_text: str = None,
+        document_text: str = None,
+        limit: int = None,
+        cursor: Optional[Iterable] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict]:
+        """Matches search phrases to documents as for *match()* and returns an iterator over
+        the match dictionaries in the same order. Each worker process only builds and returns
+        the match dictionaries that fall within the requested page, and the sorted replies from
+        the worker processes are merged rather than concatenated and sorted.
+
+        Each match dictionary has the additional key *cursor*, whose value can be passed as
+        *cursor* to a later call to continue after that match dictionary, provided the
+        registered documents and search phrases have not changed in the meantime.
+
+        Parameters:
+
+        search_phrase_text -- a text from which to generate a search phrase, or *None* if the
+            preloaded search phrases should be used for matching.
+        document_text -- a text from which to generate a document, or *None* if the preloaded
+            documents should be used for matching.
+        limit -- the maximum number of match dictionaries to return, or *None* if there is no
+            maximum.
+        cursor -- the value of the *cursor* key of the match dictionary after which to start,
+            or *None* if matches should be returned from the beginning.
+        fields -- the keys to include in each match dictionary as for *match()*, or *None* if
+            all keys should be included.
+        """
+        return self._merge_match_streams(
+            self._get_match_streams(
+                search_phrase_text, document_text, limit, cursor, fields
+            ),
+            limit,
+        )
+
+    @operation
+    def _get_match_streams(
+        self,
+        search_phrase_text: Optional[str],
+        document_text: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[Iterable],
+        fields: Optional[Iterable[str]],
+    ) -> List[List[Dict]]:
+        """Returns a sorted list of at most *limit* match dictionaries after *cursor* from each
+        worker process that takes part in matching."""
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be a positive integer.")
+        if cursor is not None:
+            cursor = tuple(cursor)
+        if fields is not None:
+            fields = list(fields)
+            StructuralMatcher.get_match_dictionary_fields(fields)
+        reply_queue, number_of_replies = self._send_match_requests(
+            self.worker.get_match_stream,
+            search_phrase_text,
+            document_text,
+            fields,
+            cursor,
+            limit,
+        )
+        return (yield reply_queue, number_of_replies, "iter_matches")
+
+    @staticmethod
+    def _merge_match_streams(
+        match_streams: List[List[Dict]], limit: Optional[int]
+    ) -> Iterator[Dict]:
+        """Merges the sorted match dictionaries returned by the worker processes. A document is
+        only ever held by a single worker process, so that ordering by cursor yields the same
+        order as *match()*."""
+        return islice(
+            heapq.merge(*match_streams, key=lambda match_dict: match_dict["cursor"]),
+            limit,
+        )
+
+    def _send_match_requests(
+        self,
+        worker_method: Callable,
+        search_phrase_text: Optional[str],
+        document_text: Optional[str],
+        *args,
+    ) -> Tuple[ReplyQueue, int]:
+        """Sends messages calling *worker_method* with a serialized document or *None*, a search
+        phrase or *None* and *args* to the worker processes that need to take part in matching
+        as for *match()*. Returns the reply queue and the number of replies to expect."""
         if search_phrase_text is not None:
             search_phrase = self._create_search_phrase(search_phrase_text, "")
         elif len(self.list_search_phrase_labels()) == 0:
@@ -597,98 +1497,190 @@ class Manager:
             search_phrase = None
         if document_text is not None:
             serialized_document = self.nlp(document_text).to_bytes()
-            with self.lock:
-                worker_indexes = {self._next_worker_queue_number()}
         else:
-            with self.lock:
+            serialized_document = None
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            if serialized_document is not None:
+                worker_indexes = {self._next_worker_queue_number()}
+            else:
                 if len(self.document_labels_to_worker_queues) == 0:
                     raise NoDocumentError(
                         "At least one document is required for matching."
                     )
                 worker_indexes = set(self.document_labels_to_worker_queues.values())
-            serialized_document = None
-        reply_queue = self.multiprocessing_manager.Queue()
-        for worker_index in worker_indexes:
-            self.input_queues[worker_index].put(
-                (self.worker.match, (serialized_document, search_phrase), reply_queue),
-                timeout=TIMEOUT_SECONDS,
-            )
-        worker_match_dicts_lists = self._handle_response(
-            reply_queue, len(worker_indexes), "match"
+            # Messages that address documents are sent while holding the lock so that a
+            # document being moved by *rebalance_documents()* is matched exactly once.
+            for worker_index in worker_indexes:
+                self.input_queues[worker_index].put(
+                    (
+                        worker_method,
+                        (serialized_document, search_phrase, *args),
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        return reply_queue, len(worker_indexes)
+
+    @operation
+    def count_matches(
+        self, search_phrase_text: str = None, document_text: str = None
+    ) -> Dict[str, int]:
+        """Matches search phrases to documents as for *match()* and returns a dictionary from
+        the labels of the documents that matched to the number of matches within each document.
+        This is considerably faster than *match()* where the matches themselves are not
+        required because no match dictionaries are built or returned from the worker processes.
+
+        Parameters:
+
+        search_phrase_text -- a text from which to generate a search phrase, or *None* if the
+            preloaded search phrases should be used for matching.
+        document_text -- a text from which to generate a document with the label *''*, or
+            *None* if the preloaded documents should be used for matching.
+        """
+        reply_queue, number_of_replies = self._send_match_requests(
+            self.worker.count_matches, search_phrase_text, document_text
         )
-        match_dicts = []
-        for worker_match_dicts in worker_match_dicts_lists:
-            match_dicts.extend(worker_match_dicts)
-        return sorted(
-            match_dicts,
-            key=lambda match_dict: (
-                1 - float(match_dict["overall_similarity_measure"]),
-                match_dict["document"],
-            ),
+        document_labels_to_counts: Dict[str, int] = {}
+        for worker_document_labels_to_counts in (
+            yield reply_queue, number_of_replies, "count_matches"
+        ):
+            document_labels_to_counts.update(worker_document_labels_to_counts)
+        return dict(sorted(document_labels_to_counts.items()))
+
+    @operation
+    def any_match(
+        self, search_phrase_text: str = None, document_text: str = None
+    ) -> bool:
+        """Returns *True* if any search phrase matches any document as for *match()*. Each
+        worker process stops matching as soon as it has found a match, and *True* is returned
+        as soon as the first worker process reports a match without waiting for the others.
+
+        Parameters:
+
+        search_phrase_text -- a text from which to generate a search phrase, or *None* if the
+            preloaded search phrases should be used for matching.
+        document_text -- a text from which to generate a document, or *None* if the preloaded
+            documents should be used for matching.
+        """
+        reply_queue, number_of_replies = self._send_match_requests(
+            self.worker.any_match, search_phrase_text, document_text
         )
+        for _ in range(number_of_replies):
+            if any((yield reply_queue, 1, "any_match")):
+                # Any later replies are discarded once the reply queue is no longer referenced.
+                return True
+        return False
+
+    @operation
+    def match_documents(
+        self,
+        document_texts: List[str],
+        search_phrase_text: str = None,
+        batch_size: int = 100,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[List[Dict]]:
+        """Matches search phrases to several documents that are not registered, e.g. chatbot
+        entries, and returns a list containing a list of match dictionaries for each document.
+        This is considerably more efficient than calling *match()* for each document because the
+        documents are spread across all the worker processes, each of which loads the spaCy model
+        the first time it is required and parses the documents assigned to it using
+        *nlp.pipe()* before matching them.
 
-    def get_corpus_frequency_information(self):
-        def merge_dicts_adding_common_values(dict1, dict2):
-            dict_to_return = {**dict1, **dict2}
-            for key in dict_to_return:
-                if key in dict1 and key in dict2:
-                    dict_to_return[key] = dict1[key] + dict2[key]
-            return dict_to_return
+        Parameters:
 
+        document_texts -- the texts from which to generate the documents.
+        search_phrase_text -- a text from which to generate a search phrase, or *None* if the
+            preloaded search phrases should be used for matching.
+        batch_size -- the maximum number of documents sent to a worker process in a single
+            message and parsed together by *nlp.pipe()*. Defaults to *100*.
+        fields -- the keys to include in each match dictionary as for *match()*, or *None* if
+            all keys should be included.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+        if fields is not None:
+            fields = list(fields)
+            StructuralMatcher.get_match_dictionary_fields(fields)
+        if search_phrase_text is not None:
+            search_phrase = self._create_search_phrase(search_phrase_text, "")
+        elif len(self.list_search_phrase_labels()) == 0:
+            raise NoSearchPhraseError(
+                "At least one search phrase is required for matching."
+            )
+        else:
+            search_phrase = None
+        document_texts = list(document_texts)
+        # Each message is sent to a different worker process in turn.
+        start_indexes = list(range(0, len(document_texts), batch_size))
+        reply_queue = self.reply_dispatcher.open_request()
         with self.lock:
-            if self.word_dictionaries_need_rebuilding:
-                reply_queue = self.multiprocessing_manager.Queue()
-                worker_frequency_dict = {}
-                worker_indexes = set(self.document_labels_to_worker_queues.values())
-                for worker_index in worker_indexes:
-                    self.input_queues[worker_index].put(
+            for start_index in start_indexes:
+                self.input_queues[self._next_worker_queue_number()].put(
+                    (
+                        self.worker.match_documents,
                         (
-                            self.worker.get_words_to_corpus_frequencies,
-                            None,
-                            reply_queue,
+                            start_index,
+                            document_texts[start_index : start_index + batch_size],
+                            search_phrase,
+                            fields,
                         ),
-                        timeout=TIMEOUT_SECONDS,
-                    )
-                exception_worker_label = None
-                for _ in range(len(worker_indexes)):
-                    worker_label, return_value, return_info = reply_queue.get(
-                        timeout=TIMEOUT_SECONDS
-                    )
-                    if isinstance(return_info, Exception):
-                        if exception_worker_label is None:
-                            exception_worker_label = worker_label
-                    else:
-                        worker_frequency_dict = merge_dicts_adding_common_values(
-                            worker_frequency_dict, return_value
-                        )
-                        if self.verbose:
-                            print(return_info)
-                    if exception_worker_label is not None:
-                        print(
-                            "".join(
-                                (
-                                    "ERROR executing get_words_to_corpus_frequencies() on ",
-                                    exception_worker_label,
-                                    ". Please examine the output from the worker processes to identify the problem.",
-                                )
-                            )
-                        )
-                self.words_to_corpus_frequencies = {}
-                for word in worker_frequency_dict:
-                    if word in self.words_to_corpus_frequencies:
-                        self.words_to_corpus_frequencies[word] += worker_frequency_dict[
-                            word
-                        ]
-                    else:
-                        self.words_to_corpus_frequencies[word] = worker_frequency_dict[
-                            word
-                        ]
-                self.maximum_corpus_frequency = max(
-                    self.words_to_corpus_frequencies.values()
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
                 )
-                self.word_dictionaries_need_rebuilding = False
-            return self.words_to_corpus_frequencies, self.maximum_corpus_frequency
+        match_dicts_lists: List[List[Dict]] = [[] for _ in document_texts]
+        for start_index, worker_match_dicts_lists in (
+            yield reply_queue, len(start_indexes), "match_documents"
+        ):
+            for index, match_dicts in enumerate(worker_match_dicts_lists):
+                match_dicts_lists[start_index + index] = sorted(
+                    match_dicts,
+                    key=lambda match_dict: 1
+                    - float(match_dict["overall_similarity_measure"]),
+                )
+        return match_dicts_lists
+
+    def _update_corpus_frequencies(
+        self, corpus_frequency_changes_list: List[Dict[str, int]]
+    ) -> None:
+        """Applies the changes to corpus frequencies returned by worker processes. Because the
+        changes are additive, the order in which replies are processed does not matter. Also
+        increments the corpus version."""
+        with self.corpus_frequency_lock:
+            self.corpus_version += 1
+            for corpus_frequency_changes in corpus_frequency_changes_list:
+                for word, change in corpus_frequency_changes.items():
+                    old_frequency = self.words_to_corpus_frequencies.get(word, 0)
+                    new_frequency = old_frequency + change
+                    if new_frequency > 0:
+                        self.words_to_corpus_frequencies[word] = new_frequency
+                    else:
+                        self.words_to_corpus_frequencies.pop(word, None)
+                    if new_frequency > self.maximum_corpus_frequency:
+                        self.maximum_corpus_frequency = new_frequency
+                    elif old_frequency == self.maximum_corpus_frequency and change < 0:
+                        self.maximum_corpus_frequency_needs_recalculating = True
+
+    def _get_maximum_corpus_frequency(self) -> int:
+        """Must be called with 'self.corpus_frequency_lock'."""
+        if self.maximum_corpus_frequency_needs_recalculating:
+            self.maximum_corpus_frequency = max(
+                self.words_to_corpus_frequencies.values(), default=0
+            )
+            self.maximum_corpus_frequency_needs_recalculating = False
+        return self.maximum_corpus_frequency
 
+    def get_corpus_frequency_information(self) -> Tuple[Dict[str, int], int]:
+        """Returns a copy of the dictionary from words to the number of times they occur in the
+        registered documents together with the highest such number."""
+        with self.corpus_frequency_lock:
+            return (
+                dict(self.words_to_corpus_frequencies),
+                self._get_maximum_corpus_frequency(),
+            )
+
+    @operation
     def topic_match_documents_against(
         self,
         text_to_match: str,
@@ -775,6 +1767,76 @@ class Manager:
         tied_result_quotient -- the quotient between a result and following results above which
             the results are interpreted as tied.
         """
+        return (
+            yield from self.topic_match_documents_against_many.__wrapped__(
+                self,
+                [text_to_match],
+                use_frequency_factor=use_frequency_factor,
+                maximum_activation_distance=maximum_activation_distance,
+                word_embedding_match_threshold=word_embedding_match_threshold,
+                initial_question_word_embedding_match_threshold=initial_question_word_embedding_match_threshold,
+                relation_score=relation_score,
+                reverse_only_relation_score=reverse_only_relation_score,
+                single_word_score=single_word_score,
+                single_word_any_tag_score=single_word_any_tag_score,
+                initial_question_word_answer_score=initial_question_word_answer_score,
+                initial_question_word_behaviour=initial_question_word_behaviour,
+                different_match_cutoff_score=different_match_cutoff_score,
+                overlapping_relation_multiplier=overlapping_relation_multiplier,
+                embedding_penalty=embedding_penalty,
+                ontology_penalty=ontology_penalty,
+                relation_matching_frequency_threshold=relation_matching_frequency_threshold,
+                embedding_matching_frequency_threshold=embedding_matching_frequency_threshold,
+                sideways_match_extent=sideways_match_extent,
+                only_one_result_per_document=only_one_result_per_document,
+                number_of_results=number_of_results,
+                document_label_filter=document_label_filter,
+                tied_result_quotient=tied_result_quotient,
+            )
+        )[0]
+
+    @operation
+    def topic_match_documents_against_many(
+        self,
+        texts_to_match: List[str],
+        *,
+        use_frequency_factor: bool = True,
+        maximum_activation_distance: int = 75,
+        word_embedding_match_threshold: float = 0.8,
+        initial_question_word_embedding_match_threshold: float = 0.7,
+        relation_score: int = 300,
+        reverse_only_relation_score: int = 200,
+        single_word_score: int = 50,
+        single_word_any_tag_score: int = 20,
+        initial_question_word_answer_score: int = 600,
+        initial_question_word_behaviour: Literal[
+            "process", "exclusive", "ignore"
+        ] = "process",
+        different_match_cutoff_score: int = 15,
+        overlapping_relation_multiplier: float = 1.5,
+        embedding_penalty: float = 0.6,
+        ontology_penalty: float = 0.9,
+        relation_matching_frequency_threshold: float = 0.25,
+        embedding_matching_frequency_threshold: float = 0.5,
+        sideways_match_extent: int = 100,
+        only_one_result_per_document: bool = False,
+        number_of_results: int = 10,
+        document_label_filter: str = None,
+        tied_result_quotient: float = 0.9
+    ) -> List[List[Dict]]:
+        """Topic matches several texts against the loaded documents and returns a list
+        containing a list of topic match dictionaries for each text. This is considerably more
+        efficient than calling *topic_match_documents_against()* for each text: each worker
+        process receives a single message for all the texts and phraselets that are shared
+        between texts are only matched once.
+
+        Properties:
+
+        texts_to_match -- the texts to match against the loaded documents.
+
+        The other properties are as for *topic_match_documents_against()* and apply to all
+        the texts.
+        """
         if word_embedding_match_threshold < 0.0 or word_embedding_match_threshold > 1.0:
             raise ValueError("word_embedding_match_threshold must be between 0 and 1")
         if (
@@ -842,77 +1904,375 @@ class Manager:
         with self.lock:
             if len(self.document_labels_to_worker_queues) == 0:
                 raise NoDocumentError("At least one document is required for matching.")
-        (
-            words_to_corpus_frequencies,
-            maximum_corpus_frequency,
-        ) = self.get_corpus_frequency_information()
-
-        reply_queue = self.multiprocessing_manager.Queue()
-        text_to_match_doc = self.semantic_analyzer.parse(text_to_match)
-        phraselet_labels_to_phraselet_infos = (
-            self.linguistic_object_factory.get_phraselet_labels_to_phraselet_infos(
-                text_to_match_doc=text_to_match_doc,
-                words_to_corpus_frequencies=words_to_corpus_frequencies,
-                maximum_corpus_frequency=maximum_corpus_frequency,
-                process_initial_question_words=initial_question_word_behaviour
-                in ("process", "exclusive"),
+        topic_match_dictss: List[Optional[List[Dict]]] = [None] * len(texts_to_match)
+        if self.topic_match_cache is not None:
+            with self.corpus_frequency_lock:
+                corpus_version = self.corpus_version
+            # Results are stored under the corpus version read before matching starts. If
+            # documents are registered or removed in the meantime, the results are never used.
+            cache_keys = [
+                (
+                    corpus_version,
+                    " ".join(text_to_match.split()),
+                    use_frequency_factor,
+                    maximum_activation_distance,
+                    word_embedding_match_threshold,
+                    initial_question_word_embedding_match_threshold,
+                    relation_score,
+                    reverse_only_relation_score,
+                    single_word_score,
+                    single_word_any_tag_score,
+                    initial_question_word_answer_score,
+                    initial_question_word_behaviour,
+                    different_match_cutoff_score,
+                    overlapping_relation_multiplier,
+                    embedding_penalty,
+                    ontology_penalty,
+                    relation_matching_frequency_threshold,
+                    embedding_matching_frequency_threshold,
+                    sideways_match_extent,
+                    only_one_result_per_document,
+                    number_of_results,
+                    document_label_filter,
+                    tied_result_quotient,
+                )
+                for text_to_match in texts_to_match
+            ]
+            for index, cache_key in enumerate(cache_keys):
+                cached_topic_match_dicts = self.topic_match_cache.get(cache_key)
+                if cached_topic_match_dicts is not None:
+                    topic_match_dictss[index] = deepcopy(cached_topic_match_dicts)
+        indexes_to_match = [
+            index
+            for index, topic_match_dicts in enumerate(topic_match_dictss)
+            if topic_match_dicts is None
+        ]
+        text_to_match_docs = list(
+            self.semantic_analyzer.nlp.pipe(
+                texts_to_match[index] for index in indexes_to_match
             )
         )
-        if len(phraselet_labels_to_phraselet_infos) == 0:
-            return []
-        phraselet_labels_to_search_phrases = (
-            self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
-                list(phraselet_labels_to_phraselet_infos.values()),
-                relation_matching_frequency_threshold,
+        # The corpus frequencies are read under their own lock so that concurrent document
+        # registrations cannot change them while the phraselets are being weighted.
+        with self.corpus_frequency_lock:
+            phraselet_labels_to_phraselet_infoss = [
+                self.linguistic_object_factory.get_phraselet_labels_to_phraselet_infos(
+                    text_to_match_doc=text_to_match_doc,
+                    words_to_corpus_frequencies=self.words_to_corpus_frequencies,
+                    maximum_corpus_frequency=self._get_maximum_corpus_frequency(),
+                    process_initial_question_words=initial_question_word_behaviour
+                    in ("process", "exclusive"),
+                )
+                for text_to_match_doc in text_to_match_docs
+            ]
+        # Equal phraselet infos from different texts share a single search phrase object.
+        phraselet_infos_to_search_phrases: Dict[PhraseletInfo, SearchPhrase] = {}
+        indexes_and_texts_and_phraselets = []
+        for index, phraselet_labels_to_phraselet_infos in zip(
+            indexes_to_match, phraselet_labels_to_phraselet_infoss
+        ):
+            if len(phraselet_labels_to_phraselet_infos) == 0:
+                topic_match_dictss[index] = []
+                if self.topic_match_cache is not None:
+                    self.topic_match_cache.put(cache_keys[index], [])
+                continue
+            new_phraselet_infos = [
+                phraselet_info
+                for phraselet_info in phraselet_labels_to_phraselet_infos.values()
+                if phraselet_info not in phraselet_infos_to_search_phrases
+            ]
+            new_phraselet_labels_to_search_phrases = (
+                self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
+                    new_phraselet_infos,
+                    relation_matching_frequency_threshold,
+                )
             )
-        )
-        for search_phrase in phraselet_labels_to_search_phrases.values():
-            search_phrase.pack()
-
-        worker_indexes = set(self.document_labels_to_worker_queues.values())
-        for worker_index in worker_indexes:
-            self.input_queues[worker_index].put(
+            for phraselet_info in new_phraselet_infos:
+                search_phrase = new_phraselet_labels_to_search_phrases[
+                    phraselet_info.label
+                ]
+                search_phrase.pack()
+                phraselet_infos_to_search_phrases[phraselet_info] = search_phrase
+            indexes_and_texts_and_phraselets.append(
                 (
-                    self.worker.get_topic_matches,
+                    index,
                     (
-                        text_to_match,
+                        texts_to_match[index],
                         phraselet_labels_to_phraselet_infos,
-                        phraselet_labels_to_search_phrases,
-                        maximum_activation_distance,
-                        overall_similarity_threshold,
-                        initial_question_word_overall_similarity_threshold,
-                        relation_score,
-                        reverse_only_relation_score,
-                        single_word_score,
-                        single_word_any_tag_score,
-                        initial_question_word_answer_score,
-                        initial_question_word_behaviour,
-                        different_match_cutoff_score,
-                        overlapping_relation_multiplier,
-                        embedding_penalty,
-                        ontology_penalty,
-                        relation_matching_frequency_threshold,
-                        embedding_matching_frequency_threshold,
-                        sideways_match_extent,
-                        only_one_result_per_document,
-                        number_of_results,
-                        document_label_filter,
-                        use_frequency_factor,
+                        {
+                            label: phraselet_infos_to_search_phrases[phraselet_info]
+                            for label, phraselet_info in phraselet_labels_to_phraselet_infos.items()
+                        },
                     ),
-                    reply_queue,
-                ),
-                timeout=TIMEOUT_SECONDS,
+                )
             )
-        worker_topic_match_dictss = self._handle_response(
-            reply_queue, len(worker_indexes), "match"
+        if len(indexes_and_texts_and_phraselets) == 0:
+            return topic_match_dictss
+
+        topic_matching_args = (
+            [
+                texts_and_phraselets
+                for _, texts_and_phraselets in indexes_and_texts_and_phraselets
+            ],
+            maximum_activation_distance,
+            overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold,
+            relation_score,
+            reverse_only_relation_score,
+            single_word_score,
+            single_word_any_tag_score,
+            initial_question_word_answer_score,
+            initial_question_word_behaviour,
+            different_match_cutoff_score,
+            overlapping_relation_multiplier,
+            embedding_penalty,
+            ontology_penalty,
+            relation_matching_frequency_threshold,
+            embedding_matching_frequency_threshold,
+            sideways_match_extent,
+            only_one_result_per_document,
+            number_of_results,
+            document_label_filter,
+            use_frequency_factor,
+        )
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            worker_indexes = set(self.document_labels_to_worker_queues.values())
+            if document_label_filter is not None:
+                routed_worker_indexes = (
+                    self.placement_policy.get_worker_indexes_for_labels_starting(
+                        document_label_filter, self.number_of_workers
+                    )
+                )
+                if routed_worker_indexes is not None:
+                    worker_indexes.intersection_update(routed_worker_indexes)
+            # Where several worker processes take part, each first returns compact summaries
+            # and only the topic matches that make it into the overall results are then
+            # converted into dictionaries by the worker processes that found them.
+            select_topic_matches = len(worker_indexes) > 1
+            for worker_index in worker_indexes:
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.get_topic_match_summaries,
+                        (reply_queue.request_id, worker_index, *topic_matching_args),
+                        reply_queue.request_id,
+                    )
+                    if select_topic_matches
+                    else (
+                        self.worker.get_topic_matches,
+                        topic_matching_args,
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        if select_topic_matches:
+            worker_topic_match_dictsss = yield from self._get_selected_topic_matches(
+                reply_queue,
+                worker_indexes,
+                topic_matching_args,
+                number_of_results,
+            )
+        else:
+            worker_topic_match_dictsss = (
+                yield reply_queue,
+                len(worker_indexes),
+                "match",
+            )
+        for position, (index, _) in enumerate(indexes_and_texts_and_phraselets):
+            topic_match_dicts = []
+            for worker_topic_match_dictss in worker_topic_match_dictsss:
+                topic_match_dicts.extend(worker_topic_match_dictss[position])
+            ordered_topic_match_dicts = TopicMatchDictionaryOrderer().order(
+                topic_match_dicts, number_of_results, tied_result_quotient
+            )
+            if self.topic_match_cache is not None:
+                self.topic_match_cache.put(
+                    cache_keys[index], deepcopy(ordered_topic_match_dicts)
+                )
+            topic_match_dictss[index] = ordered_topic_match_dicts
+        return topic_match_dictss
+
+    def _get_selected_topic_matches(
+        self,
+        reply_queue: ReplyQueue,
+        requested_worker_indexes: Set[int],
+        topic_matching_args: Tuple,
+        number_of_results: int,
+    ) -> Generator:
+        """Receives the topic match summaries requested by *topic_match_documents_against_many()*
+        from the worker processes at *requested_worker_indexes*, selects the summaries of the
+        topic matches that can make it into the overall results for each text and requests the
+        corresponding topic match dictionaries from the worker processes that found them. Worker
+        processes that found none of the selected topic matches are told to discard their topic
+        matchers, as are all the worker processes if the request fails or is cancelled before
+        the summaries have been received. Returns a list of topic match dictionaries for each
+        text from each worker process in the order in which the worker processes returned their
+        summaries, which is the order in which their dictionaries would otherwise have been
+        processed."""
+        summaries_received = False
+        try:
+            worker_indexes_and_corpus_versions_and_topic_match_summariess = (
+                yield reply_queue,
+                len(requested_worker_indexes),
+                "match",
+            )
+            summaries_received = True
+        finally:
+            if not summaries_received:
+                self._discard_topic_matchers(
+                    reply_queue.request_id, requested_worker_indexes
+                )
+        worker_indexes_and_topic_match_summariess = [
+            (worker_index, topic_match_summariess)
+            for worker_index, _, topic_match_summariess in worker_indexes_and_corpus_versions_and_topic_match_summariess
+        ]
+        worker_indexes_to_corpus_versions = {
+            worker_index: corpus_version
+            for worker_index, corpus_version, _ in worker_indexes_and_corpus_versions_and_topic_match_summariess
+        }
+        worker_indexes = [
+            worker_index
+            for worker_index, _ in worker_indexes_and_topic_match_summariess
+        ]
+        worker_indexes_to_topic_match_indexess: Dict[int, List[List[int]]] = {
+            worker_index: [[] for _ in topic_matching_args[0]]
+            for worker_index in worker_indexes
+        }
+        for position in range(len(topic_matching_args[0])):
+            topic_match_summaries_and_worker_indexes = [
+                (topic_match_summary, worker_index)
+                for worker_index, topic_match_summariess in worker_indexes_and_topic_match_summariess
+                for topic_match_summary in topic_match_summariess[position]
+            ]
+            selected_topic_match_summaries = {
+                id(topic_match_summary)
+                for topic_match_summary in TopicMatchDictionaryOrderer().select(
+                    [
+                        topic_match_summary
+                        for topic_match_summary, _ in topic_match_summaries_and_worker_indexes
+                    ],
+                    number_of_results,
+                )
+            }
+            for (
+                topic_match_summary,
+                worker_index,
+            ) in topic_match_summaries_and_worker_indexes:
+                if id(topic_match_summary) in selected_topic_match_summaries:
+                    worker_indexes_to_topic_match_indexess[worker_index][
+                        position
+                    ].append(topic_match_summary[-1])
+        summaries_request_id = reply_queue.request_id
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            for worker_index in worker_indexes:
+                topic_match_indexess = worker_indexes_to_topic_match_indexess[
+                    worker_index
+                ]
+                # Worker processes that found selected topic matches also receive the arguments
+                # so that they can repeat the matching if they have discarded their topic
+                # matchers and their documents have not changed in the meantime.
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.get_selected_topic_matches,
+                        (
+                            summaries_request_id,
+                            worker_index,
+                            topic_match_indexess,
+                            topic_matching_args
+                            if any(
+                                len(topic_match_indexes) > 0
+                                for topic_match_indexes in topic_match_indexess
+                            )
+                            else None,
+                            worker_indexes_to_corpus_versions[worker_index],
+                        ),
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        worker_indexes_to_topic_match_dictss = dict(
+            (yield reply_queue, len(worker_indexes), "match")
         )
-        topic_match_dicts = []
-        for worker_topic_match_dicts in worker_topic_match_dictss:
-            if worker_topic_match_dicts is not None:
-                topic_match_dicts.extend(worker_topic_match_dicts)
-        return TopicMatchDictionaryOrderer().order(
-            topic_match_dicts, number_of_results, tied_result_quotient
+        if None in worker_indexes_to_topic_match_dictss.values():
+            # A worker process could no longer return the topic matches it summarized, so the
+            # topic matching is repeated with each worker process returning all its topic
+            # match dictionaries.
+            reply_queue = self.reply_dispatcher.open_request()
+            with self.lock:
+                for worker_index in requested_worker_indexes:
+                    self.input_queues[worker_index].put(
+                        (
+                            self.worker.get_topic_matches,
+                            topic_matching_args,
+                            reply_queue.request_id,
+                        ),
+                        timeout=TIMEOUT_SECONDS,
+                    )
+            return (yield reply_queue, len(requested_worker_indexes), "match")
+        return [
+            worker_indexes_to_topic_match_dictss[worker_index]
+            for worker_index in worker_indexes
+            if worker_index in worker_indexes_to_topic_match_dictss
+        ]
+
+    def _discard_topic_matchers(
+        self, summaries_request_id: int, worker_indexes: Iterable[int]
+    ) -> None:
+        """Tells the worker processes at *worker_indexes* to discard any topic matchers they
+        have retained for *summaries_request_id*. No replies are awaited."""
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            for worker_index in worker_indexes:
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.discard_topic_matchers,
+                        (summaries_request_id,),
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+
+    @operation
+    def get_phraselet_match_cache_statistics(self) -> Optional[List[Dict[str, int]]]:
+        """Returns a list containing a dictionary for each worker process with the keys *hits*,
+        *misses*, *evictions*, *invalidations*, *size* and *maximum_size* describing the use of
+        the cache of phraselet matches retained by that worker process, or *None* if
+        *phraselet_match_cache_size* was *0* or *use_shared_document_arena* was *True*.
+        *invalidations* is the number of entries discarded because documents were registered
+        that might contain further matches."""
+        reply_queue = self.reply_dispatcher.open_request()
+        with self.lock:
+            for worker_index in range(self.number_of_workers):
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.get_phraselet_match_cache_statistics,
+                        (worker_index,),
+                        reply_queue.request_id,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        worker_indexes_to_statistics = dict(
+            (
+                yield reply_queue,
+                self.number_of_workers,
+                "get_phraselet_match_cache_statistics",
+            )
         )
+        if worker_indexes_to_statistics[0] is None:
+            return None
+        return [
+            worker_indexes_to_statistics[worker_index]
+            for worker_index in range(self.number_of_workers)
+        ]
+
+    def get_topic_match_cache_statistics(self) -> Optional[Dict[str, int]]:
+        """Returns a dictionary with the keys *hits*, *misses*, *evictions*, *size* and
+        *maximum_size* describing the use of the cache of topic match results, or *None* if
+        *topic_match_cache_size* was *0*."""
+        if self.topic_match_cache is None:
+            return None
+        return self.topic_match_cache.get_statistics()
 
     def get_supervised_topic_training_basis(
         self,
@@ -1014,6 +2374,8 @@ class Manager:
         """Terminates the worker processes."""
         for worker in self.workers:
             worker.terminate()
+        if self.document_arena is not None:
+            self.document_arena.close()
 
 
 class Worker:
@@ -1025,10 +2387,16 @@ class Worker:
         overall_similarity_threshold,
         entity_label_to_vector_dict,
         vocab,
+        model,
         model_name,
         serialized_document_version,
         input_queue,
+        reply_connection,
         worker_label,
+        document_arena_path,
+        arena_document_cache_size,
+        phraselet_match_cache_size,
+        use_relation_index,
     ):
         state = {
             "structural_matcher": structural_matcher,
@@ -1038,38 +2406,118 @@ class Worker:
             "overall_similarity_threshold": overall_similarity_threshold,
             "entity_label_to_vector_dict": entity_label_to_vector_dict,
             "vocab": vocab,
+            "model": model,
+            "nlp": None,
             "model_name": model_name,
             "serialized_document_version": serialized_document_version,
-            "document_labels_to_documents": {},
-            "reverse_dict": {},
-            "search_phrases": [],
+            "document_labels_to_documents": ArenaDocumentDictionary(
+                document_arena_path,
+                lambda serialized_doc: Doc(vocab).from_bytes(serialized_doc),
+                arena_document_cache_size,
+            )
+            if document_arena_path is not None
+            else {},
+            "reverse_dict": ReverseDictionary(),
+            "relation_index": RelationIndex() if use_relation_index else None,
+            "vocabulary_vector_matrix": self.get_new_vocabulary_vector_matrix(
+                structural_matcher, overall_similarity_threshold
+            ),
+            "search_phrase_index": self.get_new_search_phrase_index(
+                structural_matcher, overall_similarity_threshold
+            ),
+            "pending_topic_matchers": {},
+            # Incremented whenever documents are registered or removed.
+            "corpus_version": 0,
+            # Matches refer to the document objects they were found in, so they cannot be
+            # retained when documents are deserialized afresh from the shared arena.
+            "phraselet_match_cache": PhraseletMatchCache(phraselet_match_cache_size)
+            if phraselet_match_cache_size > 0 and document_arena_path is None
+            else None,
         }
         HolmesBroker.set_extensions()
         while True:
-            method, args, reply_queue = input_queue.get()
+            method, args, request_id = input_queue.get()
             try:
                 if args is not None:
                     return_value, return_info = method(state, *args)
                 else:
                     return_value, return_info = method(state)
-                reply_queue.put(
-                    (worker_label, return_value, return_info), timeout=TIMEOUT_SECONDS
+                reply_connection.send(
+                    (request_id, worker_label, return_value, return_info)
                 )
             except Exception as err:
                 print("Exception calling", method)
                 print("String arguments:", [arg for arg in args if type(arg) == str])
                 print(worker_label, " - error:")
                 print(traceback.format_exc())
-                reply_queue.put((worker_label, None, err), timeout=TIMEOUT_SECONDS)
+                reply_connection.send((request_id, worker_label, None, err))
             except:
                 print("Exception calling", str(method))
                 print("String arguments:", [arg for arg in args if type(arg) == str])
                 print(worker_label, " - error:")
                 print(traceback.format_exc())
                 err_identifier = str(sys.exc_info()[0])
-                reply_queue.put(
-                    (worker_label, None, err_identifier), timeout=TIMEOUT_SECONDS
-                )
+                reply_connection.send((request_id, worker_label, None, err_identifier))
+
+    def get_new_vocabulary_vector_matrix(
+        self, structural_matcher, overall_similarity_threshold
+    ):
+        if (
+            structural_matcher.embedding_based_matching_on_root_words
+            and overall_similarity_threshold < 1.0
+        ):
+            return VocabularyVectorMatrix(structural_matcher.semantic_matching_helper)
+        return None
+
+    def get_new_search_phrase_index(
+        self, structural_matcher, overall_similarity_threshold
+    ):
+        return SearchPhraseIndex(
+            structural_matcher.semantic_matching_helper,
+            structural_matcher.embedding_based_matching_on_root_words
+            and overall_similarity_threshold < 1.0,
+        )
+
+    def update_for_registered_document(self, state, doc, document_label):
+        state["corpus_version"] += 1
+        if state["relation_index"] is not None:
+            state["relation_index"].add_document(
+                state["reverse_dict"].document_labels_to_ids[document_label],
+                state["structural_matcher"].get_relation_triples(
+                    doc, document_label, state["reverse_dict"]
+                ),
+            )
+        words = state["reverse_dict"].get_words(document_label)
+        self.update_vocabulary_vector_matrix(state, words)
+        if state["phraselet_match_cache"] is not None:
+            state["phraselet_match_cache"].register_document(words)
+
+    def update_vocabulary_vector_matrix(self, state, words):
+        if state["vocabulary_vector_matrix"] is not None:
+            state["vocabulary_vector_matrix"].update(
+                state["reverse_dict"], state["document_labels_to_documents"], words
+            )
+
+    def load_nlp(self, state):
+        """Loads the spaCy model the first time the worker process is asked to parse documents."""
+        if state["nlp"] is None:
+            nlp = get_nlp(state["model"])
+            with pipeline_components_lock:
+                if not nlp.has_pipe("coreferee"):
+                    nlp.add_pipe("coreferee")
+                if not nlp.has_pipe("holmes"):
+                    nlp.add_pipe("holmes")
+            state["nlp"] = nlp
+        return state["nlp"]
+
+    def get_corpus_frequency_changes(self, words_to_entry_counts, sign):
+        """Returns the changes to the corpus frequencies held by *Manager* that result from
+        adding (*sign* = 1) or removing (*sign* = -1) entries from the reverse dictionary."""
+        return {
+            word: sign * entry_count
+            for word, entry_count in words_to_entry_counts.items()
+            if word not in punctuation
+        }
 
     def load_document(self, state, serialized_doc, document_label, reverse_dict):
         doc = Doc(state["vocab"]).from_bytes(serialized_doc)
@@ -1089,102 +2537,229 @@ class Worker:
                     )
                 )
             )
-        state["document_labels_to_documents"][document_label] = doc
         state["structural_matcher"].semantic_matching_helper.add_to_reverse_dict(
             reverse_dict, doc, document_label
         )
         return doc
 
     def register_serialized_document(self, state, serialized_doc, document_label):
-        self.load_document(state, serialized_doc, document_label, state["reverse_dict"])
-        return None, " ".join(("Registered document", document_label))
-
-    def remove_document(self, state, document_label):
-        state["document_labels_to_documents"].pop(document_label)
-        state["reverse_dict"] = state[
-            "structural_matcher"
-        ].semantic_matching_helper.get_reverse_dict_removing_document(
-            state["reverse_dict"], document_label
+        doc = self.load_document(
+            state, serialized_doc, document_label, state["reverse_dict"]
+        )
+        state["document_labels_to_documents"][document_label] = doc
+        self.update_for_registered_document(state, doc, document_label)
+        return self.get_corpus_frequency_changes(
+            state["reverse_dict"].get_word_frequencies(document_label), 1
+        ), " ".join(("Registered document", document_label))
+
+    def parse_and_register_documents(self, state, labels_and_texts):
+        corpus_frequency_changes: Dict[str, int] = {}
+        docs = self.load_nlp(state).pipe(
+            (document_text for _, document_text in labels_and_texts),
+            batch_size=len(labels_and_texts),
+        )
+        registered_labels = []
+        try:
+            for (document_label, _), doc in zip(labels_and_texts, docs):
+                state["document_labels_to_documents"][document_label] = doc
+                registered_labels.append(document_label)
+                state[
+                    "structural_matcher"
+                ].semantic_matching_helper.add_to_reverse_dict(
+                    state["reverse_dict"], doc, document_label
+                )
+                self.update_for_registered_document(state, doc, document_label)
+                for word, change in self.get_corpus_frequency_changes(
+                    state["reverse_dict"].get_word_frequencies(document_label), 1
+                ).items():
+                    corpus_frequency_changes[word] = (
+                        corpus_frequency_changes.get(word, 0) + change
+                    )
+        except Exception:
+            # The whole batch is rolled back because the manager forgets all its documents.
+            self.remove_documents(state, registered_labels)
+            raise
+        return (
+            {
+                document_label: len(state["document_labels_to_documents"][document_label])
+                for document_label, _ in labels_and_texts
+            },
+            corpus_frequency_changes,
+        ), " ".join(("Parsed and registered", str(len(labels_and_texts)), "documents"))
+
+    def parse_documents(self, state, labels_and_texts):
+        docs = self.load_nlp(state).pipe(
+            (document_text for _, document_text in labels_and_texts),
+            batch_size=len(labels_and_texts),
+        )
+        return [
+            (document_label, doc.to_bytes())
+            for (document_label, _), doc in zip(labels_and_texts, docs)
+        ], " ".join(("Parsed", str(len(labels_and_texts)), "documents"))
+
+    def register_arena_document(self, state, location, document_label):
+        doc = self.load_document(
+            state,
+            state["document_labels_to_documents"].read(location),
+            document_label,
+            state["reverse_dict"],
+        )
+        state["document_labels_to_documents"].add(document_label, location, doc)
+        self.update_for_registered_document(state, doc, document_label)
+        return self.get_corpus_frequency_changes(
+            state["reverse_dict"].get_word_frequencies(document_label), 1
+        ), " ".join(("Registered document", document_label))
+
+    def remove_documents(self, state, document_labels):
+        for document_label in document_labels:
+            del state["document_labels_to_documents"][document_label]
+        if state["relation_index"] is not None:
+            state["relation_index"].remove_documents(
+                state["reverse_dict"].document_labels_to_ids[document_label]
+                for document_label in document_labels
+                if document_label in state["reverse_dict"].document_labels_to_ids
+            )
+        words_to_removed_entry_counts = state["reverse_dict"].remove_documents(
+            document_labels
         )
-        return None, " ".join(("Removed document", document_label))
+        self.update_vocabulary_vector_matrix(state, words_to_removed_entry_counts)
+        if state["phraselet_match_cache"] is not None:
+            state["phraselet_match_cache"].remove_documents(document_labels)
+        state["corpus_version"] += 1
+        return self.get_corpus_frequency_changes(
+            words_to_removed_entry_counts, -1
+        ), " ".join(("Removed", str(len(document_labels)), "documents"))
 
     def remove_all_documents(self, state, labels_starting):
         if len(labels_starting) == 0:
-            state["document_labels_to_documents"] = {}
-            state["reverse_dict"] = {}
-            return None, "Removed all documents"
+            corpus_frequency_changes = self.get_corpus_frequency_changes(
+                {
+                    word: len(position_keys)
+                    for word, position_keys in state["reverse_dict"].items()
+                },
+                -1,
+            )
+            state["document_labels_to_documents"].clear()
+            state["reverse_dict"] = ReverseDictionary()
+            if state["relation_index"] is not None:
+                state["relation_index"] = RelationIndex()
+            state["vocabulary_vector_matrix"] = self.get_new_vocabulary_vector_matrix(
+                state["structural_matcher"], state["overall_similarity_threshold"]
+            )
+            if state["phraselet_match_cache"] is not None:
+                state["phraselet_match_cache"].clear()
+            state["corpus_version"] += 1
+            return corpus_frequency_changes, "Removed all documents"
         else:
             labels_to_remove = [
                 label
                 for label in state["document_labels_to_documents"].keys()
                 if label.startswith(labels_starting)
             ]
-            state["document_labels_to_documents"] = {
-                key: value
-                for key, value in state["document_labels_to_documents"].items()
-                if key not in labels_to_remove
-            }
-            for label_to_remove in labels_to_remove:
-                state["reverse_dict"] = state[
-                    "structural_matcher"
-                ].semantic_matching_helper.get_reverse_dict_removing_document(
-                    state["reverse_dict"], label_to_remove
-                )
-            return None, " ".join(
+            corpus_frequency_changes, _ = self.remove_documents(
+                state, labels_to_remove
+            )
+            return corpus_frequency_changes, " ".join(
                 ("Removed all documents with labels beginning", labels_starting)
             )
 
     def get_serialized_document(self, state, label):
-        if label in state["document_labels_to_documents"]:
-            return state["document_labels_to_documents"][label].to_bytes(), " ".join(
-                ("Returned serialized document with label", label)
-            )
-        else:
+        documents = state["document_labels_to_documents"]
+        if label not in documents:
             return None, " ".join(("No document found with label", label))
+        if isinstance(documents, ArenaDocumentDictionary):
+            serialized_document = documents.get_serialized_document(label)
+        else:
+            serialized_document = documents[label].to_bytes()
+        return serialized_document, " ".join(
+            ("Returned serialized document with label", label)
+        )
 
     def register_search_phrase(self, state, search_phrase):
         search_phrase.unpack(state["vocab"])
-        state["search_phrases"].append(search_phrase)
+        state["search_phrase_index"].add(search_phrase)
         return None, " ".join(
             ("Registered search phrase with label", search_phrase.label)
         )
 
     def remove_all_search_phrases_with_label(self, state, label):
-        state["search_phrases"] = [
-            search_phrase
-            for search_phrase in state["search_phrases"]
-            if search_phrase.label != label
-        ]
+        search_phrase_index = self.get_new_search_phrase_index(
+            state["structural_matcher"], state["overall_similarity_threshold"]
+        )
+        for search_phrase in state["search_phrase_index"].search_phrases:
+            if search_phrase.label != label:
+                search_phrase_index.add(search_phrase)
+        state["search_phrase_index"] = search_phrase_index
         return None, " ".join(("Removed all search phrases with label '", label, "'"))
 
     def remove_all_search_phrases(self, state):
-        state["search_phrases"] = []
+        state["search_phrase_index"] = self.get_new_search_phrase_index(
+            state["structural_matcher"], state["overall_similarity_threshold"]
+        )
         return None, "Removed all search phrases"
 
-    def get_words_to_corpus_frequencies(self, state):
-        words_to_corpus_frequencies = {}
-        for word, cwps in state["reverse_dict"].items():
-            if word in punctuation:
-                continue
-            if word in words_to_corpus_frequencies:
-                words_to_corpus_frequencies[word] += len(set(cwps))
-            else:
-                words_to_corpus_frequencies[word] = len(set(cwps))
-        return words_to_corpus_frequencies, "Retrieved words to corpus frequencies"
+    def get_match_plans(self, state):
+        match_plans: List[MatchPlan] = []
+        self.find_matches(state, None, None, False, match_plans=match_plans)
+        return [
+            match_plan.to_dict() for match_plan in match_plans
+        ], "Returned match plans"
 
-    def match(self, state, serialized_doc, search_phrase):
+    def get_phraselet_match_cache_statistics(self, state, worker_index):
+        if state["phraselet_match_cache"] is None:
+            return (worker_index, None), "Phraselet match cache is disabled"
+        return (
+            worker_index,
+            state["phraselet_match_cache"].get_statistics(),
+        ), "Returned phraselet match cache statistics"
+
+    def get_match_memo_statistics(self, state):
+        return (
+            dict(state["structural_matcher"].match_memo_statistics),
+            "Returned match memo statistics",
+        )
+
+    def find_matches(
+        self,
+        state,
+        serialized_doc,
+        search_phrase,
+        stop_at_first_match,
+        doc=None,
+        match_plans=None,
+    ):
+        """Returns the matches for *Manager.match()*, *Manager.count_matches()* and
+        *Manager.any_match()*, or *None* if there are no stored objects to match against. If
+        *stop_at_first_match* is *True*, at most one match is returned. A document parsed
+        within the worker process may be passed as *doc* instead of *serialized_doc*. If
+        *match_plans* is a list, the plans that matching would follow are appended to it
+        instead, even if there are no stored documents."""
         if serialized_doc is not None:
-            reverse_dict = {}
+            reverse_dict = ReverseDictionary()
             doc = self.load_document(state, serialized_doc, "", reverse_dict)
+        elif doc is not None:
+            reverse_dict = ReverseDictionary()
+            state["structural_matcher"].semantic_matching_helper.add_to_reverse_dict(
+                reverse_dict, doc, ""
+            )
+        if doc is not None:
             document_labels_to_documents = {"": doc}
         else:
             reverse_dict = state["reverse_dict"]
             document_labels_to_documents = state["document_labels_to_documents"]
-        search_phrases = (
-            [search_phrase] if search_phrase is not None else state["search_phrases"]
-        )
-        if len(document_labels_to_documents) > 0 and len(search_phrases) > 0:
-            matches = state["structural_matcher"].match(
+        if search_phrase is not None:
+            search_phrases = [search_phrase]
+        elif doc is not None:
+            # Only the search phrases whose root tokens can match a word in the document.
+            search_phrases = state["search_phrase_index"].get_search_phrases_to_match(
+                reverse_dict
+            )
+        else:
+            search_phrases = state["search_phrase_index"].search_phrases
+        if (
+            len(document_labels_to_documents) > 0 or match_plans is not None
+        ) and len(search_phrases) > 0:
+            return state["structural_matcher"].match(
                 word_matching_strategies=state["word_matching_strategies"],
                 document_labels_to_documents=document_labels_to_documents,
                 reverse_dict=reverse_dict,
@@ -1199,20 +2774,99 @@ class Worker:
                 process_initial_question_words=False,
                 overall_similarity_threshold=state["overall_similarity_threshold"],
                 initial_question_word_overall_similarity_threshold=1.0,
-            )
-            return (
-                state["structural_matcher"].build_match_dictionaries(matches),
-                "Returned matches",
+                vocabulary_vector_matrix=state["vocabulary_vector_matrix"]
+                if doc is None
+                else None,
+                stop_at_first_match=stop_at_first_match,
+                relation_index=state["relation_index"] if doc is None else None,
+                match_plans=match_plans,
             )
         else:
+            return None
+
+    def match(self, state, serialized_doc, search_phrase, fields, doc=None):
+        matches = self.find_matches(state, serialized_doc, search_phrase, False, doc)
+        if matches is None:
             return [], "No stored objects to match against"
+        return (
+            state["structural_matcher"].build_match_dictionaries(matches, fields),
+            "Returned matches",
+        )
 
-    def get_topic_matches(
+    def get_match_stream(
+        self, state, serialized_doc, search_phrase, fields, cursor, limit
+    ):
+        """Returns a list of at most *limit* match dictionaries for the matches after *cursor*
+        in the order in which *StructuralMatcher.match()* returns them. The cursor of each match
+        is its sort key together with the number of preceding matches with the same sort key,
+        which makes cursors unique and ordered in the same way as the matches."""
+        matches = self.find_matches(state, serialized_doc, search_phrase, False)
+        if matches is None:
+            return [], "No stored objects to match against"
+        matches_to_return = []
+        match_cursors = []
+        previous_sort_key = None
+        rank = 0
+        for match in matches:
+            sort_key = (
+                1 - float(match.overall_similarity_measure),
+                match.document_label,
+                match.index_within_document,
+            )
+            if sort_key == previous_sort_key:
+                rank += 1
+            else:
+                rank = 0
+                previous_sort_key = sort_key
+            match_cursor = (*sort_key, rank)
+            if cursor is not None and match_cursor <= cursor:
+                continue
+            matches_to_return.append(match)
+            match_cursors.append(match_cursor)
+            if limit is not None and len(matches_to_return) == limit:
+                break
+        match_dicts = state["structural_matcher"].build_match_dictionaries(
+            matches_to_return, fields
+        )
+        for match_dict, match_cursor in zip(match_dicts, match_cursors):
+            match_dict["cursor"] = match_cursor
+        return match_dicts, "Returned matches"
+
+    def count_matches(self, state, serialized_doc, search_phrase):
+        matches = self.find_matches(state, serialized_doc, search_phrase, False)
+        if matches is None:
+            return {}, "No stored objects to match against"
+        document_labels_to_counts: Dict[str, int] = {}
+        for match in matches:
+            document_labels_to_counts[match.document_label] = (
+                document_labels_to_counts.get(match.document_label, 0) + 1
+            )
+        return document_labels_to_counts, "Returned match counts"
+
+    def any_match(self, state, serialized_doc, search_phrase):
+        matches = self.find_matches(state, serialized_doc, search_phrase, True)
+        if matches is None:
+            return False, "No stored objects to match against"
+        return len(matches) > 0, "Returned whether there was a match"
+
+    def match_documents(
+        self, state, start_index, document_texts, search_phrase, fields
+    ):
+        """Returns *start_index* together with a list of match dictionaries for each document
+        so that the replies to several messages can be reassembled in order."""
+        docs = self.load_nlp(state).pipe(document_texts, batch_size=len(document_texts))
+        return (
+            start_index,
+            [
+                self.match(state, None, search_phrase, fields, doc)[0]
+                for doc in docs
+            ],
+        ), "Returned matches"
+
+    def get_topic_matchers(
         self,
         state,
-        text_to_match,
-        phraselet_labels_to_phraselet_infos,
-        phraselet_labels_to_search_phrases,
+        texts_and_phraselets,
         maximum_activation_distance,
         overall_similarity_threshold,
         initial_question_word_overall_similarity_threshold,
@@ -1234,43 +2888,157 @@ class Worker:
         document_label_filter,
         use_frequency_factor,
     ):
+        """*texts_and_phraselets* is a list of *(text_to_match,
+        phraselet_labels_to_phraselet_infos, phraselet_labels_to_search_phrases)* tuples.
+        Phraselets shared between texts are the same objects in each dictionary and are only
+        matched once. Returns a *TopicMatcher* for each text, or *None* if there are no stored
+        documents."""
         if len(state["document_labels_to_documents"]) == 0:
-            return [], "No stored documents to match against"
-        for search_phrase in phraselet_labels_to_search_phrases.values():
+            return None
+        # Search phrases are hashed by identity.
+        search_phrases = {
+            search_phrase: None
+            for _, _, phraselet_labels_to_search_phrases in texts_and_phraselets
+            for search_phrase in phraselet_labels_to_search_phrases.values()
+        }
+        for search_phrase in search_phrases:
             search_phrase.unpack(state["vocab"])
-        topic_matcher = TopicMatcher(
+        initial_phraselet_matcher = InitialPhraseletMatcher(
             structural_matcher=state["structural_matcher"],
             document_labels_to_documents=state["document_labels_to_documents"],
             reverse_dict=state["reverse_dict"],
-            text_to_match=text_to_match,
-            phraselet_labels_to_phraselet_infos=phraselet_labels_to_phraselet_infos,
-            phraselet_labels_to_search_phrases=phraselet_labels_to_search_phrases,
-            maximum_activation_distance=maximum_activation_distance,
             overall_similarity_threshold=overall_similarity_threshold,
             initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
-            relation_score=relation_score,
-            reverse_only_relation_score=reverse_only_relation_score,
-            single_word_score=single_word_score,
-            single_word_any_tag_score=single_word_any_tag_score,
-            initial_question_word_answer_score=initial_question_word_answer_score,
-            initial_question_word_behaviour=initial_question_word_behaviour,
-            different_match_cutoff_score=different_match_cutoff_score,
-            overlapping_relation_multiplier=overlapping_relation_multiplier,
-            embedding_penalty=embedding_penalty,
-            ontology_penalty=ontology_penalty,
-            relation_matching_frequency_threshold=relation_matching_frequency_threshold,
-            embedding_matching_frequency_threshold=embedding_matching_frequency_threshold,
-            sideways_match_extent=sideways_match_extent,
-            only_one_result_per_document=only_one_result_per_document,
-            number_of_results=number_of_results,
+            process_initial_question_words=initial_question_word_behaviour
+            in ("process", "exclusive"),
             document_label_filter=document_label_filter,
-            use_frequency_factor=use_frequency_factor,
             entity_label_to_vector_dict=state["entity_label_to_vector_dict"],
+            phraselet_match_cache=state["phraselet_match_cache"],
+            relation_index=state["relation_index"],
         )
+        topic_matchers = []
+        for (
+            text_to_match,
+            phraselet_labels_to_phraselet_infos,
+            phraselet_labels_to_search_phrases,
+        ) in texts_and_phraselets:
+            topic_matchers.append(
+                TopicMatcher(
+                    structural_matcher=state["structural_matcher"],
+                    document_labels_to_documents=state["document_labels_to_documents"],
+                    reverse_dict=state["reverse_dict"],
+                    text_to_match=text_to_match,
+                    phraselet_labels_to_phraselet_infos=phraselet_labels_to_phraselet_infos,
+                    phraselet_labels_to_search_phrases=phraselet_labels_to_search_phrases,
+                    maximum_activation_distance=maximum_activation_distance,
+                    overall_similarity_threshold=overall_similarity_threshold,
+                    initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
+                    relation_score=relation_score,
+                    reverse_only_relation_score=reverse_only_relation_score,
+                    single_word_score=single_word_score,
+                    single_word_any_tag_score=single_word_any_tag_score,
+                    initial_question_word_answer_score=initial_question_word_answer_score,
+                    initial_question_word_behaviour=initial_question_word_behaviour,
+                    different_match_cutoff_score=different_match_cutoff_score,
+                    overlapping_relation_multiplier=overlapping_relation_multiplier,
+                    embedding_penalty=embedding_penalty,
+                    ontology_penalty=ontology_penalty,
+                    relation_matching_frequency_threshold=relation_matching_frequency_threshold,
+                    embedding_matching_frequency_threshold=embedding_matching_frequency_threshold,
+                    sideways_match_extent=sideways_match_extent,
+                    only_one_result_per_document=only_one_result_per_document,
+                    number_of_results=number_of_results,
+                    document_label_filter=document_label_filter,
+                    use_frequency_factor=use_frequency_factor,
+                    entity_label_to_vector_dict=state["entity_label_to_vector_dict"],
+                    initial_phraselet_matcher=initial_phraselet_matcher,
+                )
+            )
+        return topic_matchers
+
+    def get_topic_matches(self, state, *topic_matching_args):
+        """*topic_matching_args* are the arguments of *get_topic_matchers()*. Returns a list of
+        topic match dictionaries for each text."""
+        topic_matchers = self.get_topic_matchers(state, *topic_matching_args)
+        if topic_matchers is None:
+            return [
+                [] for _ in topic_matching_args[0]
+            ], "No stored documents to match against"
+        return [
+            topic_matcher.get_topic_match_dictionaries()
+            for topic_matcher in topic_matchers
+        ], "Returned topic match dictionaries"
+
+    def get_topic_match_summaries(
+        self, state, request_id, worker_index, *topic_matching_args
+    ):
+        """*topic_matching_args* are the arguments of *get_topic_matchers()*. Returns
+        *worker_index* and the corpus version together with a list of topic match summaries for
+        each text. The topic matchers are retained until *get_selected_topic_matches()* or
+        *discard_topic_matchers()* is called with *request_id*, or until
+        *MAXIMUM_PENDING_TOPIC_MATCHERS* later requests have been received."""
+        topic_matchers = self.get_topic_matchers(state, *topic_matching_args)
+        if topic_matchers is None:
+            return (
+                worker_index,
+                state["corpus_version"],
+                [[] for _ in topic_matching_args[0]],
+            ), "No stored documents to match against"
+        pending_topic_matchers = state["pending_topic_matchers"]
+        pending_topic_matchers[request_id] = topic_matchers
+        while len(pending_topic_matchers) > MAXIMUM_PENDING_TOPIC_MATCHERS:
+            del pending_topic_matchers[next(iter(pending_topic_matchers))]
         return (
-            topic_matcher.get_topic_match_dictionaries(),
-            "Returned topic match dictionaries",
-        )
+            worker_index,
+            state["corpus_version"],
+            [
+                topic_matcher.get_topic_match_summaries()
+                for topic_matcher in topic_matchers
+            ],
+        ), "Returned topic match summaries"
+
+    def get_selected_topic_matches(
+        self,
+        state,
+        request_id,
+        worker_index,
+        topic_match_indexess,
+        topic_matching_args,
+        corpus_version,
+    ):
+        """Returns *worker_index* together with a list of topic match dictionaries for each
+        text containing the dictionaries for the topic matches at *topic_match_indexess* within
+        the topic matchers retained for *request_id*, which are then discarded. If the topic
+        matchers are no longer retained, they are recreated from *topic_matching_args* as long
+        as the corpus version is still *corpus_version*; otherwise the topic match indexes may
+        no longer refer to the same topic matches and *None* is returned in place of the list.
+        """
+        topic_matchers = state["pending_topic_matchers"].pop(request_id, None)
+        if topic_matchers is None and topic_matching_args is not None:
+            if state["corpus_version"] != corpus_version:
+                return (
+                    worker_index,
+                    None,
+                ), "Documents have changed since topic match summaries were returned"
+            topic_matchers = self.get_topic_matchers(state, *topic_matching_args)
+        if topic_matchers is None:
+            return (
+                worker_index,
+                [[] for _ in topic_match_indexess],
+            ), "No topic matches to return"
+        return (
+            worker_index,
+            [
+                topic_matcher.get_topic_match_dictionaries(topic_match_indexes)
+                for topic_matcher, topic_match_indexes in zip(
+                    topic_matchers, topic_match_indexess
+                )
+            ],
+        ), "Returned selected topic match dictionaries"
+
+    def discard_topic_matchers(self, state, request_id):
+        state["pending_topic_matchers"].pop(request_id, None)
+        return None, "Discarded topic matchers"
 
 
 @Language.factory("holmes")
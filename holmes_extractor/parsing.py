@@ -1,6 +1,9 @@
-from typing import List, Dict, Optional, Tuple, Generator, cast, Set, Union
+from typing import List, Dict, Optional, Tuple, Generator, cast, Set, Union, Iterable
 import math
 import pickle
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
 import importlib
 from abc import ABC, abstractmethod
 from copy import copy
@@ -251,6 +254,308 @@ class CorpusWordPosition:
         return ":".join((self.document_label, str(self.index)))
 
 
+class ReverseDictionary(Mapping):
+    """An index from words to the positions at which they occur within a corpus of one or more
+    documents.
+
+    To keep memory usage low, each position is stored as a single integer *position key*
+    combining an integer id interned for the document label with the token and subword indexes.
+    The position keys for each word are held in an *array* in the order in which they were
+    added. Because document ids increase monotonically and all entries for a document are added
+    together, each array is ordered by document id. Mapping a word to its array is the only
+    operation supported via the *Mapping* interface; position keys can be converted back to
+    document labels and *Index* objects using *get_document_label()* and *get_index()*.
+    """
+
+    TOKEN_INDEX_SHIFT = 10
+    DOCUMENT_ID_SHIFT = 32
+    SUBWORD_MASK = (1 << TOKEN_INDEX_SHIFT) - 1
+    TOKEN_INDEX_MASK = (1 << DOCUMENT_ID_SHIFT) - 1
+
+    def __init__(self) -> None:
+        self.words_to_position_keys: Dict[str, array] = {}
+        self.document_labels_to_ids: Dict[str, int] = {}
+        self.document_ids_to_labels: Dict[int, str] = {}
+        self.document_ids_to_words: Dict[int, List[str]] = {}
+        # Document ids are never reused so that position keys can never become ambiguous.
+        self.next_document_id = 0
+
+    def add_entry(
+        self,
+        key_word: str,
+        document_label: str,
+        token_index: int,
+        subword_index: Optional[int],
+    ) -> None:
+        """Adds a position to the entry for *key_word* unless it is already present. All entries
+        for a document must be added before entries for the next document are added."""
+        if document_label not in self.document_labels_to_ids:
+            document_id = self.next_document_id
+            self.next_document_id += 1
+            self.document_labels_to_ids[document_label] = document_id
+            self.document_ids_to_labels[document_id] = document_label
+            self.document_ids_to_words[document_id] = []
+        else:
+            document_id = self.document_labels_to_ids[document_label]
+        position_key = self.get_position_key(document_id, token_index, subword_index)
+        if key_word in self.words_to_position_keys:
+            position_keys = self.words_to_position_keys[key_word]
+            # Any entries for the document being added are at the end of the array.
+            document_has_entries = False
+            for existing_position_key in reversed(position_keys):
+                if existing_position_key >> self.DOCUMENT_ID_SHIFT != document_id:
+                    break
+                if existing_position_key == position_key:
+                    return
+                document_has_entries = True
+            if not document_has_entries:
+                self.document_ids_to_words[document_id].append(key_word)
+            position_keys.append(position_key)
+        else:
+            self.words_to_position_keys[key_word] = array("q", (position_key,))
+            self.document_ids_to_words[document_id].append(key_word)
+
+    def remove_documents(self, document_labels: Iterable[str]) -> Dict[str, int]:
+        """Removes the entries for documents from the index with a single pass through each
+        affected array and returns a dictionary from the words whose entries have changed to
+        the number of entries removed for each word."""
+        document_ids = set()
+        words: Set[str] = set()
+        for document_label in document_labels:
+            if document_label not in self.document_labels_to_ids:
+                continue
+            document_id = self.document_labels_to_ids.pop(document_label)
+            del self.document_ids_to_labels[document_id]
+            words.update(self.document_ids_to_words.pop(document_id))
+            document_ids.add(document_id)
+        shift = self.DOCUMENT_ID_SHIFT
+        words_to_removed_entry_counts = {}
+        for word in words:
+            old_position_keys = self.words_to_position_keys[word]
+            position_keys = array(
+                "q",
+                (
+                    position_key
+                    for position_key in old_position_keys
+                    if position_key >> shift not in document_ids
+                ),
+            )
+            words_to_removed_entry_counts[word] = len(old_position_keys) - len(
+                position_keys
+            )
+            if len(position_keys) > 0:
+                self.words_to_position_keys[word] = position_keys
+            else:
+                del self.words_to_position_keys[word]
+        return words_to_removed_entry_counts
+
+    def get_words(self, document_label: str) -> List[str]:
+        """Returns the words under which a document has entries."""
+        if document_label not in self.document_labels_to_ids:
+            return []
+        return self.document_ids_to_words[self.document_labels_to_ids[document_label]]
+
+    def get_word_frequencies(self, document_label: str) -> Dict[str, int]:
+        """Returns a dictionary from the words under which a document has entries to the
+        number of entries it has under each word."""
+        if document_label not in self.document_labels_to_ids:
+            return {}
+        document_id = self.document_labels_to_ids[document_label]
+        lower_bound = document_id << self.DOCUMENT_ID_SHIFT
+        upper_bound = (document_id + 1) << self.DOCUMENT_ID_SHIFT
+        words_to_frequencies = {}
+        for word in self.document_ids_to_words[document_id]:
+            position_keys = self.words_to_position_keys[word]
+            words_to_frequencies[word] = bisect_left(
+                position_keys, upper_bound
+            ) - bisect_left(position_keys, lower_bound)
+        return words_to_frequencies
+
+    def get_position_keys_to_words(self, document_label: str) -> Dict[int, List[str]]:
+        """Returns a dictionary from the position keys at which a document has entries to the
+        words under which each position has entries."""
+        if document_label not in self.document_labels_to_ids:
+            return {}
+        document_id = self.document_labels_to_ids[document_label]
+        lower_bound = document_id << self.DOCUMENT_ID_SHIFT
+        upper_bound = (document_id + 1) << self.DOCUMENT_ID_SHIFT
+        position_keys_to_words: Dict[int, List[str]] = {}
+        for word in self.document_ids_to_words[document_id]:
+            position_keys = self.words_to_position_keys[word]
+            for position_key in position_keys[
+                bisect_left(position_keys, lower_bound) : bisect_left(
+                    position_keys, upper_bound
+                )
+            ]:
+                position_keys_to_words.setdefault(position_key, []).append(word)
+        return position_keys_to_words
+
+    def get_position_key(
+        self, document_id: int, token_index: int, subword_index: Optional[int]
+    ) -> int:
+        return (
+            document_id << self.DOCUMENT_ID_SHIFT
+            | token_index << self.TOKEN_INDEX_SHIFT
+            | (0 if subword_index is None else subword_index + 1)
+        )
+
+    def get_position_key_for_index(self, document_label: str, index: Index) -> int:
+        return self.get_position_key(
+            self.document_labels_to_ids[document_label],
+            index.token_index,
+            index.subword_index,
+        )
+
+    def get_position_key_in_same_document(
+        self, position_key: int, token_index: int, subword_index: Optional[int]
+    ) -> int:
+        return self.get_position_key(
+            position_key >> self.DOCUMENT_ID_SHIFT, token_index, subword_index
+        )
+
+    def get_document_label(self, position_key: int) -> str:
+        return self.document_ids_to_labels[position_key >> self.DOCUMENT_ID_SHIFT]
+
+    def get_document_id(self, position_key: int) -> int:
+        return position_key >> self.DOCUMENT_ID_SHIFT
+
+    def get_document_ids_with_entries(
+        self, words: Iterable[str], document_ids: List[int]
+    ) -> List[int]:
+        """Returns the ids from *document_ids*, which must be in ascending order, of the
+        documents that contain at least one entry for any of *words*. Because the position keys
+        for each word are ordered by document id, each array is searched by galloping forward
+        from the point reached for the previous document id."""
+        found_document_ids: Set[int] = set()
+        for word in words:
+            position_keys = self.words_to_position_keys.get(word)
+            if position_keys is None:
+                continue
+            length = len(position_keys)
+            index = 0
+            for document_id in document_ids:
+                if document_id in found_document_ids:
+                    continue
+                first_position_key = document_id << self.DOCUMENT_ID_SHIFT
+                step = 1
+                while (
+                    index + step < length
+                    and position_keys[index + step] < first_position_key
+                ):
+                    step <<= 1
+                index = bisect_left(
+                    position_keys,
+                    first_position_key,
+                    index + (step >> 1),
+                    min(index + step + 1, length),
+                )
+                if index == length:
+                    break
+                if position_keys[index] >> self.DOCUMENT_ID_SHIFT == document_id:
+                    found_document_ids.add(document_id)
+        return [
+            document_id
+            for document_id in document_ids
+            if document_id in found_document_ids
+        ]
+
+    def get_token_index(self, position_key: int) -> int:
+        return (position_key & self.TOKEN_INDEX_MASK) >> self.TOKEN_INDEX_SHIFT
+
+    def get_subword_index(self, position_key: int) -> Optional[int]:
+        subword_value = position_key & self.SUBWORD_MASK
+        return None if subword_value == 0 else subword_value - 1
+
+    def is_subword(self, position_key: int) -> bool:
+        return position_key & self.SUBWORD_MASK != 0
+
+    def get_index(self, position_key: int) -> Index:
+        return Index(
+            self.get_token_index(position_key), self.get_subword_index(position_key)
+        )
+
+    def __getitem__(self, word: str) -> array:
+        return self.words_to_position_keys[word]
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.words_to_position_keys
+
+    def __iter__(self):
+        return iter(self.words_to_position_keys)
+
+    def __len__(self) -> int:
+        return len(self.words_to_position_keys)
+
+
+# (document dependency label, inverse polarity, child word): see RelationIndex
+RelationTriple = Tuple[str, bool, str]
+
+
+class RelationIndex:
+    """An index from semantic dependency triples to the positions within a corpus of the words
+    that can be the parents of the triples, which allows the positions at which a search phrase
+    root token can be matched together with its children to be found by lookups. Each triple is
+    a tuple of *(document dependency label, inverse polarity, child word)*, where *inverse
+    polarity* is *True* if the document dependency points from the child to the parent and
+    *child word* is a word under which a *ReverseDictionary* has an entry at the position of the
+    child. The parent positions of a triple include the positions of words linked to the parent
+    by coreference, and children include words linked to the child by coreference and subwords.
+
+    Positions are stored as the position keys of the *ReverseDictionary* from which the
+    triples were derived. As in the *ReverseDictionary*, the position keys for each triple are
+    held in an *array* ordered by document id.
+    """
+
+    def __init__(self) -> None:
+        self.triples_to_position_keys: Dict[RelationTriple, array] = {}
+        self.document_ids_to_triples: Dict[int, List[RelationTriple]] = {}
+
+    def add_document(
+        self,
+        document_id: int,
+        triples_to_position_keys: Dict[RelationTriple, Set[int]],
+    ) -> None:
+        """Adds the triples for a document. Documents must be added in the order of their
+        ids."""
+        for triple, position_keys in triples_to_position_keys.items():
+            if triple in self.triples_to_position_keys:
+                self.triples_to_position_keys[triple].extend(sorted(position_keys))
+            else:
+                self.triples_to_position_keys[triple] = array(
+                    "q", sorted(position_keys)
+                )
+        self.document_ids_to_triples[document_id] = list(triples_to_position_keys)
+
+    def remove_documents(self, document_ids: Iterable[int]) -> None:
+        document_ids = {
+            document_id
+            for document_id in document_ids
+            if document_id in self.document_ids_to_triples
+        }
+        triples: Set[RelationTriple] = set()
+        for document_id in document_ids:
+            triples.update(self.document_ids_to_triples.pop(document_id))
+        shift = ReverseDictionary.DOCUMENT_ID_SHIFT
+        for triple in triples:
+            position_keys = array(
+                "q",
+                (
+                    position_key
+                    for position_key in self.triples_to_position_keys[triple]
+                    if position_key >> shift not in document_ids
+                ),
+            )
+            if len(position_keys) > 0:
+                self.triples_to_position_keys[triple] = position_keys
+            else:
+                del self.triples_to_position_keys[triple]
+
+    def get_position_keys(self, triple: RelationTriple) -> Optional[array]:
+        """Returns the position keys of the parents of *triple*, or *None* if there are
+        none."""
+        return self.triples_to_position_keys.get(triple)
+
+
 class MultiwordSpan:
     def __init__(
         self,
@@ -783,6 +1088,9 @@ class SearchPhrase:
             treat_as_reverse_only_during_initial_relation_matching
         )
         self.words_matching_root_token: List[str] = []
+        # The lower-case words matching each matchable token other than the root token that is
+        # not an entity placeholder, used to plan matching (see *StructuralMatcher.get_match_plan()*).
+        self.words_matching_non_root_tokens: Dict[int, List[str]] = {}
         self.has_single_matchable_word = (
             has_single_matchable_word  # len(matchable_token_indexes) == 1
         )
@@ -2631,6 +2939,24 @@ class LinguisticObjectFactory:
             )
         search_phrase.words_matching_root_token.sort(key=lambda word: 0 - len(word))
         # process longer entries first so that multiwords are considered before their constituent parts
+        for token in tokens_to_match:
+            if (
+                token.i == search_phrase.root_token_index
+                or self.semantic_matching_helper.get_entity_placeholder(token)
+                is not None
+            ):
+                continue
+            words: List[str] = []
+            for word_matching_strategy in (
+                self.semantic_matching_helper.main_word_matching_strategies
+                + self.semantic_matching_helper.ontology_word_matching_strategies
+            ):
+                for word in word_matching_strategy.get_words_matching_search_phrase_token(
+                    token
+                ):
+                    if word.lower() not in words:
+                        words.append(word.lower())
+            search_phrase.words_matching_non_root_tokens[token.i] = words
         return search_phrase
 
 
@@ -2796,7 +3122,7 @@ class SemanticMatchingHelper(ABC):
 
     def add_to_reverse_dict(
         self,
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         parsed_document: Doc,
         document_label: str,
     ) -> None:
@@ -2808,20 +3134,6 @@ class SemanticMatchingHelper(ABC):
                 reverse_dict, parsed_document, document_label
             )
 
-    def get_reverse_dict_removing_document(
-        self, reverse_dict: Dict[str, List[CorpusWordPosition]], document_label: str
-    ) -> Dict[str, List[CorpusWordPosition]]:
-        new_reverse_dict = {}
-        for entry in reverse_dict:
-            new_value = [
-                cwp
-                for cwp in reverse_dict[entry]
-                if cwp.document_label != document_label
-            ]
-            if len(new_value) > 0:
-                new_reverse_dict[entry] = new_value
-        return new_reverse_dict
-
     def dependency_labels_match(
         self,
         *,
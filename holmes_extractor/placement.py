@@ -0,0 +1,128 @@
+from typing import List, Optional
+from abc import ABC, abstractmethod
+from zlib import crc32
+from srsly.msgpack import Unpacker
+
+
+def get_token_count(serialized_document: bytes) -> int:
+    """Returns the number of tokens in a serialized document without deserializing it into a
+    *Doc*. Only the token attribute array is unpacked; the other fields are skipped."""
+    unpacker = Unpacker(raw=False)
+    unpacker.feed(serialized_document)
+    for _ in range(unpacker.read_map_header()):
+        if unpacker.unpack() == "array_body":
+            return len(unpacker.unpack())
+        unpacker.skip()
+    return 0
+
+
+class PlacementPolicy(ABC):
+    """Decides which worker process holds each document registered with a *Manager*. The
+    load on each worker process is the total number of tokens in the documents it holds.
+
+    Parameters:
+
+    label_prefix_separator -- a string such as *'/'*, or *None* if documents should be
+        placed irrespective of their labels. Where a string is specified, documents whose labels
+        start with the same text up to and including the first occurrence of the string are
+        always held by the same group of worker processes. Topic matching with a
+        *document_label_filter* that contains the string then only involves that group.
+        Defaults to *None*.
+    workers_per_label_prefix -- the number of worker processes in each group where
+        *label_prefix_separator* is specified. Defaults to *1*.
+    """
+
+    def __init__(
+        self,
+        label_prefix_separator: Optional[str] = None,
+        workers_per_label_prefix: int = 1,
+    ):
+        if label_prefix_separator == "":
+            raise ValueError("label_prefix_separator may not be the empty string.")
+        if workers_per_label_prefix <= 0:
+            raise ValueError("workers_per_label_prefix must be a positive integer.")
+        self.label_prefix_separator = label_prefix_separator
+        self.workers_per_label_prefix = workers_per_label_prefix
+
+    def get_worker_indexes_for_label(
+        self, label: str, number_of_workers: int
+    ) -> List[int]:
+        """Returns the indexes of the worker processes that may hold the document with *label*."""
+        worker_indexes = self.get_worker_indexes_for_labels_starting(
+            label, number_of_workers
+        )
+        if worker_indexes is None:
+            # With label routing, labels without the separator are grouped by the whole label.
+            worker_indexes = self._get_worker_indexes_for_label_prefix(
+                label, number_of_workers
+            )
+        return worker_indexes
+
+    def get_worker_indexes_for_labels_starting(
+        self, labels_starting: str, number_of_workers: int
+    ) -> Optional[List[int]]:
+        """Returns the indexes of the worker processes that may hold documents whose labels
+        start with *labels_starting*, or *None* if any worker process may hold them."""
+        if self.label_prefix_separator is None:
+            return list(range(number_of_workers))
+        separator_index = labels_starting.find(self.label_prefix_separator)
+        if separator_index == -1:
+            return None
+        return self._get_worker_indexes_for_label_prefix(
+            labels_starting[: separator_index + len(self.label_prefix_separator)],
+            number_of_workers,
+        )
+
+    def _get_worker_indexes_for_label_prefix(
+        self, label_prefix: str, number_of_workers: int
+    ) -> List[int]:
+        # crc32 rather than hash() so that placement is the same each time a program runs.
+        first_worker_index = crc32(label_prefix.encode("utf-8")) % number_of_workers
+        return [
+            (first_worker_index + counter) % number_of_workers
+            for counter in range(min(self.workers_per_label_prefix, number_of_workers))
+        ]
+
+    @abstractmethod
+    def select_worker_index(
+        self, candidate_worker_indexes: List[int], worker_loads: List[int]
+    ) -> int:
+        """Returns the member of *candidate_worker_indexes* that should hold a new document.
+
+        Parameters:
+
+        candidate_worker_indexes -- the indexes of the worker processes that may hold the
+            document.
+        worker_loads -- the current load on each worker process.
+        """
+
+
+class RoundRobinPlacementPolicy(PlacementPolicy):
+    """Places documents on the candidate worker processes in turn. This is the default policy."""
+
+    def __init__(
+        self,
+        label_prefix_separator: Optional[str] = None,
+        workers_per_label_prefix: int = 1,
+    ):
+        super().__init__(label_prefix_separator, workers_per_label_prefix)
+        self.counter = 0
+
+    def select_worker_index(
+        self, candidate_worker_indexes: List[int], worker_loads: List[int]
+    ) -> int:
+        self.counter += 1
+        return candidate_worker_indexes[self.counter % len(candidate_worker_indexes)]
+
+
+class BalancedPlacementPolicy(PlacementPolicy):
+    """Places each document on the candidate worker process with the lowest load, which
+    prevents a worker process that holds a few very large documents from slowing down
+    every query."""
+
+    def select_worker_index(
+        self, candidate_worker_indexes: List[int], worker_loads: List[int]
+    ) -> int:
+        return min(
+            candidate_worker_indexes, key=lambda worker_index: worker_loads[worker_index]
+        )
@@ -1,10 +1,28 @@
-from typing import List, Dict, Set, Sequence, Optional, Any, ValuesView, Union
-import sys
-from spacy.tokens import Doc, Token
+from typing import (
+    List,
+    Dict,
+    Set,
+    Sequence,
+    Optional,
+    Any,
+    ValuesView,
+    Union,
+    Iterable,
+    Tuple,
+)
+from copy import copy
+import weakref
+import numpy
+from spacy.tokens import Doc, Span, Token
+from thinc.api import to_numpy
+from thinc.types import Floats1d
 from .parsing import (
-    CorpusWordPosition,
+    ReverseDictionary,
+    RelationIndex,
+    RelationTriple,
     Index,
     SearchPhrase,
+    SemanticDependency,
     SemanticMatchingHelper,
 )
 from .word_matching.general import WordMatch, WordMatchingStrategy
@@ -99,6 +117,520 @@ class Match:
         return subword_index if subword_index is not None else -1
 
 
+class VocabularyVectorMatrix:
+    """Holds the vectors of the words in a reverse dictionary as the rows of a matrix so that
+    embedding-based matching on search phrase root words can find the document words whose
+    vectors are similar enough to a search phrase vector with a single matrix-vector product
+    rather than by calculating each cosine similarity in turn.
+
+    Each row stores the vector belonging to the first corpus word position of a reverse
+    dictionary entry, which is the vector used when similarities are calculated one by one.
+    Rows are stored pre-normalized so that the matrix-vector product yields cosine
+    similarities. Words whose similarity lies close to the threshold are rechecked using
+    *SemanticMatchingHelper.cosine_similarity()* to guarantee results identical to those
+    obtained without the matrix.
+    """
+
+    # Similarities within this distance of a threshold are rechecked exactly to cater for
+    # differences in floating-point precision.
+    TOLERANCE = 1e-3
+
+    def __init__(self, semantic_matching_helper: SemanticMatchingHelper):
+        self.semantic_matching_helper = semantic_matching_helper
+        self.words_to_rows: Dict[str, int] = {}
+        self.rows_to_words: List[Optional[str]] = []
+        self.rows_to_example_cwps: List[Optional[int]] = []
+        self.rows_to_vectors: List[Optional[Floats1d]] = []
+        self.free_rows: List[int] = []
+        self.matrix: Optional[numpy.ndarray] = None
+        self.valid_rows: Optional[numpy.ndarray] = None
+
+    def update(
+        self,
+        reverse_dict: ReverseDictionary,
+        document_labels_to_documents: Dict[str, Doc],
+        words: Iterable[str],
+    ) -> None:
+        """Brings the rows for *words* into line with *reverse_dict*. Must be called for
+        every word whose entry has been added or removed or whose first corpus word position
+        has changed.
+        """
+        for word in words:
+            cwps = reverse_dict.get(word)
+            row = self.words_to_rows.get(word)
+            if cwps is None or len(cwps) == 0:
+                if row is not None:
+                    self._release_row(word)
+                continue
+            example_cwp = cwps[0]
+            if row is not None and self.rows_to_example_cwps[row] == example_cwp:
+                continue
+            vector = self._get_vector(
+                reverse_dict, example_cwp, document_labels_to_documents
+            )
+            if vector is None:
+                if row is not None:
+                    self._release_row(word)
+                continue
+            if row is None:
+                row = self._allocate_row(word, len(vector))
+            numpy_vector = to_numpy(vector).astype(numpy.float32)
+            norm = numpy.linalg.norm(numpy_vector)
+            self.matrix[row] = numpy_vector / norm if norm > 0 else 0
+            self.valid_rows[row] = True
+            self.rows_to_example_cwps[row] = example_cwp
+            self.rows_to_vectors[row] = vector
+
+    def get_matching_words(
+        self, search_phrase_vector: Floats1d, similarity_threshold: float
+    ) -> List[str]:
+        """Returns the words whose vectors have a cosine similarity to *search_phrase_vector*
+        of at least *similarity_threshold*.
+        """
+        if self.matrix is None or len(self.words_to_rows) == 0:
+            return []
+        numpy_search_phrase_vector = to_numpy(search_phrase_vector).astype(
+            numpy.float32
+        )
+        norm = numpy.linalg.norm(numpy_search_phrase_vector)
+        if norm == 0 or len(numpy_search_phrase_vector) != self.matrix.shape[1]:
+            return []
+        similarities = self.matrix @ (numpy_search_phrase_vector / norm)
+        candidate_rows = numpy.flatnonzero(
+            self.valid_rows
+            & (similarities >= similarity_threshold - self.TOLERANCE)
+        )
+        words = []
+        for row in candidate_rows:
+            if (
+                similarities[row] < similarity_threshold + self.TOLERANCE
+                and not self.semantic_matching_helper.cosine_similarity(
+                    search_phrase_vector, self.rows_to_vectors[row]
+                )
+                >= similarity_threshold
+            ):
+                continue
+            words.append(self.rows_to_words[row])
+        return words
+
+    def _get_vector(
+        self,
+        reverse_dict: ReverseDictionary,
+        cwp: int,
+        document_labels_to_documents: Dict[str, Doc],
+    ) -> Optional[Floats1d]:
+        token = document_labels_to_documents[reverse_dict.get_document_label(cwp)][
+            reverse_dict.get_token_index(cwp)
+        ]
+        if reverse_dict.is_subword(cwp):
+            subword = token._.holmes.subwords[reverse_dict.get_subword_index(cwp)]
+            if not self.semantic_matching_helper.embedding_matching_permitted(subword):
+                return None
+            return subword.vector
+        if not self.semantic_matching_helper.embedding_matching_permitted(token):
+            return None
+        return token._.holmes.vector
+
+    def _allocate_row(self, word: str, vector_length: int) -> int:
+        if self.matrix is None:
+            self.matrix = numpy.zeros((64, vector_length), dtype=numpy.float32)
+            self.valid_rows = numpy.zeros(64, dtype=bool)
+        if len(self.free_rows) > 0:
+            row = self.free_rows.pop()
+            self.rows_to_words[row] = word
+        else:
+            row = len(self.rows_to_words)
+            if row == self.matrix.shape[0]:
+                self.matrix = numpy.concatenate((self.matrix, numpy.zeros_like(self.matrix)))
+                self.valid_rows = numpy.concatenate(
+                    (self.valid_rows, numpy.zeros_like(self.valid_rows))
+                )
+            self.rows_to_words.append(word)
+            self.rows_to_example_cwps.append(None)
+            self.rows_to_vectors.append(None)
+        self.words_to_rows[word] = row
+        return row
+
+    def _release_row(self, word: str) -> None:
+        row = self.words_to_rows.pop(word)
+        self.matrix[row] = 0
+        self.valid_rows[row] = False
+        self.rows_to_words[row] = None
+        self.rows_to_example_cwps[row] = None
+        self.rows_to_vectors[row] = None
+        self.free_rows.append(row)
+
+
+class SearchPhraseIndex:
+    """Holds the registered search phrases together with an index from the words that can match
+    their root tokens, and from the entity placeholders on their root tokens, to the search
+    phrases. In chatbot mode, where each document is short and most search phrases cannot
+    match it, this allows matching to be restricted to the search phrases whose root tokens can
+    match a word in the document.
+
+    Search phrases whose root tokens can match any document word, i.e. *ENTITYNOUN* and root
+    tokens on which embedding-based matching is attempted, are not indexed and are always
+    considered.
+
+    Parameters:
+
+    semantic_matching_helper -- the *SemanticMatchingHelper* for the model language.
+    compare_embeddings_on_root_words -- *True* if embedding-based matching is attempted on
+        search phrase root tokens.
+    """
+
+    def __init__(
+        self,
+        semantic_matching_helper: SemanticMatchingHelper,
+        compare_embeddings_on_root_words: bool,
+    ):
+        self.semantic_matching_helper = semantic_matching_helper
+        self.compare_embeddings_on_root_words = compare_embeddings_on_root_words
+        self.search_phrases: List[SearchPhrase] = []
+        # The values are indexes within *self.search_phrases*.
+        self.keys_to_search_phrase_indexes: Dict[str, List[int]] = {}
+        self.unindexed_search_phrase_indexes: List[int] = []
+
+    def add(self, search_phrase: SearchPhrase) -> None:
+        search_phrase_index = len(self.search_phrases)
+        self.search_phrases.append(search_phrase)
+        entity_placeholder = self.semantic_matching_helper.get_entity_placeholder(
+            search_phrase.root_token
+        )
+        if entity_placeholder == "ENTITYNOUN" or (
+            self.compare_embeddings_on_root_words
+            and entity_placeholder is None
+            and not search_phrase.reverse_only
+            and self.semantic_matching_helper.embedding_matching_permitted(
+                search_phrase.root_token
+            )
+        ):
+            self.unindexed_search_phrase_indexes.append(search_phrase_index)
+        elif entity_placeholder is not None:
+            self.keys_to_search_phrase_indexes.setdefault(
+                entity_placeholder, []
+            ).append(search_phrase_index)
+        else:
+            for word in search_phrase.words_matching_root_token:
+                self.keys_to_search_phrase_indexes.setdefault(word, []).append(
+                    search_phrase_index
+                )
+
+    def get_search_phrases_to_match(
+        self, reverse_dict: ReverseDictionary
+    ) -> List[SearchPhrase]:
+        """Returns the search phrases that can match the documents in *reverse_dict* in the
+        order in which they were added."""
+        search_phrase_indexes = set(self.unindexed_search_phrase_indexes)
+        if len(reverse_dict) < len(self.keys_to_search_phrase_indexes):
+            for word in reverse_dict:
+                if word in self.keys_to_search_phrase_indexes:
+                    search_phrase_indexes.update(self.keys_to_search_phrase_indexes[word])
+        else:
+            for key, key_search_phrase_indexes in self.keys_to_search_phrase_indexes.items():
+                if key in reverse_dict:
+                    search_phrase_indexes.update(key_search_phrase_indexes)
+        return [self.search_phrases[index] for index in sorted(search_phrase_indexes)]
+
+
+class MatchPlan:
+    """The plan used to match a search phrase against the documents in a reverse dictionary.
+    Each planned step corresponds to a matchable search phrase token and records its *posting
+    size*, the number of reverse dictionary entries under the words that can match it, and the
+    steps are evaluated in ascending order of posting size. Matching is anchored on the first
+    step: the documents containing words that can match the anchor token are looked up, those
+    that do not also contain words that can match each subsequent non-root token are
+    discarded, and structural matching then only starts from the root token positions within
+    the remaining documents. Because structural matching still starts from the root token,
+    the matches found are always the same as without planning.
+
+    Only the root token and tokens all of whose possible matches are indexed in the reverse
+    dictionary are planned, which excludes entity placeholders, initial question words,
+    multiwords and all tokens when embedding-based matching is active.
+
+    Parameters:
+
+    search_phrase_label -- the label of the search phrase.
+    search_phrase_text -- the text of the search phrase.
+    steps -- a list of dictionaries with the keys *token_index*, *word*, *is_root* and
+        *posting_size*, which are sorted into the order in which they are evaluated.
+    """
+
+    def __init__(
+        self,
+        search_phrase_label: str,
+        search_phrase_text: str,
+        steps: List[Dict[str, Any]],
+    ):
+        self.search_phrase_label = search_phrase_label
+        self.search_phrase_text = search_phrase_text
+        # Where posting sizes are equal, anchoring on the root token avoids unnecessary work.
+        self.steps = sorted(
+            steps,
+            key=lambda step: (
+                step["posting_size"],
+                not step["is_root"],
+                step["token_index"],
+            ),
+        )
+
+    @property
+    def is_anchored_on_root(self) -> bool:
+        return self.steps[0]["is_root"]
+
+    @classmethod
+    def merge(cls, match_plan_dicts: Iterable[Dict[str, Any]]) -> "MatchPlan":
+        """Returns the plan that results from combining the posting sizes of plans for the same
+        search phrase against different reverse dictionaries, e.g. from different worker
+        processes."""
+        token_indexes_to_steps: Dict[int, Dict[str, Any]] = {}
+        for match_plan_dict in match_plan_dicts:
+            for step in match_plan_dict["steps"]:
+                if step["token_index"] in token_indexes_to_steps:
+                    token_indexes_to_steps[step["token_index"]]["posting_size"] += step[
+                        "posting_size"
+                    ]
+                else:
+                    token_indexes_to_steps[step["token_index"]] = dict(step)
+        return cls(
+            match_plan_dict["search_phrase_label"],
+            match_plan_dict["search_phrase_text"],
+            list(token_indexes_to_steps.values()),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "search_phrase_label": self.search_phrase_label,
+            "search_phrase_text": self.search_phrase_text,
+            "anchor_word": self.steps[0]["word"],
+            "steps": [dict(step) for step in self.steps],
+        }
+
+
+class DocumentKeys:
+    """Assigns integer keys to the documents encountered during a single call to
+    *StructuralMatcher.match()*. *id()* values cannot be used to identify documents because
+    documents held in a shared arena may be released while matching is still in progress, after
+    which their *id()* values can be reused by other documents."""
+
+    def __init__(self) -> None:
+        self.documents_to_keys: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.next_key = 0
+
+    def get_key(self, document: Doc) -> int:
+        key = self.documents_to_keys.get(document)
+        if key is None:
+            key = self.next_key
+            self.next_key += 1
+            self.documents_to_keys[document] = key
+        return key
+
+
+# See StructuralMatcher.get_dependency_join()
+DependencyJoin = List[
+    Tuple[
+        Index,
+        List[Tuple[SemanticDependency, bool, Token, List[List[Index]]]],
+        Optional[int],
+        Optional[int],
+    ]
+]
+
+
+class DependencyNetwork:
+    """Shares the tests on document dependencies that are carried out during a single call to
+    *StructuralMatcher.match()* between all the search phrases being matched. Like the join
+    nodes in a Rete network, each test that finds the document words that can match the child of
+    a search phrase dependency with a given label, given the document word that has matched its
+    parent, is evaluated once per document position and label however many search phrases
+    share it. Only the word-level tests, which depend on the individual search phrases, are then
+    carried out per search phrase, so that the matches found are the same as without the network.
+    This saves a great deal of work when many registered search phrases share structure, e.g.
+    *'A company buys a company'* and *'A company acquires a company'*.
+
+    Parameters:
+
+    structural_matcher -- the *StructuralMatcher* on whose behalf the tests are carried out.
+    """
+
+    def __init__(self, structural_matcher: "StructuralMatcher"):
+        self.structural_matcher = structural_matcher
+        self.dependency_joins: Dict[
+            Tuple[int, int, Optional[int], str], DependencyJoin
+        ] = {}
+        self.document_keys = DocumentKeys()
+
+    def get_dependency_join(
+        self,
+        document_token: Token,
+        document_subword_index: Optional[int],
+        search_phrase_dependency_label: str,
+    ) -> DependencyJoin:
+        """See *StructuralMatcher.get_dependency_join()*."""
+        key = (
+            self.document_keys.get_key(document_token.doc),
+            document_token.i,
+            document_subword_index,
+            search_phrase_dependency_label,
+        )
+        dependency_join = self.dependency_joins.get(key)
+        if dependency_join is None:
+            dependency_join = self.structural_matcher.get_dependency_join(
+                document_token, document_subword_index, search_phrase_dependency_label
+            )
+            self.dependency_joins[key] = dependency_join
+        return dependency_join
+
+
+# The keys of the dictionaries returned by StructuralMatcher.build_match_dictionaries()
+MATCH_DICTIONARY_FIELDS = (
+    "search_phrase_label",
+    "search_phrase_text",
+    "document",
+    "index_within_document",
+    "sentences_within_document",
+    "negated",
+    "uncertain",
+    "involves_coreference",
+    "overall_similarity_measure",
+    "word_matches",
+)
+WORD_MATCH_DICTIONARY_FIELDS = (
+    "search_phrase_token_index",
+    "search_phrase_word",
+    "document_token_index",
+    "first_document_token_index",
+    "last_document_token_index",
+    "structurally_matched_document_token_index",
+    "document_subword_index",
+    "document_subword_containing_token_index",
+    "document_word",
+    "document_phrase",
+    "match_type",
+    "negated",
+    "uncertain",
+    "similarity_measure",
+    "involves_coreference",
+    "extracted_word",
+    "depth",
+    "explanation",
+)
+
+
+# (search phrase id, search phrase token index, document key, token index, subword index)
+MemoKey = Tuple[int, int, int, int, Optional[int]]
+
+
+class MatchMemo:
+    """Memoizes results within a single call to *StructuralMatcher.match()*. The same search
+    phrase token is often matched against the same document word many times, e.g. via
+    coreference mentions, coordinated words, dependencies that can be matched in both
+    directions and different matches for the search phrase root token. Two kinds of result are
+    memoized:
+
+    word matches -- the result of trying the word matching strategies on a search phrase token
+        and a document word.
+    subtree matches -- the result of matching a search phrase token together with all the
+        search phrase tokens beneath it to a document word. Because *match_recursively()* does
+        not recurse twice from the same search phrase token and document word while matching
+        from a given root word match, subtree matches are only memoized and reused where none of
+        the search phrase tokens beneath the search phrase token have been visited, which
+        guarantees that the results are the same as without memoization.
+
+    Search phrase root tokens are not memoized because each is only matched once to each
+    document word.
+
+    Parameters:
+
+    statistics -- a dictionary with the keys *word_match_hits*, *word_match_misses*,
+        *subtree_hits* and *subtree_misses* whose values are incremented as the memo is used.
+    """
+
+    def __init__(self, statistics: Dict[str, int]):
+        self.statistics = statistics
+        self.word_matches: Dict[MemoKey, Optional[WordMatch]] = {}
+        self.subtree_match_dicts: Dict[
+            MemoKey,
+            Tuple[Optional[List[Dict[Token, WordMatch]]], Dict[int, Set[Index]]],
+        ] = {}
+        self.descendant_token_indexes: Dict[Tuple[int, int], Optional[List[int]]] = {}
+        self.document_keys = DocumentKeys()
+
+    def has_word_match(self, key: MemoKey) -> bool:
+        if key in self.word_matches:
+            self.statistics["word_match_hits"] += 1
+            return True
+        self.statistics["word_match_misses"] += 1
+        return False
+
+    def get_word_match(self, key: MemoKey) -> Optional[WordMatch]:
+        """Returns a copy of the memoized word match, because *match_recursively()* sets
+        properties on the word matches it returns that depend on the route by which the document
+        word was reached."""
+        word_match = self.word_matches[key]
+        return None if word_match is None else copy(word_match)
+
+    def add_word_match(self, key: MemoKey, word_match: Optional[WordMatch]) -> None:
+        self.word_matches[key] = word_match
+
+    def get_descendant_token_indexes(
+        self,
+        structural_matcher: "StructuralMatcher",
+        search_phrase: SearchPhrase,
+        search_phrase_token: Token,
+        process_initial_question_words: bool,
+    ) -> Optional[List[int]]:
+        """Returns the indexes of the search phrase tokens beneath *search_phrase_token*, or
+        *None* if *search_phrase_token* is beneath itself."""
+        key = (id(search_phrase), search_phrase_token.i)
+        if key not in self.descendant_token_indexes:
+            descendant_token_indexes: Optional[List[int]] = []
+            tokens_to_process = [search_phrase_token]
+            while len(tokens_to_process) > 0:
+                for (
+                    dependency
+                ) in structural_matcher.get_search_phrase_dependencies_to_match(
+                    search_phrase, tokens_to_process.pop(), process_initial_question_words
+                ):
+                    child_token = dependency.child_token(search_phrase.doc)
+                    if child_token.i == search_phrase_token.i:
+                        descendant_token_indexes = None
+                        break
+                    if child_token.i not in descendant_token_indexes:
+                        descendant_token_indexes.append(child_token.i)
+                        tokens_to_process.append(child_token)
+                if descendant_token_indexes is None:
+                    break
+            self.descendant_token_indexes[key] = descendant_token_indexes
+        return self.descendant_token_indexes[key]
+
+    def has_subtree_match_dicts(self, key: MemoKey) -> bool:
+        if key in self.subtree_match_dicts:
+            self.statistics["subtree_hits"] += 1
+            return True
+        self.statistics["subtree_misses"] += 1
+        return False
+
+    def get_subtree_match_dicts(
+        self, key: MemoKey
+    ) -> Tuple[Optional[List[Dict[Token, WordMatch]]], Dict[int, Set[Index]]]:
+        """Returns the word match dictionaries for the subtree, or *None* if the subtree could
+        not be matched, together with a dictionary from the indexes of the search phrase tokens
+        beneath the subtree root to the document word indexes visited while matching them."""
+        return self.subtree_match_dicts[key]
+
+    def add_subtree_match_dicts(
+        self,
+        key: MemoKey,
+        word_match_dicts: Optional[List[Dict[Token, WordMatch]]],
+        descendant_token_indexes_to_visited_indexes: Dict[int, Set[Index]],
+    ) -> None:
+        self.subtree_match_dicts[key] = (
+            word_match_dicts,
+            descendant_token_indexes_to_visited_indexes,
+        )
+
+
 class StructuralMatcher:
     """The class responsible for matching search phrases with documents."""
 
@@ -109,6 +641,7 @@ class StructuralMatcher:
         analyze_derivational_morphology: bool,
         perform_coreference_resolution: bool,
         use_reverse_dependency_matching: bool,
+        share_dependency_tests: bool = False,
     ):
         """Args:
 
@@ -122,6 +655,9 @@ class StructuralMatcher:
         use_reverse_dependency_matching -- *True* if appropriate dependencies in documents can be
             matched to dependencies in search phrases where the two dependencies point in opposite
             directions.
+        share_dependency_tests -- *True* if the tests on document dependencies carried out during
+            a call to *match()* should be shared between all the search phrases being matched
+            using a *DependencyNetwork*.
         """
         self.semantic_matching_helper = semantic_matching_helper
         self.embedding_based_matching_on_root_words = (
@@ -130,23 +666,34 @@ class StructuralMatcher:
         self.analyze_derivational_morphology = analyze_derivational_morphology
         self.perform_coreference_resolution = perform_coreference_resolution
         self.use_reverse_dependency_matching = use_reverse_dependency_matching
+        self.share_dependency_tests = share_dependency_tests
+        self.match_memo_statistics = {
+            "word_match_hits": 0,
+            "word_match_misses": 0,
+            "subtree_hits": 0,
+            "subtree_misses": 0,
+        }
 
     def match(
         self,
         *,
         word_matching_strategies: List[WordMatchingStrategy],
         document_labels_to_documents: Dict[str, Doc],
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         search_phrases: Union[List[SearchPhrase], ValuesView[SearchPhrase]],
         match_depending_on_single_words: Optional[bool],
         compare_embeddings_on_root_words: bool,
         compare_embeddings_on_non_root_words: bool,
-        reverse_matching_cwps: Optional[Set[CorpusWordPosition]],
-        embedding_reverse_matching_cwps: Optional[Set[CorpusWordPosition]],
+        reverse_matching_cwps: Optional[Set[int]],
+        embedding_reverse_matching_cwps: Optional[Set[int]],
         process_initial_question_words: bool,
         overall_similarity_threshold: float,
         initial_question_word_overall_similarity_threshold: float,
-        document_label_filter: Optional[str] = None
+        document_label_filter: Optional[str] = None,
+        vocabulary_vector_matrix: Optional[VocabularyVectorMatrix] = None,
+        stop_at_first_match: bool = False,
+        relation_index: Optional[RelationIndex] = None,
+        match_plans: Optional[List[MatchPlan]] = None
     ) -> List[Match]:
         """Finds and returns matches between search phrases and documents.
         match_depending_on_single_words -- 'True' to match only single word search phrases,
@@ -154,9 +701,9 @@ class StructuralMatcher:
         compare_embeddings_on_root_words -- if 'True', embeddings on root words are compared.
         compare_embeddings_on_non_root_words -- if 'True', embeddings on non-root words are
             compared.
-        reverse_matching_cwps -- corpus word positions for non-embedding
+        reverse_matching_cwps -- *reverse_dict* position keys for non-embedding
             reverse matching only.
-        embedding_reverse_matching_cwps -- corpus word positions for embedding
+        embedding_reverse_matching_cwps -- *reverse_dict* position keys for embedding
             and non-embedding reverse matching.
         process_initial_question_words -- 'True' if interrogative pronouns in search phrases should
             be matched to answering phrases in documents. Only used with topic matching.
@@ -167,6 +714,17 @@ class StructuralMatcher:
             word.
         document_label_filter -- a string with which the label of a document must begin for that
             document to be considered for matching, or 'None' if no filter is in use.
+        vocabulary_vector_matrix -- a *VocabularyVectorMatrix* kept in line with *reverse_dict*
+            that is used to find root word embedding matches when specific indexes are not being
+            matched, or 'None' if the words in *reverse_dict* should be compared one by one.
+        stop_at_first_match -- 'True' if matching should stop as soon as a match has been found,
+            in which case at most one match is returned.
+        relation_index -- a *RelationIndex* kept in line with *reverse_dict* that is used to
+            restrict matching to the positions where the search phrase root token has document
+            children that can match its children, or 'None' if matching should be attempted at
+            every position where the root token matches.
+        match_plans -- a list to which the *MatchPlan* for each search phrase is appended instead
+            of performing structural matching, or 'None' if matching should be performed.
         """
 
         if (
@@ -188,7 +746,15 @@ class StructuralMatcher:
         # Dictionary used to improve performance when embedding-based matching for root tokens
         # is active and there are multiple search phrases with the same root token word: the
         # same corpus word positions will then match all the search phrase root tokens.
-        root_lemma_to_cwps_to_match_dict: Dict[str, Set[CorpusWordPosition]] = {}
+        root_lemma_to_cwps_to_match_dict: Dict[str, Set[int]] = {}
+        dependency_network = (
+            DependencyNetwork(self) if self.share_dependency_tests else None
+        )
+        match_memo = MatchMemo(self.match_memo_statistics)
+        plan_non_root_tokens = all(
+            word_matching_strategy.MATCHES_ARE_INDEXED
+            for word_matching_strategy in word_matching_strategies
+        )
 
         for search_phrase in search_phrases:
             if (
@@ -225,11 +791,15 @@ class StructuralMatcher:
                                     document_label,
                                     compare_embeddings_on_non_root_words,
                                     process_initial_question_words,
+                                    dependency_network,
+                                    match_memo,
                                 )
                             )
+                            if stop_at_first_match and len(matches) > 0:
+                                return matches[:1]
                 continue
-            direct_matching_cwps: List[CorpusWordPosition] = []
-            matched_cwps: Set[CorpusWordPosition] = set()
+            direct_matching_cwps: Sequence[int] = []
+            matched_cwps: Set[int] = set()
             entity_label = self.semantic_matching_helper.get_entity_placeholder(
                 search_phrase.root_token
             )
@@ -242,7 +812,7 @@ class StructuralMatcher:
                             for cwp in entity_matching_cwps
                             if cwp in reverse_matching_cwps
                             or cwp in embedding_reverse_matching_cwps
-                            and not cwp.index.is_subword()
+                            and not reverse_dict.is_subword(cwp)
                         ]
                     matched_cwps.update(entity_matching_cwps)
             else:
@@ -281,94 +851,366 @@ class StructuralMatcher:
                     )
                 else:
                     working_cwps_to_match_for_cache = set()
-                    for document_word in reverse_dict:
-                        corpus_word_positions_to_match = reverse_dict[document_word]
-                        if match_specific_indexes:
-                            corpus_word_positions_to_match = [
-                                cwp
-                                for cwp in corpus_word_positions_to_match
-                                if cwp in embedding_reverse_matching_cwps
-                                and cwp not in direct_matching_cwps
-                            ]
-                            if len(corpus_word_positions_to_match) == 0:
-                                continue
-                        search_phrase_vector = (
-                            search_phrase.matchable_non_entity_tokens_to_vectors[
-                                search_phrase.root_token.i
-                            ]
-                        )
-                        example_cwp = corpus_word_positions_to_match[0]
-                        example_doc = document_labels_to_documents[
-                            example_cwp.document_label
+                    search_phrase_vector = (
+                        search_phrase.matchable_non_entity_tokens_to_vectors[
+                            search_phrase.root_token.i
                         ]
-                        example_index = example_cwp.index
-                        example_document_token = example_doc[example_index.token_index]
-                        if example_index.is_subword():
-                            if not self.semantic_matching_helper.embedding_matching_permitted(
-                                example_document_token._.holmes.subwords[
-                                    example_index.subword_index
-                                ]
-                            ):
-                                continue
-                            document_vector = example_document_token._.holmes.subwords[
-                                example_index.subword_index
-                            ].vector
-                        else:
-                            if not self.semantic_matching_helper.embedding_matching_permitted(
-                                example_document_token
-                            ):
-                                continue
-                            document_vector = example_document_token._.holmes.vector
-                        if (
-                            search_phrase_vector is not None
-                            and document_vector is not None
+                    )
+                    search_phrase_initial_question_word = (
+                        process_initial_question_words
+                        and search_phrase.root_token._.holmes.has_initial_question_word_in_phrase
+                    )
+                    single_token_similarity_threshold = (
+                        initial_question_word_overall_similarity_threshold
+                        if search_phrase_initial_question_word
+                        else overall_similarity_threshold
+                    ) ** len(search_phrase.matchable_non_entity_tokens_to_vectors)
+                    if (
+                        search_phrase_vector is not None
+                        and vocabulary_vector_matrix is not None
+                        and not match_specific_indexes
+                    ):
+                        for (
+                            document_word
+                        ) in vocabulary_vector_matrix.get_matching_words(
+                            search_phrase_vector, single_token_similarity_threshold
                         ):
-                            similarity_measure = (
-                                self.semantic_matching_helper.cosine_similarity(
-                                    search_phrase_vector, document_vector
-                                )
-                            )
-                            search_phrase_initial_question_word = (
-                                process_initial_question_words
-                                and search_phrase.root_token._.holmes.has_initial_question_word_in_phrase
+                            matched_cwps.update(reverse_dict[document_word])
+                            working_cwps_to_match_for_cache.update(
+                                reverse_dict[document_word]
                             )
-                            single_token_similarity_threshold = (
-                                initial_question_word_overall_similarity_threshold
-                                if search_phrase_initial_question_word
-                                else overall_similarity_threshold
-                            ) ** len(
-                                search_phrase.matchable_non_entity_tokens_to_vectors
-                            )
-                            if similarity_measure >= single_token_similarity_threshold:
-                                matched_cwps.update(corpus_word_positions_to_match)
-                                working_cwps_to_match_for_cache.update(
-                                    corpus_word_positions_to_match
+                    elif search_phrase_vector is not None:
+                        direct_matching_cwps_set = set(direct_matching_cwps)
+                        for document_word in reverse_dict:
+                            corpus_word_positions_to_match = reverse_dict[document_word]
+                            if match_specific_indexes:
+                                corpus_word_positions_to_match = [
+                                    cwp
+                                    for cwp in corpus_word_positions_to_match
+                                    if cwp in embedding_reverse_matching_cwps
+                                    and cwp not in direct_matching_cwps_set
+                                ]
+                                if len(corpus_word_positions_to_match) == 0:
+                                    continue
+                            example_cwp = corpus_word_positions_to_match[0]
+                            example_doc = document_labels_to_documents[
+                                reverse_dict.get_document_label(example_cwp)
+                            ]
+                            example_index = reverse_dict.get_index(example_cwp)
+                            example_document_token = example_doc[
+                                example_index.token_index
+                            ]
+                            if example_index.is_subword():
+                                if not self.semantic_matching_helper.embedding_matching_permitted(
+                                    example_document_token._.holmes.subwords[
+                                        example_index.subword_index
+                                    ]
+                                ):
+                                    continue
+                                document_vector = example_document_token._.holmes.subwords[
+                                    example_index.subword_index
+                                ].vector
+                            else:
+                                if not self.semantic_matching_helper.embedding_matching_permitted(
+                                    example_document_token
+                                ):
+                                    continue
+                                document_vector = example_document_token._.holmes.vector
+                            if document_vector is not None:
+                                similarity_measure = (
+                                    self.semantic_matching_helper.cosine_similarity(
+                                        search_phrase_vector, document_vector
+                                    )
                                 )
+                                if (
+                                    similarity_measure
+                                    >= single_token_similarity_threshold
+                                ):
+                                    matched_cwps.update(corpus_word_positions_to_match)
+                                    working_cwps_to_match_for_cache.update(
+                                        corpus_word_positions_to_match
+                                    )
                     root_lemma_to_cwps_to_match_dict[
                         root_token_lemma_to_use
                     ] = working_cwps_to_match_for_cache
+            match_plan = self.get_match_plan(
+                search_phrase,
+                reverse_dict,
+                len(matched_cwps),
+                plan_non_root_tokens and not search_phrase.has_single_matchable_word,
+            )
+            if match_plans is not None:
+                match_plans.append(match_plan)
+                continue
+            planned_document_ids = self.get_planned_document_ids(
+                match_plan, search_phrase, reverse_dict, matched_cwps
+            )
+            related_position_keys = (
+                self.get_related_position_keys(
+                    search_phrase, relation_index, process_initial_question_words
+                )
+                if relation_index is not None and plan_non_root_tokens
+                else None
+            )
             for corpus_word_position in matched_cwps:
                 if (
-                    document_label_filter is not None
-                    and corpus_word_position.document_label is not None
-                    and not corpus_word_position.document_label.startswith(
-                        document_label_filter
-                    )
+                    planned_document_ids is not None
+                    and reverse_dict.get_document_id(corpus_word_position)
+                    not in planned_document_ids
+                ):
+                    continue
+                if (
+                    related_position_keys is not None
+                    and corpus_word_position not in related_position_keys
+                ):
+                    continue
+                document_label = reverse_dict.get_document_label(corpus_word_position)
+                if document_label_filter is not None and not document_label.startswith(
+                    document_label_filter
                 ):
                     continue
-                doc = document_labels_to_documents[corpus_word_position.document_label]
+                doc = document_labels_to_documents[document_label]
                 matches.extend(
                     self.get_matches_starting_at_root_word_match(
                         word_matching_strategies,
                         search_phrase,
                         doc,
-                        doc[corpus_word_position.index.token_index],
-                        corpus_word_position.index.subword_index,
-                        corpus_word_position.document_label,
+                        doc[reverse_dict.get_token_index(corpus_word_position)],
+                        reverse_dict.get_subword_index(corpus_word_position),
+                        document_label,
                         compare_embeddings_on_non_root_words,
                         process_initial_question_words,
+                        dependency_network,
+                        match_memo,
                     )
                 )
+                if stop_at_first_match and len(matches) > 0:
+                    return matches[:1]
+        return self.sort_matches(matches)
+
+    def get_match_plan(
+        self,
+        search_phrase: SearchPhrase,
+        reverse_dict: ReverseDictionary,
+        root_posting_size: int,
+        plan_non_root_tokens: bool,
+    ) -> MatchPlan:
+        """Returns the *MatchPlan* for matching *search_phrase* against the documents in
+        *reverse_dict*.
+
+        Parameters:
+
+        root_posting_size -- the number of positions in *reverse_dict* at which the search phrase
+            root token can match.
+        plan_non_root_tokens -- *True* if all the word matching strategies in use only match
+            document words that are indexed in *reverse_dict*, so that tokens other than the root
+            token can be planned.
+        """
+        steps = [
+            {
+                "token_index": search_phrase.root_token_index,
+                "word": search_phrase.root_token.text,
+                "is_root": True,
+                "posting_size": root_posting_size,
+            }
+        ]
+        if plan_non_root_tokens:
+            for (
+                token_index,
+                words,
+            ) in search_phrase.words_matching_non_root_tokens.items():
+                token = search_phrase.doc[token_index]
+                if (
+                    token._.holmes.is_initial_question_word
+                    or len(token._.holmes.lemma.split()) > 1
+                ):
+                    continue
+                steps.append(
+                    {
+                        "token_index": token_index,
+                        "word": token.text,
+                        "is_root": False,
+                        "posting_size": sum(
+                            len(reverse_dict[word])
+                            for word in words
+                            if word in reverse_dict
+                        ),
+                    }
+                )
+        return MatchPlan(search_phrase.label, search_phrase.doc_text, steps)
+
+    def get_planned_document_ids(
+        self,
+        match_plan: MatchPlan,
+        search_phrase: SearchPhrase,
+        reverse_dict: ReverseDictionary,
+        root_corpus_word_positions: Iterable[int],
+    ) -> Optional[Set[int]]:
+        """Returns the ids of the documents in *reverse_dict* that contain words that can match
+        all the non-root tokens planned in *match_plan*, or *None* if no non-root tokens are
+        planned. Where *match_plan* is anchored on the root token, the candidate documents are
+        those containing *root_corpus_word_positions*; otherwise they are those containing words
+        that can match the anchor token. The candidates are then intersected with the documents
+        containing words that can match each subsequent non-root token in turn."""
+        non_root_steps = [step for step in match_plan.steps if not step["is_root"]]
+        if len(non_root_steps) == 0:
+            return None
+        if match_plan.is_anchored_on_root:
+            document_ids = sorted(
+                {
+                    reverse_dict.get_document_id(corpus_word_position)
+                    for corpus_word_position in root_corpus_word_positions
+                }
+            )
+        else:
+            document_ids = sorted(
+                {
+                    reverse_dict.get_document_id(corpus_word_position)
+                    for word in search_phrase.words_matching_non_root_tokens[
+                        non_root_steps[0]["token_index"]
+                    ]
+                    if word in reverse_dict
+                    for corpus_word_position in reverse_dict[word]
+                }
+            )
+            non_root_steps = non_root_steps[1:]
+        for step in non_root_steps:
+            if len(document_ids) == 0:
+                break
+            document_ids = reverse_dict.get_document_ids_with_entries(
+                search_phrase.words_matching_non_root_tokens[step["token_index"]],
+                document_ids,
+            )
+        return set(document_ids)
+
+    def get_related_position_keys(
+        self,
+        search_phrase: SearchPhrase,
+        relation_index: RelationIndex,
+        process_initial_question_words: bool,
+    ) -> Optional[Set[int]]:
+        """Returns the position keys of the document words that have, for each dependency
+        beneath the search phrase root token whose child can only match indexed words, a
+        dependency that can match it with a child that can match its child; or *None* if there
+        is no such search phrase dependency. Only valid if all the word matching strategies in
+        use only match indexed words."""
+        position_keys: Optional[Set[int]] = None
+        for dependency in self.get_search_phrase_dependencies_to_match(
+            search_phrase, search_phrase.root_token, process_initial_question_words
+        ):
+            child_token = dependency.child_token(search_phrase.doc)
+            # The same search phrase tokens are excluded as in *get_match_plan()*.
+            if (
+                child_token.i not in search_phrase.words_matching_non_root_tokens
+                or child_token._.holmes.is_initial_question_word
+                or len(child_token._.holmes.lemma.split()) > 1
+            ):
+                continue
+            labels_and_inverse_polarities = [(dependency.label, False)]
+            match_implication = self.semantic_matching_helper.match_implication_dict.get(
+                dependency.label
+            )
+            if match_implication is not None:
+                labels_and_inverse_polarities.extend(
+                    (label, False) for label in match_implication.document_dependencies
+                )
+                if self.use_reverse_dependency_matching:
+                    labels_and_inverse_polarities.extend(
+                        (label, True)
+                        for label in match_implication.reverse_document_dependencies
+                    )
+            dependency_position_keys: Set[int] = set()
+            for word in search_phrase.words_matching_non_root_tokens[child_token.i]:
+                for label, inverse_polarity in labels_and_inverse_polarities:
+                    triple_position_keys = relation_index.get_position_keys(
+                        (label, inverse_polarity, word)
+                    )
+                    if triple_position_keys is not None:
+                        dependency_position_keys.update(triple_position_keys)
+            if position_keys is None:
+                position_keys = dependency_position_keys
+            else:
+                position_keys &= dependency_position_keys
+        return position_keys
+
+    def get_relation_triples(
+        self, doc: Doc, document_label: str, reverse_dict: ReverseDictionary
+    ) -> Dict[RelationTriple, Set[int]]:
+        """Returns a dictionary from the relation triples within *doc* to the position keys in
+        *reverse_dict* of their parents for adding to a *RelationIndex*. The children of each
+        position are the document words returned for it by *get_dependency_join()*."""
+        position_keys_to_words = reverse_dict.get_position_keys_to_words(document_label)
+        triples_to_position_keys: Dict[RelationTriple, Set[int]] = {}
+        for position_key in position_keys_to_words:
+            token = doc[reverse_dict.get_token_index(position_key)]
+            children: List[Tuple[int, str, bool]] = []
+            for (
+                working_document_parent_index,
+                document_dependency_candidates,
+                dependent_subword_index,
+                governor_subword_index,
+            ) in self.get_dependency_join(
+                token, reverse_dict.get_subword_index(position_key), None
+            ):
+                for (
+                    document_dependency,
+                    inverse_polarity,
+                    _,
+                    working_document_child_indexes_by_mention,
+                ) in document_dependency_candidates:
+                    for (
+                        working_document_child_indexes
+                    ) in working_document_child_indexes_by_mention:
+                        for (
+                            working_document_child_index
+                        ) in working_document_child_indexes:
+                            children.append(
+                                (
+                                    reverse_dict.get_position_key_in_same_document(
+                                        position_key,
+                                        working_document_child_index.token_index,
+                                        working_document_child_index.subword_index,
+                                    ),
+                                    document_dependency.label,
+                                    inverse_polarity,
+                                )
+                            )
+                if working_document_parent_index.is_subword():
+                    # Only the position itself can be a subword, so the subwords are within
+                    # *token*.
+                    document_parent_subword = token._.holmes.subwords[
+                        working_document_parent_index.subword_index
+                    ]
+                    if dependent_subword_index is not None:
+                        children.append(
+                            (
+                                reverse_dict.get_position_key_in_same_document(
+                                    position_key, token.i, dependent_subword_index
+                                ),
+                                document_parent_subword.dependency_label,
+                                False,
+                            )
+                        )
+                    if governor_subword_index is not None:
+                        children.append(
+                            (
+                                reverse_dict.get_position_key_in_same_document(
+                                    position_key, token.i, governor_subword_index
+                                ),
+                                document_parent_subword.governing_dependency_label,
+                                True,
+                            )
+                        )
+            for child_position_key, label, inverse_polarity in children:
+                for word in position_keys_to_words.get(child_position_key, ()):
+                    triples_to_position_keys.setdefault(
+                        (label, inverse_polarity, word), set()
+                    ).add(position_key)
+        return triples_to_position_keys
+
+    @staticmethod
+    def sort_matches(matches: List[Match]) -> List[Match]:
+        """Returns *matches* in the order in which *match()* returns them."""
         return sorted(
             matches,
             key=lambda match: (
@@ -388,10 +1230,22 @@ class StructuralMatcher:
         document_label: str,
         compare_embeddings_on_non_root_words: bool,
         process_initial_question_words: bool,
+        dependency_network: Optional["DependencyNetwork"] = None,
+        match_memo: Optional["MatchMemo"] = None,
     ) -> List[Match]:
         """Begin recursive matching where a search phrase root token has matched a document
         token.
         """
+        if search_phrase.has_single_matchable_word and search_phrase.matchable_token_indexes == [
+            search_phrase.root_token_index
+        ]:
+            return self.get_single_word_matches(
+                word_matching_strategies,
+                search_phrase,
+                document_token,
+                document_subword_index,
+                document_label,
+            )
         # array of sets to guard against endless looping during recursion. Each set
         # corresponds to the search phrase token with its index and contains the Index objects
         # for the document words for which a match to that search phrase token has been attempted.
@@ -410,6 +1264,8 @@ class StructuralMatcher:
             structurally_matched_document_token=document_token,
             compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
             process_initial_question_words=process_initial_question_words,
+            dependency_network=dependency_network,
+            match_memo=match_memo,
         )
         if word_match_dicts is None:
             return []
@@ -464,6 +1320,64 @@ class StructuralMatcher:
             matches.append(match)
         return matches
 
+    def get_single_word_matches(
+        self,
+        word_matching_strategies: List[WordMatchingStrategy],
+        search_phrase: SearchPhrase,
+        document_token: Token,
+        document_subword_index: Optional[int],
+        document_label: str,
+    ) -> List[Match]:
+        """Matches a search phrase whose root token is its only matchable token to a document
+        token without the bookkeeping needed for recursive matching, returning the same matches
+        as *match_recursively()* would."""
+        word_match = self.get_word_match(
+            word_matching_strategies,
+            search_phrase,
+            search_phrase.root_token,
+            document_token,
+            document_subword_index,
+        )
+        if word_match is None:
+            return []
+        # A subword expressed on another token can only be matched together with a subword on
+        # the token where it is modelled, which a single word can never supply.
+        if (
+            word_match.document_subword is not None
+            and word_match.document_token.i
+            != word_match.document_subword.containing_token_index
+        ):
+            return []
+        word_match.structurally_matched_document_token = document_token
+        word_match.is_negated = document_token._.holmes.is_negated
+        word_match.is_uncertain = document_token._.holmes.is_uncertain
+        match = Match(
+            search_phrase.label,
+            search_phrase.doc_text,
+            document_label,
+            search_phrase.topic_match_phraselet,
+            search_phrase.topic_match_phraselet_created_without_matching_tags,
+            search_phrase.reverse_only,
+        )
+        match.word_matches.append(word_match)
+        if word_match.is_negated:
+            match.is_negated = True
+        if word_match.is_uncertain:
+            match.is_uncertain = True
+        match.index_within_document = word_match.document_token.i
+        if search_phrase.topic_match_phraselet:
+            word_match.temp_is_parent = True
+        # Calculated as in *get_matches_starting_at_root_word_match()* so that the type of a
+        # NumPy similarity measure is promoted in the same way.
+        not_normalized_overall_similarity_measure = 1.0 * word_match.similarity_measure
+        if not_normalized_overall_similarity_measure < 1.0:
+            match.overall_similarity_measure = round(
+                not_normalized_overall_similarity_measure
+                ** (1 / len(search_phrase.matchable_non_entity_tokens_to_vectors)),
+                8,
+            )
+        return [match]
+
     def _subword_containing_token_is_within_match(
         self, word_match: WordMatch, other_word_matches: ValuesView[WordMatch]
     ) -> bool:
@@ -496,11 +1410,139 @@ class StructuralMatcher:
         is_uncertain: bool,
         structurally_matched_document_token: Token,
         compare_embeddings_on_non_root_words: bool,
-        process_initial_question_words: bool
+        process_initial_question_words: bool,
+        dependency_network: Optional["DependencyNetwork"],
+        match_memo: Optional["MatchMemo"]
     ) -> Optional[List[Dict[Token, WordMatch]]]:
         """Called whenever matching is attempted between a search phrase token and a document
         token."""
         index = Index(document_token.i, document_subword_index)
+        # The root token is matched once to each document word, so memoizing it would be futile.
+        if match_memo is None or search_phrase_token.i == search_phrase.root_token_index:
+            memo_key = None
+            potential_word_match = self.get_word_match(
+                word_matching_strategies,
+                search_phrase,
+                search_phrase_token,
+                document_token,
+                document_subword_index,
+            )
+        else:
+            memo_key = (
+                id(search_phrase),
+                search_phrase_token.i,
+                match_memo.document_keys.get_key(document),
+                document_token.i,
+                document_subword_index,
+            )
+            if match_memo.has_word_match(memo_key):
+                potential_word_match = match_memo.get_word_match(memo_key)
+            else:
+                potential_word_match = self.get_word_match(
+                    word_matching_strategies,
+                    search_phrase,
+                    search_phrase_token,
+                    document_token,
+                    document_subword_index,
+                )
+                match_memo.add_word_match(memo_key, potential_word_match)
+        if potential_word_match is None:
+            return None
+
+        word_match_dicts_to_return = [{search_phrase_token: potential_word_match}]
+        already_recursed = (
+            index in search_phrase_and_document_visited_table[search_phrase_token.i]
+        )
+        search_phrase_and_document_visited_table[search_phrase_token.i].add(index)
+
+        if not search_phrase.has_single_matchable_word and not already_recursed:
+            descendant_token_indexes = None
+            if memo_key is not None:
+                descendant_token_indexes = match_memo.get_descendant_token_indexes(
+                    self,
+                    search_phrase,
+                    search_phrase_token,
+                    process_initial_question_words,
+                )
+                # The matches for the subtree beneath the search phrase token only depend on the
+                # document word if none of the search phrase tokens within it have been visited.
+                if descendant_token_indexes is not None and (
+                    len(descendant_token_indexes) == 0
+                    or any(
+                        search_phrase_and_document_visited_table[descendant_token_index]
+                        for descendant_token_index in descendant_token_indexes
+                    )
+                ):
+                    descendant_token_indexes = None
+            if descendant_token_indexes is not None and match_memo.has_subtree_match_dicts(
+                memo_key
+            ):
+                (
+                    subtree_match_dicts,
+                    descendant_token_indexes_to_visited_indexes,
+                ) = match_memo.get_subtree_match_dicts(memo_key)
+                for (
+                    descendant_token_index,
+                    visited_indexes,
+                ) in descendant_token_indexes_to_visited_indexes.items():
+                    search_phrase_and_document_visited_table[
+                        descendant_token_index
+                    ].update(visited_indexes)
+                if subtree_match_dicts is not None:
+                    subtree_match_dicts = [
+                        {**word_match_dict, search_phrase_token: potential_word_match}
+                        for word_match_dict in subtree_match_dicts
+                    ]
+            else:
+                subtree_match_dicts = self.match_search_phrase_children(
+                    word_matching_strategies=word_matching_strategies,
+                    search_phrase=search_phrase,
+                    search_phrase_token=search_phrase_token,
+                    document=document,
+                    document_token=document_token,
+                    document_subword_index=document_subword_index,
+                    search_phrase_and_document_visited_table=search_phrase_and_document_visited_table,
+                    word_match_dicts_to_return=word_match_dicts_to_return,
+                    compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
+                    process_initial_question_words=process_initial_question_words,
+                    dependency_network=dependency_network,
+                    match_memo=match_memo,
+                )
+                if descendant_token_indexes is not None:
+                    match_memo.add_subtree_match_dicts(
+                        memo_key,
+                        subtree_match_dicts,
+                        {
+                            descendant_token_index: set(
+                                search_phrase_and_document_visited_table[
+                                    descendant_token_index
+                                ]
+                            )
+                            for descendant_token_index in descendant_token_indexes
+                        },
+                    )
+            if subtree_match_dicts is None:
+                return None
+            word_match_dicts_to_return = subtree_match_dicts
+        potential_word_match.structurally_matched_document_token = (
+            structurally_matched_document_token
+        )
+        potential_word_match.is_negated = document_token._.holmes.is_negated
+        potential_word_match.is_uncertain = (
+            is_uncertain or document_token._.holmes.is_uncertain
+        )
+        return word_match_dicts_to_return
+
+    def get_word_match(
+        self,
+        word_matching_strategies: List[WordMatchingStrategy],
+        search_phrase: SearchPhrase,
+        search_phrase_token: Token,
+        document_token: Token,
+        document_subword_index: Optional[int],
+    ) -> Optional[WordMatch]:
+        """Returns the first match between a search phrase token and a document token or subword
+        found by *word_matching_strategies*, or *None* if there is no match."""
         if document_subword_index is None:
             for word_matching_strategy in word_matching_strategies:
                 if document_token._.holmes.multiword_spans is not None:
@@ -531,276 +1573,359 @@ class StructuralMatcher:
                     break
             else:
                 return None
+        return potential_word_match
 
-        word_match_dicts_to_return = [{search_phrase_token: potential_word_match}]
-        already_recursed = (
-            index in search_phrase_and_document_visited_table[search_phrase_token.i]
-        )
-        search_phrase_and_document_visited_table[search_phrase_token.i].add(index)
-
-        if not search_phrase.has_single_matchable_word and not already_recursed:
-            for dependency in (
-                dependency
-                for dependency in search_phrase_token._.holmes.children
-                if dependency.child_token(search_phrase_token.doc)._.holmes.is_matchable
-                or (
-                    search_phrase.topic_match_phraselet
-                    and process_initial_question_words
-                    and dependency.child_token(
-                        search_phrase_token.doc
-                    )._.holmes.is_initial_question_word
+    def match_search_phrase_children(
+        self,
+        *,
+        word_matching_strategies: List[WordMatchingStrategy],
+        search_phrase: SearchPhrase,
+        search_phrase_token: Token,
+        document: Doc,
+        document_token: Token,
+        document_subword_index: Optional[int],
+        search_phrase_and_document_visited_table: List[Set[Index]],
+        word_match_dicts_to_return: List[Dict[Token, WordMatch]],
+        compare_embeddings_on_non_root_words: bool,
+        process_initial_question_words: bool,
+        dependency_network: Optional["DependencyNetwork"],
+        match_memo: Optional["MatchMemo"]
+    ) -> Optional[List[Dict[Token, WordMatch]]]:
+        """Extends *word_match_dicts_to_return*, which contain the match for *search_phrase_token*,
+        with matches for the search phrase tokens beneath it, or returns *None* if at least
+        one of its children cannot be matched."""
+        for dependency in self.get_search_phrase_dependencies_to_match(
+            search_phrase, search_phrase_token, process_initial_question_words
+        ):
+            search_phrase_child_token = dependency.child_token(
+                search_phrase_token.doc
+            )
+            this_dependency_word_match_dicts = []
+            if dependency_network is None:
+                dependency_join = self.get_dependency_join(
+                    document_token, document_subword_index, dependency.label
                 )
-            ):
-                search_phrase_child_token = dependency.child_token(
-                    search_phrase_token.doc
+            else:
+                dependency_join = dependency_network.get_dependency_join(
+                    document_token, document_subword_index, dependency.label
                 )
-                this_dependency_word_match_dicts = []
-                # Loop through this token and any tokens linked to it by coreference
-                working_document_parent_indexes = [
-                    Index(document_token.i, document_subword_index)
-                ]
-                if self.perform_coreference_resolution and (
-                    document_subword_index is None
-                    or document_token._.holmes.subwords[document_subword_index].is_head
-                ):
-                    working_document_parent_indexes.extend(
-                        [
-                            Index(token_index, None)
-                            for token_index in document_token._.holmes.token_and_coreference_chain_indexes
-                            if token_index != document_token.i
-                        ]
-                    )
-                    # Try coreferents closer to the structurally match token first. Once we've matched a document
-                    # child from one of these coreferents, it shouldn't be matched again from elsewhere in the chain
-                    working_document_parent_indexes.sort(
-                        key=lambda index: (
-                            abs(index.token_index - document_token.i),
-                            index.token_index > document_token.i,
-                        )
-                    )
-                matched_document_indexes_for_parent = []
-                for working_document_parent_index in working_document_parent_indexes:
-                    document_parent_token = document_token.doc[
-                        working_document_parent_index.token_index
-                    ]
-                    if (
-                        not working_document_parent_index.is_subword()
-                        or document_parent_token._.holmes.subwords[
-                            working_document_parent_index.subword_index
-                        ].is_head
-                    ):
-                        # is_head: e.g. 'Polizeiinformation über Kriminelle' should match
-                        # 'Information über Kriminelle'
-
-                        # inverse_polarity_boolean: *True* in the special case where the
-                        # dependency has been matched backwards
-                        document_dependencies_to_inverse_polarity_booleans = {
-                            document_dependency: False
-                            for document_dependency in document_parent_token._.holmes.children
-                            if self.semantic_matching_helper.dependency_labels_match(
-                                search_phrase_dependency_label=dependency.label,
-                                document_dependency_label=document_dependency.label,
-                                inverse_polarity=False,
-                            )
-                        }
-                        document_dependencies_to_inverse_polarity_booleans.update(
-                            {
-                                document_dependency: True
-                                for document_dependency in document_parent_token._.holmes.parents
-                                if self.use_reverse_dependency_matching
-                                and self.semantic_matching_helper.dependency_labels_match(
-                                    search_phrase_dependency_label=dependency.label,
-                                    document_dependency_label=document_dependency.label,
-                                    inverse_polarity=True,
-                                )
-                            }
-                        )
+            matched_document_indexes_for_parent = []
+            for (
+                working_document_parent_index,
+                document_dependency_candidates,
+                dependent_subword_index,
+                governor_subword_index,
+            ) in dependency_join:
+                for (
+                    document_dependency,
+                    inverse_polarity,
+                    document_child,
+                    working_document_child_indexes_by_mention,
+                ) in document_dependency_candidates:
+                    for (
+                        working_document_child_indexes
+                    ) in working_document_child_indexes_by_mention:
+                        at_least_one_match_within_mention = False
                         for (
-                            document_dependency,
-                            inverse_polarity,
-                        ) in document_dependencies_to_inverse_polarity_booleans.items():
-                            if not inverse_polarity:
-                                document_child = document_dependency.child_token(
-                                    document_token.doc
-                                )
-                            else:
-                                document_child = document_dependency.parent_token(
-                                    document_token.doc
-                                )
-                            working_document_child_mentions = [[document_child.i]]
+                            working_document_child_index
+                        ) in working_document_child_indexes:
+                            if search_phrase.question_phraselet and document[
+                                working_document_parent_index.token_index
+                            ] in self.semantic_matching_helper.get_subtree_list_for_question_answer(
+                                document[working_document_child_index.token_index]
+                            ):
+                                # e.g. 'Who did Richard see?' 'The person Richard saw was angry'
+                                continue
                             if (
-                                self.perform_coreference_resolution
-                                and document_child._.holmes.mentions is not None
+                                working_document_child_index
+                                in matched_document_indexes_for_parent
                             ):
-                                working_document_child_mentions.extend(
-                                    [
-                                        m.indexes
-                                        for m in document_child._.holmes.mentions
-                                        if document_child.i not in m.indexes
-                                    ]
-                                )
-                            for (
-                                working_document_child_mention
-                            ) in working_document_child_mentions:
-                                if (
-                                    document_token.doc[
-                                        working_document_child_mention[0]
-                                    ].pos_
-                                    == "PRON"
-                                ):
-                                    continue
-                                working_document_child_indexes = []
-                                for (
-                                    working_document_child_token_index
-                                ) in working_document_child_mention:
-                                    working_document_child_indexes.append(
-                                        Index(working_document_child_token_index, None)
-                                    )
-                                    working_document_child = document_token.doc[
-                                        working_document_child_token_index
-                                    ]
-                                    for subword in (
-                                        subword
-                                        for subword in working_document_child._.holmes.subwords
-                                        if subword.is_head
-                                    ):
-                                        working_document_child_indexes.append(
-                                            Index(
-                                                working_document_child.i, subword.index
-                                            )
-                                        )
-                                at_least_one_match_within_mention = False
-                                for (
-                                    working_document_child_index
-                                ) in working_document_child_indexes:
-                                    if search_phrase.question_phraselet and document[
-                                        working_document_parent_index.token_index
-                                    ] in self.semantic_matching_helper.get_subtree_list_for_question_answer(
-                                        document[
-                                            working_document_child_index.token_index
-                                        ]
-                                    ):
-                                        # e.g. 'Who did Richard see?' 'The person Richard saw was angry'
-                                        continue
-                                    if (
-                                        working_document_child_index
-                                        in matched_document_indexes_for_parent
-                                    ):
-                                        continue
-                                    word_match_dicts = self.match_recursively(
-                                        word_matching_strategies=word_matching_strategies,
-                                        search_phrase=search_phrase,
-                                        search_phrase_token=search_phrase_child_token,
-                                        document=document,
-                                        document_token=document[
-                                            working_document_child_index.token_index
-                                        ],
-                                        document_subword_index=working_document_child_index.subword_index,
-                                        search_phrase_and_document_visited_table=search_phrase_and_document_visited_table,
-                                        is_uncertain=(
-                                            (
-                                                document_dependency.is_uncertain
-                                                and not dependency.is_uncertain
-                                            )
-                                            or inverse_polarity
-                                        ),
-                                        structurally_matched_document_token=document_child,
-                                        compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
-                                        process_initial_question_words=process_initial_question_words,
-                                    )
-                                    if word_match_dicts is not None:
-                                        at_least_one_match_within_mention = True
-                                        this_dependency_word_match_dicts.extend(
-                                            word_match_dicts
-                                        )
-                                        matched_document_indexes_for_parent.append(
-                                            working_document_child_index
-                                        )
-                                if at_least_one_match_within_mention:
-                                    break
-                    if working_document_parent_index.is_subword():
-                        # examine relationship to dependent subword in the same word
-                        document_parent_subword = document_token.doc[
-                            working_document_parent_index.token_index
-                        ]._.holmes.subwords[working_document_parent_index.subword_index]
-                        if (
-                            document_parent_subword.dependent_index is not None
-                            and self.semantic_matching_helper.dependency_labels_match(
-                                search_phrase_dependency_label=dependency.label,
-                                document_dependency_label=document_parent_subword.dependency_label,
-                                inverse_polarity=False,
-                            )
-                        ):
+                                continue
                             word_match_dicts = self.match_recursively(
                                 word_matching_strategies=word_matching_strategies,
                                 search_phrase=search_phrase,
                                 search_phrase_token=search_phrase_child_token,
                                 document=document,
-                                document_token=document_token,
-                                document_subword_index=document_parent_subword.dependent_index,
+                                document_token=document[
+                                    working_document_child_index.token_index
+                                ],
+                                document_subword_index=working_document_child_index.subword_index,
                                 search_phrase_and_document_visited_table=search_phrase_and_document_visited_table,
-                                is_uncertain=False,
-                                structurally_matched_document_token=document_token,
+                                is_uncertain=(
+                                    (
+                                        document_dependency.is_uncertain
+                                        and not dependency.is_uncertain
+                                    )
+                                    or inverse_polarity
+                                ),
+                                structurally_matched_document_token=document_child,
                                 compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
                                 process_initial_question_words=process_initial_question_words,
+                                dependency_network=dependency_network,
+                                match_memo=match_memo,
                             )
                             if word_match_dicts is not None:
+                                at_least_one_match_within_mention = True
                                 this_dependency_word_match_dicts.extend(
                                     word_match_dicts
                                 )
-                        # examine relationship to governing subword in the same word
-                        document_child_subword = document_token.doc[
-                            working_document_parent_index.token_index
-                        ]._.holmes.subwords[working_document_parent_index.subword_index]
+                                matched_document_indexes_for_parent.append(
+                                    working_document_child_index
+                                )
+                        if at_least_one_match_within_mention:
+                            break
+                # examine relationships to dependent and governing subwords in the same word
+                for subword_index in (dependent_subword_index, governor_subword_index):
+                    if subword_index is None:
+                        continue
+                    word_match_dicts = self.match_recursively(
+                        word_matching_strategies=word_matching_strategies,
+                        search_phrase=search_phrase,
+                        search_phrase_token=search_phrase_child_token,
+                        document=document,
+                        document_token=document_token,
+                        document_subword_index=subword_index,
+                        search_phrase_and_document_visited_table=search_phrase_and_document_visited_table,
+                        is_uncertain=False,
+                        structurally_matched_document_token=document_token,
+                        compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
+                        process_initial_question_words=process_initial_question_words,
+                        dependency_network=dependency_network,
+                        match_memo=match_memo,
+                    )
+                    if word_match_dicts is not None:
+                        this_dependency_word_match_dicts.extend(word_match_dicts)
+            if len(this_dependency_word_match_dicts) == 0:
+                return None
+            new_word_match_dicts_to_return = []
+            for dependency_word_match_dict in this_dependency_word_match_dicts:
+                for existing_word_match_dict in (
+                    w.copy() for w in word_match_dicts_to_return
+                ):
+                    merged_word_match_dict = self.merge_word_match_dicts(
+                        existing_word_match_dict, dependency_word_match_dict
+                    )
+                    if merged_word_match_dict is not None:
+                        new_word_match_dicts_to_return.append(
+                            merged_word_match_dict
+                        )
+            word_match_dicts_to_return = new_word_match_dicts_to_return
+        return word_match_dicts_to_return
+
+    def get_search_phrase_dependencies_to_match(
+        self,
+        search_phrase: SearchPhrase,
+        search_phrase_token: Token,
+        process_initial_question_words: bool,
+    ) -> List[SemanticDependency]:
+        """Returns the dependencies from *search_phrase_token* to the children that have to be
+        matched."""
+        return [
+            dependency
+            for dependency in search_phrase_token._.holmes.children
+            if dependency.child_token(search_phrase_token.doc)._.holmes.is_matchable
+            or (
+                search_phrase.topic_match_phraselet
+                and process_initial_question_words
+                and dependency.child_token(
+                    search_phrase_token.doc
+                )._.holmes.is_initial_question_word
+            )
+        ]
+
+    def get_dependency_join(
+        self,
+        document_token: Token,
+        document_subword_index: Optional[int],
+        search_phrase_dependency_label: Optional[str],
+    ) -> DependencyJoin:
+        """Returns the document words that are candidates for matching the child of a search
+        phrase dependency with *search_phrase_dependency_label* whose parent has matched the
+        document word at *document_token* and *document_subword_index*. The result does not
+        depend on the search phrase and is a list with an entry for the document word and for
+        each document word linked to it by coreference, tried in that order. Each entry is a
+        tuple of:
+
+        the *Index* of the document word;
+        a list of tuples of *(document_dependency, inverse_polarity, document_child,
+            working_document_child_indexes_by_mention)*, where *inverse_polarity* is *True* in the
+            special case where the dependency has been matched backwards and
+            *working_document_child_indexes_by_mention* contains a list of the indexes of
+            *document_child* and each of its coreferring mentions;
+        the index of a dependent subword within the same word that is a candidate, or *None*;
+        the index of a governing subword within the same word that is a candidate, or *None*.
+
+        If *search_phrase_dependency_label* is *None*, document dependencies with any label are
+        candidates.
+        """
+        dependency_join = []
+        # Loop through this token and any tokens linked to it by coreference
+        working_document_parent_indexes = [
+            Index(document_token.i, document_subword_index)
+        ]
+        if self.perform_coreference_resolution and (
+            document_subword_index is None
+            or document_token._.holmes.subwords[document_subword_index].is_head
+        ):
+            working_document_parent_indexes.extend(
+                [
+                    Index(token_index, None)
+                    for token_index in document_token._.holmes.token_and_coreference_chain_indexes
+                    if token_index != document_token.i
+                ]
+            )
+            # Try coreferents closer to the structurally match token first. Once we've matched a document
+            # child from one of these coreferents, it shouldn't be matched again from elsewhere in the chain
+            working_document_parent_indexes.sort(
+                key=lambda index: (
+                    abs(index.token_index - document_token.i),
+                    index.token_index > document_token.i,
+                )
+            )
+        for working_document_parent_index in working_document_parent_indexes:
+            document_parent_token = document_token.doc[
+                working_document_parent_index.token_index
+            ]
+            document_dependency_candidates = []
+            if (
+                not working_document_parent_index.is_subword()
+                or document_parent_token._.holmes.subwords[
+                    working_document_parent_index.subword_index
+                ].is_head
+            ):
+                # is_head: e.g. 'Polizeiinformation über Kriminelle' should match
+                # 'Information über Kriminelle'
+                document_dependencies_to_inverse_polarity_booleans = {
+                    document_dependency: False
+                    for document_dependency in document_parent_token._.holmes.children
+                    if self.dependency_labels_match(
+                        search_phrase_dependency_label=search_phrase_dependency_label,
+                        document_dependency_label=document_dependency.label,
+                        inverse_polarity=False,
+                    )
+                }
+                document_dependencies_to_inverse_polarity_booleans.update(
+                    {
+                        document_dependency: True
+                        for document_dependency in document_parent_token._.holmes.parents
+                        if self.use_reverse_dependency_matching
+                        and self.dependency_labels_match(
+                            search_phrase_dependency_label=search_phrase_dependency_label,
+                            document_dependency_label=document_dependency.label,
+                            inverse_polarity=True,
+                        )
+                    }
+                )
+                for (
+                    document_dependency,
+                    inverse_polarity,
+                ) in document_dependencies_to_inverse_polarity_booleans.items():
+                    if not inverse_polarity:
+                        document_child = document_dependency.child_token(
+                            document_token.doc
+                        )
+                    else:
+                        document_child = document_dependency.parent_token(
+                            document_token.doc
+                        )
+                    working_document_child_mentions = [[document_child.i]]
+                    if (
+                        self.perform_coreference_resolution
+                        and document_child._.holmes.mentions is not None
+                    ):
+                        working_document_child_mentions.extend(
+                            [
+                                m.indexes
+                                for m in document_child._.holmes.mentions
+                                if document_child.i not in m.indexes
+                            ]
+                        )
+                    working_document_child_indexes_by_mention = []
+                    for working_document_child_mention in working_document_child_mentions:
                         if (
-                            document_child_subword.governor_index is not None
-                            and self.use_reverse_dependency_matching
-                            and self.semantic_matching_helper.dependency_labels_match(
-                                search_phrase_dependency_label=dependency.label,
-                                document_dependency_label=document_parent_subword.governing_dependency_label,
-                                inverse_polarity=True,
-                            )
+                            document_token.doc[working_document_child_mention[0]].pos_
+                            == "PRON"
                         ):
-                            word_match_dicts = self.match_recursively(
-                                word_matching_strategies=word_matching_strategies,
-                                search_phrase=search_phrase,
-                                search_phrase_token=search_phrase_child_token,
-                                document=document,
-                                document_token=document_token,
-                                document_subword_index=document_parent_subword.governor_index,
-                                search_phrase_and_document_visited_table=search_phrase_and_document_visited_table,
-                                is_uncertain=False,
-                                structurally_matched_document_token=document_token,
-                                compare_embeddings_on_non_root_words=compare_embeddings_on_non_root_words,
-                                process_initial_question_words=process_initial_question_words,
+                            continue
+                        working_document_child_indexes = []
+                        for (
+                            working_document_child_token_index
+                        ) in working_document_child_mention:
+                            working_document_child_indexes.append(
+                                Index(working_document_child_token_index, None)
                             )
-                            if word_match_dicts is not None:
-                                this_dependency_word_match_dicts.extend(
-                                    word_match_dicts
+                            working_document_child = document_token.doc[
+                                working_document_child_token_index
+                            ]
+                            for subword in (
+                                subword
+                                for subword in working_document_child._.holmes.subwords
+                                if subword.is_head
+                            ):
+                                working_document_child_indexes.append(
+                                    Index(working_document_child.i, subword.index)
                                 )
-                if len(this_dependency_word_match_dicts) == 0:
-                    return None
-                new_word_match_dicts_to_return = []
-                for dependency_word_match_dict in this_dependency_word_match_dicts:
-                    for existing_word_match_dict in (
-                        w.copy() for w in word_match_dicts_to_return
-                    ):
-                        merged_word_match_dict = self.merge_word_match_dicts(
-                            existing_word_match_dict, dependency_word_match_dict
+                        working_document_child_indexes_by_mention.append(
+                            working_document_child_indexes
                         )
-                        if merged_word_match_dict is not None:
-                            new_word_match_dicts_to_return.append(
-                                merged_word_match_dict
-                            )
-                word_match_dicts_to_return = new_word_match_dicts_to_return
-        potential_word_match.structurally_matched_document_token = (
-            structurally_matched_document_token
-        )
-        potential_word_match.is_negated = document_token._.holmes.is_negated
-        potential_word_match.is_uncertain = (
-            is_uncertain or document_token._.holmes.is_uncertain
+                    document_dependency_candidates.append(
+                        (
+                            document_dependency,
+                            inverse_polarity,
+                            document_child,
+                            working_document_child_indexes_by_mention,
+                        )
+                    )
+            dependent_subword_index = governor_subword_index = None
+            if working_document_parent_index.is_subword():
+                document_parent_subword = document_parent_token._.holmes.subwords[
+                    working_document_parent_index.subword_index
+                ]
+                if (
+                    document_parent_subword.dependent_index is not None
+                    and self.dependency_labels_match(
+                        search_phrase_dependency_label=search_phrase_dependency_label,
+                        document_dependency_label=document_parent_subword.dependency_label,
+                        inverse_polarity=False,
+                    )
+                ):
+                    dependent_subword_index = document_parent_subword.dependent_index
+                if (
+                    document_parent_subword.governor_index is not None
+                    and self.use_reverse_dependency_matching
+                    and self.dependency_labels_match(
+                        search_phrase_dependency_label=search_phrase_dependency_label,
+                        document_dependency_label=document_parent_subword.governing_dependency_label,
+                        inverse_polarity=True,
+                    )
+                ):
+                    governor_subword_index = document_parent_subword.governor_index
+            dependency_join.append(
+                (
+                    working_document_parent_index,
+                    document_dependency_candidates,
+                    dependent_subword_index,
+                    governor_subword_index,
+                )
+            )
+        return dependency_join
+
+    def dependency_labels_match(
+        self,
+        *,
+        search_phrase_dependency_label: Optional[str],
+        document_dependency_label: str,
+        inverse_polarity: bool
+    ) -> bool:
+        """See *SemanticMatchingHelper.dependency_labels_match()*. If
+        *search_phrase_dependency_label* is *None*, any document dependency label matches."""
+        if search_phrase_dependency_label is None:
+            return True
+        return self.semantic_matching_helper.dependency_labels_match(
+            search_phrase_dependency_label=search_phrase_dependency_label,
+            document_dependency_label=document_dependency_label,
+            inverse_polarity=inverse_polarity,
         )
-        return word_match_dicts_to_return
 
     def merge_word_match_dicts(
         self, existing_word_match_dict, dependency_word_match_dict
@@ -818,37 +1943,106 @@ class StructuralMatcher:
                 return None
         return existing_word_match_dict
 
-    def build_match_dictionaries(self, matches: List[Match]) -> List[Dict]:
-        """Builds and returns a sorted list of match dictionaries."""
+    @staticmethod
+    def get_match_dictionary_fields(
+        fields: Optional[Iterable[str]],
+    ) -> Tuple[Set[str], Set[str]]:
+        """Returns the match dictionary keys and the word match dictionary keys selected by
+        *fields* (see *build_match_dictionaries()*), raising *ValueError* if *fields* contains
+        an unknown field."""
+        if fields is None:
+            return set(MATCH_DICTIONARY_FIELDS), set(WORD_MATCH_DICTIONARY_FIELDS)
+        match_fields = {"document", "overall_similarity_measure"}
+        word_match_fields = set()
+        for field in fields:
+            if field in MATCH_DICTIONARY_FIELDS:
+                match_fields.add(field)
+                if field == "word_matches":
+                    word_match_fields.update(WORD_MATCH_DICTIONARY_FIELDS)
+            elif (
+                field.startswith("word_matches.")
+                and field[len("word_matches.") :] in WORD_MATCH_DICTIONARY_FIELDS
+            ):
+                match_fields.add("word_matches")
+                word_match_fields.add(field[len("word_matches.") :])
+            else:
+                raise ValueError("".join(("Unknown match dictionary field: ", field)))
+        return match_fields, word_match_fields
+
+    @staticmethod
+    def get_sentences_string(
+        match: Match, token_sentence_indexes: Dict[int, Tuple[List[Span], List[int]]]
+    ) -> str:
+        """Returns the text of the sentences spanned by *match*. *token_sentence_indexes*
+        is a dictionary from document ids to the sentences within each document and a list of
+        the index of the sentence containing each token; it is filled in the first time each
+        document is encountered."""
+        doc = match.word_matches[0].document_token.doc
+        if id(doc) not in token_sentence_indexes:
+            sentences = list(doc.sents)
+            sentence_indexes = [0] * len(doc)
+            for sentence_index, sentence in enumerate(sentences):
+                for token_index in range(sentence.start, sentence.end):
+                    sentence_indexes[token_index] = sentence_index
+            token_sentence_indexes[id(doc)] = (sentences, sentence_indexes)
+        sentences, sentence_indexes = token_sentence_indexes[id(doc)]
+        match_sentence_indexes = [
+            sentence_indexes[word_match.document_token.i]
+            for word_match in match.word_matches
+        ]
+        return " ".join(
+            sentence.text.strip()
+            for sentence in sentences[
+                min(match_sentence_indexes) : max(match_sentence_indexes) + 1
+            ]
+        )
+
+    def build_match_dictionaries(
+        self, matches: List[Match], fields: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """Builds and returns a list of match dictionaries.
+
+        Parameters:
+
+        matches -- the matches.
+        fields -- the keys to include in each match dictionary, or *None* if all keys should be
+            included. *word_matches* includes all the keys of each word match dictionary, while
+            e.g. *word_matches.document_word* only includes the *document_word* key. The keys
+            *document* and *overall_similarity_measure* are always included. Values that are
+            expensive to determine, e.g. *sentences_within_document*, *document_phrase* and
+            *explanation*, are only determined if they are included.
+        """
+        match_fields, word_match_fields = self.get_match_dictionary_fields(fields)
+        filter_match_dicts = len(match_fields) < len(MATCH_DICTIONARY_FIELDS)
+        filter_word_match_dicts = len(word_match_fields) < len(
+            WORD_MATCH_DICTIONARY_FIELDS
+        )
+        include_sentences = "sentences_within_document" in match_fields
+        include_word_matches = "word_matches" in match_fields
+        include_document_phrases = "document_phrase" in word_match_fields
+        include_explanations = "explanation" in word_match_fields
+        token_sentence_indexes: Dict[int, Tuple[List[Span], List[int]]] = {}
         match_dicts: List[Dict[str, Any]] = []
         for match in matches:
-            earliest_sentence_index = sys.maxsize
-            latest_sentence_index = -1
-            for word_match in match.word_matches:
-                sentence_index = word_match.document_token.sent.start
-                earliest_sentence_index = min(sentence_index, earliest_sentence_index)
-                latest_sentence_index = max(sentence_index, latest_sentence_index)
-            sentences_string = " ".join(
-                sentence.text.strip()
-                for sentence in match.word_matches[0].document_token.doc.sents
-                if sentence.start >= earliest_sentence_index
-                and sentence.start <= latest_sentence_index
-            )
             match_dict: Dict[str, Any] = {
                 "search_phrase_label": match.search_phrase_label,
                 "search_phrase_text": match.search_phrase_text,
                 "document": match.document_label,
                 "index_within_document": match.index_within_document,
-                "sentences_within_document": sentences_string,
+                "sentences_within_document": self.get_sentences_string(
+                    match, token_sentence_indexes
+                )
+                if include_sentences
+                else None,
                 "negated": match.is_negated,
                 "uncertain": match.is_uncertain,
                 "involves_coreference": match.involves_coreference,
                 "overall_similarity_measure": match.overall_similarity_measure,
             }
-            text_word_matches: List[Dict[str, Any]] = []
-            for word_match in match.word_matches:
-                text_word_matches.append(
-                    {
+            if include_word_matches:
+                text_word_matches: List[Dict[str, Any]] = []
+                for word_match in match.word_matches:
+                    word_match_dict: Dict[str, Any] = {
                         "search_phrase_token_index": word_match.search_phrase_token.i,
                         "search_phrase_word": word_match.search_phrase_word,
                         "document_token_index": word_match.document_token.i,
@@ -864,7 +2058,9 @@ class StructuralMatcher:
                         "document_word": word_match.document_word,
                         "document_phrase": self.semantic_matching_helper.get_dependent_phrase(
                             word_match.document_token, word_match.document_subword
-                        ),
+                        )
+                        if include_document_phrases
+                        else None,
                         "match_type": word_match.word_match_type,
                         "negated": word_match.is_negated,
                         "uncertain": word_match.is_uncertain,
@@ -872,9 +2068,23 @@ class StructuralMatcher:
                         "involves_coreference": word_match.involves_coreference,
                         "extracted_word": word_match.extracted_word,
                         "depth": word_match.depth,
-                        "explanation": word_match.explanation,
+                        "explanation": word_match.explanation
+                        if include_explanations
+                        else None,
                     }
-                )
-            match_dict["word_matches"] = text_word_matches
+                    if filter_word_match_dicts:
+                        word_match_dict = {
+                            key: value
+                            for key, value in word_match_dict.items()
+                            if key in word_match_fields
+                        }
+                    text_word_matches.append(word_match_dict)
+                match_dict["word_matches"] = text_word_matches
+            if filter_match_dicts:
+                match_dict = {
+                    key: value
+                    for key, value in match_dict.items()
+                    if key in match_fields
+                }
             match_dicts.append(match_dict)
         return match_dicts
@@ -1,14 +1,40 @@
-from typing import List, Set, Dict, Union, Any, Tuple, Optional, cast
+from typing import (
+    List,
+    Set,
+    Dict,
+    Union,
+    Any,
+    Tuple,
+    Optional,
+    Iterable,
+    Hashable,
+    cast,
+)
+from copy import copy
+from bisect import bisect_left
+import numpy
 from spacy.compat import Literal
 from spacy.tokens import Doc
 from thinc.types import Floats1d
 
-from .word_matching.general import WordMatch
+from .word_matching.general import WordMatch, WordMatchingStrategy
 from .structural_matching import Match, StructuralMatcher
 from .word_matching.embedding import EmbeddingWordMatchingStrategy
 from .word_matching.entity_embedding import EntityEmbeddingWordMatchingStrategy
 from .word_matching.question import QuestionWordMatchingStrategy
-from .parsing import Index, CorpusWordPosition, PhraseletInfo, SearchPhrase
+from .parsing import (
+    Index,
+    ReverseDictionary,
+    RelationIndex,
+    PhraseletInfo,
+    SearchPhrase,
+)
+from .caching import LRUCache
+
+
+# (score, number of words in text, document label, relative start index of first word info,
+# index within TopicMatcher.topic_matches): see TopicMatcher.get_topic_match_summaries()
+TopicMatchSummary = Tuple[float, int, str, int, int]
 
 
 class TopicMatch:
@@ -75,45 +101,513 @@ class PhraseletActivationTracker:
         self.score = score
 
 
+class ActivationScorer:
+    """Calculates the topic scores of the structural matches within a document from the
+    positions at which they occur, the labels of the phraselets that produced them and the
+    scores they contribute. The activation of each phraselet is the most recent score it has
+    reached, which tails off linearly to zero over *maximum_activation_distance* words; the
+    topic score of a match is the sum of the activations of all phraselets at its position.
+
+    *get_topic_scores()* calculates the same scores as *get_topic_scores_iteratively()*, down to
+    the last bit, using *NumPy* array operations. The activation of each phraselet only
+    changes at its own matches and each phraselet drops out at the first subsequent match
+    beyond *maximum_activation_distance*, so the periods during which each phraselet has a
+    given activation can be determined by a single pass over the matches. The activations
+    within each period are then calculated for blocks of matches at once and summed in the same
+    order as by the iterative algorithm, in which phraselets are summed in the order in which
+    they most recently became active.
+
+    Parameters:
+
+    maximum_activation_distance -- the number of words it takes for an activation to tail off
+        to zero.
+    """
+
+    # Documents with fewer matches are scored iteratively, which is faster for them.
+    MINIMUM_MATCHES_FOR_ARRAY_SCORING = 50
+
+    # The number of matches whose scores are calculated in each array operation.
+    BLOCK_SIZE = 256
+
+    def __init__(self, maximum_activation_distance: int) -> None:
+        self.maximum_activation_distance = maximum_activation_distance
+
+    def get_activation(self, distance: int, score: float) -> float:
+        tailoff_quotient = distance / self.maximum_activation_distance
+        tailoff_quotient = min(tailoff_quotient, 1.0)
+        return (1 - tailoff_quotient) * score
+
+    def get_topic_scores_iteratively(
+        self, positions: List[int], phraselet_labels: List[str], scores: List[float]
+    ) -> List[float]:
+        """Returns the topic scores of the matches with *positions*, *phraselet_labels* and
+        *scores*, which are sorted by position, by tracking the activation of each phraselet in
+        turn."""
+        phraselet_labels_to_phraselet_activation_trackers: Dict[
+            str, PhraseletActivationTracker
+        ] = {}
+        topic_scores = []
+        for position, phraselet_label, score in zip(
+            positions, phraselet_labels, scores
+        ):
+            if phraselet_label in phraselet_labels_to_phraselet_activation_trackers:
+                phraselet_activation_tracker = (
+                    phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
+                )
+                current_score = self.get_activation(
+                    position - phraselet_activation_tracker.position,
+                    phraselet_activation_tracker.score,
+                )
+                if score > current_score:
+                    phraselet_activation_tracker.score = score
+                else:
+                    phraselet_activation_tracker.score = current_score
+                phraselet_activation_tracker.position = position
+            else:
+                phraselet_labels_to_phraselet_activation_trackers[
+                    phraselet_label
+                ] = PhraseletActivationTracker(position, score)
+            topic_score = 0
+            for phraselet_label in list(
+                phraselet_labels_to_phraselet_activation_trackers
+            ):
+                phraselet_activation_tracker = (
+                    phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
+                )
+                current_activation = self.get_activation(
+                    position - phraselet_activation_tracker.position,
+                    phraselet_activation_tracker.score,
+                )
+                if current_activation <= 0:
+                    del phraselet_labels_to_phraselet_activation_trackers[
+                        phraselet_label
+                    ]
+                else:
+                    topic_score += current_activation
+            topic_scores.append(topic_score)
+        return topic_scores
+
+    def get_topic_scores(
+        self, positions: List[int], phraselet_labels: List[str], scores: List[float]
+    ) -> List[float]:
+        """Returns the topic scores of the matches with *positions*, *phraselet_labels* and
+        *scores*, which are sorted by position, using array operations. Falls back to
+        *get_topic_scores_iteratively()* for small documents and in the rare cases where the
+        two methods could differ, e.g. where an activation underflows to zero."""
+        number_of_matches = len(positions)
+        if (
+            number_of_matches < self.MINIMUM_MATCHES_FOR_ARRAY_SCORING
+            or not isinstance(self.maximum_activation_distance, int)
+            or self.maximum_activation_distance <= 0
+        ):
+            return self.get_topic_scores_iteratively(
+                positions, phraselet_labels, scores
+            )
+        # Each period during which a phraselet has a given activation is recorded as the
+        # match index at which the phraselet most recently became active, which determines the
+        # order of summation, the start and end match indexes, and the position and score from
+        # which the activation tails off.
+        periods: List[Tuple[int, int, int, int, float]] = []
+        # Phraselet labels to the match index at which the phraselet became active, the
+        # start match index, position and score of the current period, and the match index at
+        # which the phraselet drops out.
+        phraselet_labels_to_states: Dict[str, Tuple[int, int, int, float, int]] = {}
+        for match_index, (position, phraselet_label, score) in enumerate(
+            zip(positions, phraselet_labels, scores)
+        ):
+            state = phraselet_labels_to_states.get(phraselet_label)
+            if state is not None and state[4] < match_index:
+                periods.append((state[0], state[1], state[4], state[2], state[3]))
+                state = None
+            if state is None:
+                activation_index = match_index
+            else:
+                activation_index, start_index, last_position, last_score, _ = state
+                periods.append(
+                    (activation_index, start_index, match_index, last_position, last_score)
+                )
+                current_score = self.get_activation(
+                    position - last_position, last_score
+                )
+                if not score > current_score:
+                    score = current_score
+            if score > 0:
+                drop_out_index = bisect_left(
+                    positions,
+                    position + self.maximum_activation_distance,
+                    match_index + 1,
+                )
+            else:
+                drop_out_index = match_index
+            phraselet_labels_to_states[phraselet_label] = (
+                activation_index,
+                match_index,
+                position,
+                score,
+                drop_out_index,
+            )
+        for state in phraselet_labels_to_states.values():
+            periods.append(
+                (state[0], state[1], min(state[4], number_of_matches), state[2], state[3])
+            )
+        period_array = numpy.array(periods, dtype=numpy.float64)
+        activation_indexes = period_array[:, 0].astype(numpy.int64)
+        start_indexes = period_array[:, 1].astype(numpy.int64)
+        period_lengths = numpy.maximum(
+            period_array[:, 2].astype(numpy.int64) - start_indexes, 0
+        )
+        # Expand the periods into one entry for each match at which each phraselet is active.
+        entry_periods = numpy.repeat(numpy.arange(len(periods)), period_lengths)
+        entry_match_indexes = start_indexes[entry_periods] + (
+            numpy.arange(len(entry_periods))
+            - numpy.repeat(numpy.cumsum(period_lengths) - period_lengths, period_lengths)
+        )
+        period_positions = numpy.array([period[3] for period in periods])
+        activations = (
+            1
+            - numpy.minimum(
+                (
+                    numpy.array(positions)[entry_match_indexes]
+                    - period_positions[entry_periods]
+                )
+                / self.maximum_activation_distance,
+                1.0,
+            )
+        ) * period_array[entry_periods, 4]
+        if not numpy.all(activations > 0):
+            return self.get_topic_scores_iteratively(
+                positions, phraselet_labels, scores
+            )
+        # Sort the entries by match and then in the order in which the phraselets became active,
+        # and add the activations for each match in that order.
+        order = numpy.lexsort(
+            (activation_indexes[entry_periods], entry_match_indexes)
+        )
+        entry_match_indexes = entry_match_indexes[order]
+        activations = activations[order]
+        counts = numpy.bincount(entry_match_indexes, minlength=number_of_matches)
+        ranks = numpy.arange(len(entry_match_indexes)) - numpy.repeat(
+            numpy.cumsum(counts) - counts, counts
+        )
+        topic_score_array = numpy.zeros(number_of_matches)
+        for rank in range(int(counts.max()) if len(counts) > 0 else 0):
+            is_rank = ranks == rank
+            topic_score_array[entry_match_indexes[is_rank]] += activations[is_rank]
+        return [
+            topic_score if count > 0 else 0
+            for topic_score, count in zip(topic_score_array.tolist(), counts.tolist())
+        ]
+
+
 class PhraseletWordMatchInfo:
     def __init__(self):
-        self.single_word_match_corpus_words: Set[CorpusWordPosition] = set()
+        # The entries are *ReverseDictionary* position keys.
+
+        self.single_word_match_corpus_words: Set[int] = set()
         # The indexes at which the single word phraselet for this word was matched.
 
-        self.phraselet_labels_to_parent_match_corpus_words: Dict[
-            str, List[CorpusWordPosition]
-        ] = {}
+        self.phraselet_labels_to_parent_match_corpus_words: Dict[str, List[int]] = {}
         # Dictionary from phraselets with this word as the parent to indexes where the
         # phraselet was matched.
 
-        self.phraselet_labels_to_child_match_corpus_words: Dict[
-            str, List[CorpusWordPosition]
-        ] = {}
+        self.phraselet_labels_to_child_match_corpus_words: Dict[str, List[int]] = {}
         # Dictionary from phraselets with this word as the child to indexes where the
         # phraselet was matched.
 
-        self.parent_match_corpus_words_to_matches: Dict[
-            CorpusWordPosition, List[Match]
-        ] = {}
+        self.parent_match_corpus_words_to_matches: Dict[int, List[Match]] = {}
         # Dictionary from indexes where phraselets with this word as the parent were matched
         # to the match objects.
 
-        self.child_match_corpus_words_to_matches: Dict[
-            CorpusWordPosition, List[Match]
-        ] = {}
+        self.child_match_corpus_words_to_matches: Dict[int, List[Match]] = {}
         # Dictionary from indexes where phraselets with this word as the child were matched
         # to the match objects.
 
 
+def get_word_matching_strategies(
+    structural_matcher: StructuralMatcher,
+    overall_similarity_threshold: float,
+    initial_question_word_overall_similarity_threshold: float,
+    process_initial_question_words: bool,
+    entity_label_to_vector_dict: Dict[str, Floats1d],
+) -> List[WordMatchingStrategy]:
+    """Returns the word matching strategies used for topic matching."""
+    semantic_matching_helper = structural_matcher.semantic_matching_helper
+    word_matching_strategies = (
+        semantic_matching_helper.main_word_matching_strategies
+        + semantic_matching_helper.ontology_word_matching_strategies
+    )[:]
+    if overall_similarity_threshold < 1.0 or (
+        process_initial_question_words
+        and initial_question_word_overall_similarity_threshold < 1.0
+    ):
+        word_matching_strategies.append(
+            EmbeddingWordMatchingStrategy(
+                semantic_matching_helper,
+                structural_matcher.perform_coreference_resolution,
+                overall_similarity_threshold,
+                initial_question_word_overall_similarity_threshold
+                if process_initial_question_words
+                else overall_similarity_threshold,
+            )
+        )
+        word_matching_strategies.append(
+            EntityEmbeddingWordMatchingStrategy(
+                semantic_matching_helper,
+                structural_matcher.perform_coreference_resolution,
+                overall_similarity_threshold,
+                initial_question_word_overall_similarity_threshold
+                if process_initial_question_words
+                else overall_similarity_threshold,
+                entity_label_to_vector_dict,
+            )
+        )
+    if process_initial_question_words:
+        word_matching_strategies.append(
+            QuestionWordMatchingStrategy(
+                semantic_matching_helper,
+                structural_matcher.perform_coreference_resolution,
+                initial_question_word_overall_similarity_threshold,
+                entity_label_to_vector_dict,
+            )
+        )
+    return word_matching_strategies
+
+
+class PhraseletMatchCache:
+    """A cache retained by each worker process between topic matching requests from phraselets
+    and the properties that affect how they are matched to their structural matches within
+    the documents held by the worker process, so that phraselets shared by successive texts
+    only have to be matched once.
+
+    When a document is registered, the entries for phraselets whose root tokens can match a
+    word in the document are discarded; when a document is removed, its matches are removed
+    from the entries.
+
+    Parameters:
+
+    maximum_size -- the maximum number of phraselets whose matches are retained.
+    """
+
+    def __init__(self, maximum_size: int):
+        # The values are *(root_words, matches)* tuples where *root_words* is the set of
+        # reverse dictionary keys at which the phraselet root token can match, or *None* if it
+        # can match any noun.
+        self.lru_cache = LRUCache(maximum_size)
+        self.invalidations = 0
+
+    @staticmethod
+    def get_key(
+        search_phrase: SearchPhrase,
+        overall_similarity_threshold: float,
+        initial_question_word_overall_similarity_threshold: float,
+        process_initial_question_words: bool,
+        document_label_filter: Optional[str],
+    ) -> Hashable:
+        """Phraselet labels are made up of derived lemmas, so the properties of the matchable
+        tokens are included in the key as well as the label."""
+        return (
+            search_phrase.label,
+            tuple(
+                (
+                    token.i,
+                    token._.holmes.lemma,
+                    token._.holmes.derived_lemma,
+                    tuple(token._.holmes.direct_matching_reprs or ()),
+                    tuple(token._.holmes.derivation_matching_reprs or ()),
+                    token._.holmes.ent_type,
+                    token._.holmes.is_initial_question_word,
+                    token._.holmes.has_initial_question_word_in_phrase,
+                )
+                for token in search_phrase.matchable_tokens
+            ),
+            tuple(search_phrase.words_matching_root_token),
+            search_phrase.topic_match_phraselet_created_without_matching_tags,
+            search_phrase.reverse_only,
+            search_phrase.treat_as_reverse_only_during_initial_relation_matching,
+            overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold,
+            process_initial_question_words,
+            document_label_filter,
+        )
+
+    def get(self, key: Hashable) -> Optional[List[Match]]:
+        entry = self.lru_cache.get(key)
+        return None if entry is None else entry[1]
+
+    def put(
+        self, key: Hashable, root_words: Optional[Set[str]], matches: List[Match]
+    ) -> None:
+        self.lru_cache.put(key, (root_words, matches))
+
+    def register_document(self, words: Iterable[str]) -> None:
+        """Discards the entries that may lack matches within a newly registered document
+        containing *words*."""
+        words = set(words)
+        for key, (root_words, _) in self.lru_cache.items():
+            if root_words is None or not root_words.isdisjoint(words):
+                self.lru_cache.remove(key)
+                self.invalidations += 1
+
+    def remove_documents(self, document_labels: Iterable[str]) -> None:
+        document_labels = set(document_labels)
+        for _, (_, matches) in self.lru_cache.items():
+            matches[:] = [
+                match for match in matches if match.document_label not in document_labels
+            ]
+
+    def clear(self) -> None:
+        self.lru_cache.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Returns a dictionary with the keys *hits*, *misses*, *evictions*, *invalidations*,
+        *size* and *maximum_size*."""
+        statistics = self.lru_cache.get_statistics()
+        statistics["invalidations"] = self.invalidations
+        return statistics
+
+
+class InitialPhraseletMatcher:
+    """Finds the structural matches for single-word phraselets and for relation phraselets that
+    are matched normally rather than in reverse. These matches do not depend on the other
+    phraselets derived from the same text, so that where several texts are topic matched at the
+    same time, each phraselet object they share is only matched once.
+
+    *phraselet_match_cache* is the *PhraseletMatchCache* of the worker process, or *None* if
+    matches are not retained between requests. *relation_index* is the *RelationIndex* of the
+    worker process, or *None* if there is none.
+    """
+
+    def __init__(
+        self,
+        *,
+        structural_matcher: StructuralMatcher,
+        document_labels_to_documents: Dict[str, Doc],
+        reverse_dict: ReverseDictionary,
+        overall_similarity_threshold: float,
+        initial_question_word_overall_similarity_threshold: float,
+        process_initial_question_words: bool,
+        document_label_filter: Optional[str],
+        entity_label_to_vector_dict: Dict[str, Floats1d],
+        phraselet_match_cache: Optional[PhraseletMatchCache] = None,
+        relation_index: Optional[RelationIndex] = None
+    ) -> None:
+        self.structural_matcher = structural_matcher
+        self.document_labels_to_documents = document_labels_to_documents
+        self.reverse_dict = reverse_dict
+        self.overall_similarity_threshold = overall_similarity_threshold
+        self.initial_question_word_overall_similarity_threshold = (
+            initial_question_word_overall_similarity_threshold
+        )
+        self.process_initial_question_words = process_initial_question_words
+        self.document_label_filter = document_label_filter
+        self.word_matching_strategies = get_word_matching_strategies(
+            structural_matcher,
+            overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold,
+            process_initial_question_words,
+            entity_label_to_vector_dict,
+        )
+        self.phraselet_match_cache = phraselet_match_cache
+        self.relation_index = relation_index
+        # Search phrases are hashed by identity.
+        self.search_phrases_to_structural_matches: Dict[SearchPhrase, List[Match]] = {}
+        self.returned_search_phrases: Set[SearchPhrase] = set()
+
+    def get_structural_matches(self, search_phrases: Iterable[SearchPhrase]) -> List[Match]:
+        """Returns the matches for *search_phrases* in the same order as calling
+        *StructuralMatcher.match()* first for the single-word search phrases and then for the
+        other search phrases. Matches that have already been returned are copied because topic
+        matching adds attributes to them.
+        """
+        single_word_matches: List[Match] = []
+        relation_matches: List[Match] = []
+        for search_phrase in search_phrases:
+            if search_phrase not in self.search_phrases_to_structural_matches:
+                self.search_phrases_to_structural_matches[
+                    search_phrase
+                ] = self.match_search_phrase(search_phrase)
+            structural_matches = self.search_phrases_to_structural_matches[
+                search_phrase
+            ]
+            if search_phrase in self.returned_search_phrases:
+                structural_matches = [copy(match) for match in structural_matches]
+            else:
+                self.returned_search_phrases.add(search_phrase)
+            if search_phrase.has_single_matchable_word:
+                single_word_matches.extend(structural_matches)
+            else:
+                relation_matches.extend(structural_matches)
+        # Sorting is stable, so the matches for each search phrase retain their order.
+        return StructuralMatcher.sort_matches(
+            single_word_matches
+        ) + StructuralMatcher.sort_matches(relation_matches)
+
+    def match_search_phrase(self, search_phrase: SearchPhrase) -> List[Match]:
+        """Returns the matches for *search_phrase*, using and maintaining the phraselet match
+        cache if there is one. Cached matches are copied because topic matching adds attributes
+        to them."""
+        if self.phraselet_match_cache is not None:
+            key = PhraseletMatchCache.get_key(
+                search_phrase,
+                self.overall_similarity_threshold,
+                self.initial_question_word_overall_similarity_threshold,
+                self.process_initial_question_words,
+                self.document_label_filter,
+            )
+            cached_matches = self.phraselet_match_cache.get(key)
+            if cached_matches is not None:
+                return [copy(match) for match in cached_matches]
+        matches = self.structural_matcher.match(
+            word_matching_strategies=self.word_matching_strategies,
+            document_labels_to_documents=self.document_labels_to_documents,
+            reverse_dict=self.reverse_dict,
+            search_phrases=[search_phrase],
+            match_depending_on_single_words=None,
+            compare_embeddings_on_root_words=False,
+            compare_embeddings_on_non_root_words=False,
+            reverse_matching_cwps=None,
+            embedding_reverse_matching_cwps=None,
+            process_initial_question_words=self.process_initial_question_words,
+            overall_similarity_threshold=self.overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold=self.initial_question_word_overall_similarity_threshold,
+            document_label_filter=self.document_label_filter,
+            relation_index=self.relation_index,
+        )
+        if self.phraselet_match_cache is not None:
+            self.phraselet_match_cache.put(
+                key, self.get_root_words(search_phrase), matches
+            )
+            return [copy(match) for match in matches]
+        return matches
+
+    def get_root_words(self, search_phrase: SearchPhrase) -> Optional[Set[str]]:
+        """Returns the reverse dictionary keys at which the root token of *search_phrase* can
+        match, or *None* if it can match any noun."""
+        entity_placeholder = (
+            self.structural_matcher.semantic_matching_helper.get_entity_placeholder(
+                search_phrase.root_token
+            )
+        )
+        if entity_placeholder == "ENTITYNOUN":
+            return None
+        if entity_placeholder is not None:
+            return {entity_placeholder}
+        return set(search_phrase.words_matching_root_token)
+
+
 class TopicMatcher:
-    """A topic matcher object. See manager.py for details of the properties."""
+    """A topic matcher object. See manager.py for details of the properties.
+
+    *initial_phraselet_matcher* is shared with *TopicMatcher* objects matching other texts
+    against the same documents with the same properties, or *None* if there are none.
+    """
 
     def __init__(
         self,
         *,
         structural_matcher: StructuralMatcher,
         document_labels_to_documents: Dict[str, Doc],
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         text_to_match: str,
         phraselet_labels_to_phraselet_infos: Dict[str, PhraseletInfo],
         phraselet_labels_to_search_phrases: Dict[str, SearchPhrase],
@@ -137,7 +631,8 @@ class TopicMatcher:
         number_of_results: int,
         document_label_filter: str,
         use_frequency_factor: bool,
-        entity_label_to_vector_dict: Dict[str, Floats1d]
+        entity_label_to_vector_dict: Dict[str, Floats1d],
+        initial_phraselet_matcher: Optional[InitialPhraseletMatcher] = None
     ) -> None:
         self.structural_matcher = structural_matcher
         self.semantic_matching_helper = structural_matcher.semantic_matching_helper
@@ -182,87 +677,36 @@ class TopicMatcher:
             "exclusive",
         )
 
-        word_matching_strategies = (
-            self.semantic_matching_helper.main_word_matching_strategies
-            + self.semantic_matching_helper.ontology_word_matching_strategies
-        )[:]
-        if overall_similarity_threshold < 1.0 or (
-            process_initial_question_words
-            and initial_question_word_overall_similarity_threshold < 1.0
-        ):
-            word_matching_strategies.append(
-                EmbeddingWordMatchingStrategy(
-                    self.semantic_matching_helper,
-                    structural_matcher.perform_coreference_resolution,
-                    overall_similarity_threshold,
-                    initial_question_word_overall_similarity_threshold
-                    if process_initial_question_words
-                    else overall_similarity_threshold,
-                )
-            )
-            word_matching_strategies.append(
-                EntityEmbeddingWordMatchingStrategy(
-                    self.semantic_matching_helper,
-                    structural_matcher.perform_coreference_resolution,
-                    overall_similarity_threshold,
-                    initial_question_word_overall_similarity_threshold
-                    if process_initial_question_words
-                    else overall_similarity_threshold,
-                    entity_label_to_vector_dict,
-                )
-            )
-        if process_initial_question_words:
-            word_matching_strategies.append(
-                QuestionWordMatchingStrategy(
-                    self.semantic_matching_helper,
-                    structural_matcher.perform_coreference_resolution,
-                    initial_question_word_overall_similarity_threshold,
-                    entity_label_to_vector_dict,
-                )
-            )
-
-        # First get single-word matches
-        structural_matches = self.structural_matcher.match(
-            word_matching_strategies=word_matching_strategies,
-            document_labels_to_documents=self.document_labels_to_documents,
-            reverse_dict=self.reverse_dict,
-            search_phrases=phraselet_labels_to_search_phrases.values(),
-            match_depending_on_single_words=True,
-            compare_embeddings_on_root_words=False,
-            compare_embeddings_on_non_root_words=False,
-            reverse_matching_cwps=None,
-            embedding_reverse_matching_cwps=None,
-            process_initial_question_words=process_initial_question_words,
-            overall_similarity_threshold=overall_similarity_threshold,
-            initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
-            document_label_filter=self.document_label_filter,
+        word_matching_strategies = get_word_matching_strategies(
+            structural_matcher,
+            overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold,
+            process_initial_question_words,
+            entity_label_to_vector_dict,
         )
-
-        # Now get normally matched relations
-        structural_matches.extend(
-            self.structural_matcher.match(
-                word_matching_strategies=word_matching_strategies,
-                document_labels_to_documents=self.document_labels_to_documents,
-                reverse_dict=self.reverse_dict,
-                search_phrases=phraselet_labels_to_search_phrases.values(),
-                match_depending_on_single_words=False,
-                compare_embeddings_on_root_words=False,
-                compare_embeddings_on_non_root_words=False,
-                reverse_matching_cwps=None,
-                embedding_reverse_matching_cwps=None,
-                process_initial_question_words=process_initial_question_words,
+        if initial_phraselet_matcher is None:
+            initial_phraselet_matcher = InitialPhraseletMatcher(
+                structural_matcher=structural_matcher,
+                document_labels_to_documents=document_labels_to_documents,
+                reverse_dict=reverse_dict,
                 overall_similarity_threshold=overall_similarity_threshold,
                 initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
-                document_label_filter=self.document_label_filter,
+                process_initial_question_words=process_initial_question_words,
+                document_label_filter=document_label_filter,
+                entity_label_to_vector_dict=entity_label_to_vector_dict,
             )
+
+        # First get single-word matches and normally matched relations
+        structural_matches = initial_phraselet_matcher.get_structural_matches(
+            phraselet_labels_to_search_phrases.values()
         )
 
         self.rebuild_document_info_dict(
             structural_matches, phraselet_labels_to_phraselet_infos
         )
-        parent_direct_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
-        parent_embedding_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
-        child_embedding_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
+        parent_direct_retry_corpus_word_positions: Set[int] = set()
+        parent_embedding_retry_corpus_word_positions: Set[int] = set()
+        child_embedding_retry_corpus_word_positions: Set[int] = set()
         for phraselet in (
             phraselet_labels_to_search_phrases[phraselet_info.label]
             for phraselet_info in phraselet_labels_to_phraselet_infos.values()
@@ -381,11 +825,12 @@ class TopicMatcher:
         *,
         phraselet: SearchPhrase,
         phraselet_info: PhraseletInfo,
-        parent_direct_retry_corpus_word_positions: Set[CorpusWordPosition],
-        parent_embedding_retry_corpus_word_positions: Set[CorpusWordPosition],
-        child_embedding_retry_corpus_word_positions: Set[CorpusWordPosition]
+        parent_direct_retry_corpus_word_positions: Set[int],
+        parent_embedding_retry_corpus_word_positions: Set[int],
+        child_embedding_retry_corpus_word_positions: Set[int]
     ) -> None:
-        """
+        """All indexes are *ReverseDictionary* position keys.
+
         parent_direct_retry_corpus_word_positions -- indexes where matching against a reverse
             matching phraselet should be attempted. These are ascertained by examining the child
             words.
@@ -477,9 +922,9 @@ class TopicMatcher:
                 child_relation_match_corpus_words
             ):
                 doc = self.document_labels_to_documents[
-                    corpus_word_position.document_label
+                    self.reverse_dict.get_document_label(corpus_word_position)
                 ]
-                working_index = corpus_word_position.index
+                working_index = self.reverse_dict.get_index(corpus_word_position)
                 working_token = doc[working_index.token_index]
                 if (
                     not working_index.is_subword()
@@ -495,9 +940,10 @@ class TopicMatcher:
                             document_dependency_label=parent_dependency[1],
                             inverse_polarity=False,
                         ):
-                            working_index = Index(parent_dependency[0], None)
-                            working_cwp = CorpusWordPosition(
-                                corpus_word_position.document_label, working_index
+                            working_cwp = (
+                                self.reverse_dict.get_position_key_in_same_document(
+                                    corpus_word_position, parent_dependency[0], None
+                                )
                             )
                             set_to_add_to.add(working_cwp)
                     for (
@@ -511,9 +957,10 @@ class TopicMatcher:
                                 inverse_polarity=True,
                             )
                         ):
-                            working_index = Index(child_dependency[0], None)
-                            working_cwp = CorpusWordPosition(
-                                corpus_word_position.document_label, working_index
+                            working_cwp = (
+                                self.reverse_dict.get_position_key_in_same_document(
+                                    corpus_word_position, child_dependency[0], None
+                                )
                             )
                             set_to_add_to.add(working_cwp)
                 else:
@@ -525,11 +972,10 @@ class TopicMatcher:
                         document_dependency_label=working_subword.governing_dependency_label,
                         inverse_polarity=False,
                     ):
-                        working_index = Index(
-                            working_index.token_index, working_subword.governor_index
-                        )
-                        working_cwp = CorpusWordPosition(
-                            corpus_word_position.document_label, working_index
+                        working_cwp = self.reverse_dict.get_position_key_in_same_document(
+                            corpus_word_position,
+                            working_index.token_index,
+                            working_subword.governor_index,
                         )
                         set_to_add_to.add(working_cwp)
                     if (
@@ -540,11 +986,10 @@ class TopicMatcher:
                             inverse_polarity=True,
                         )
                     ):
-                        working_index = Index(
-                            working_index.token_index, working_subword.dependent_index
-                        )
-                        working_cwp = CorpusWordPosition(
-                            corpus_word_position.document_label, working_index
+                        working_cwp = self.reverse_dict.get_position_key_in_same_document(
+                            corpus_word_position,
+                            working_index.token_index,
+                            working_subword.dependent_index,
                         )
                         set_to_add_to.add(working_cwp)
 
@@ -559,7 +1004,7 @@ class TopicMatcher:
             word_match = self.get_word_match_from_match(match, parent)
             word = word_match.search_phrase_token._.holmes.derived_lemma
             phraselet_word_match_info = self.get_phraselet_word_match_info(word)
-            corpus_word_position = CorpusWordPosition(
+            corpus_word_position = self.reverse_dict.get_position_key_for_index(
                 match.document_label, word_match.get_document_index()
             )
             if parent:
@@ -595,7 +1040,7 @@ class TopicMatcher:
                 phraselet_word_match_info = self.get_phraselet_word_match_info(word)
                 word_match = match.word_matches[0]
                 phraselet_word_match_info.single_word_match_corpus_words.add(
-                    CorpusWordPosition(
+                    self.reverse_dict.get_position_key_for_index(
                         match.document_label, word_match.get_document_index()
                     )
                 )
@@ -610,7 +1055,7 @@ class TopicMatcher:
             word_match = self.get_word_match_from_match(match, parent)
             word = word_match.search_phrase_token._.holmes.derived_lemma
             phraselet_word_match_info = self.get_phraselet_word_match_info(word)
-            corpus_word_position = CorpusWordPosition(
+            corpus_word_position = self.reverse_dict.get_position_key_for_index(
                 match.document_label, word_match.get_document_index()
             )
             if parent:
@@ -875,7 +1320,7 @@ class TopicMatcher:
         """
 
         def get_set_from_dict(
-            dictionary: Dict[CorpusWordPosition, Set[str]], key: CorpusWordPosition
+            dictionary: Dict[Index, Set[str]], key: Index
         ) -> Set[str]:
             if key in dictionary:
                 return dictionary[key]
@@ -891,18 +1336,8 @@ class TopicMatcher:
                 and len({wm.document_token.i for wm in match.word_matches}) == 1
             )
 
-        def get_current_activation_for_phraselet(
-            phraselet_activation_tracker: PhraseletActivationTracker, current_index: int
-        ) -> float:
-            distance_to_last_match = (
-                current_index - phraselet_activation_tracker.position
-            )
-            tailoff_quotient = distance_to_last_match / self.maximum_activation_distance
-            tailoff_quotient = min(tailoff_quotient, 1.0)
-            return (1 - tailoff_quotient) * phraselet_activation_tracker.score
-
         document_labels_to_indexes_to_phraselet_labels: Dict[
-            str, Dict[CorpusWordPosition, Set[str]]
+            str, Dict[Index, Set[str]]
         ] = {}
         for match in (
             match
@@ -931,16 +1366,32 @@ class TopicMatcher:
                 child_word_match.get_document_index(),
                 match.search_phrase_label,
             )
+        activation_scorer = ActivationScorer(self.maximum_activation_distance)
+        # The matches within each document are scored together once their scores are known.
+        document_matches: List[Match] = []
+        document_match_scores: List[float] = []
+
+        def score_document_matches() -> None:
+            for match, topic_score in zip(
+                document_matches,
+                activation_scorer.get_topic_scores(
+                    [match.index_within_document for match in document_matches],
+                    [match.search_phrase_label for match in document_matches],
+                    document_match_scores,
+                ),
+            ):
+                match.topic_score = topic_score  # type:ignore[attr-defined]
+            document_matches.clear()
+            document_match_scores.clear()
+
         current_document_label = None
         for pssm_index, match in enumerate(position_sorted_structural_matches):
             match.original_index_within_list = (  # type:ignore[attr-defined]
                 pssm_index  # store for later use after resorting
             )
             if match.document_label != current_document_label or pssm_index == 0:
+                score_document_matches()
                 current_document_label = match.document_label
-                phraselet_labels_to_phraselet_activation_trackers: Dict[
-                    str, PhraseletActivationTracker
-                ] = {}
                 indexes_to_phraselet_labels = (
                     document_labels_to_indexes_to_phraselet_labels.get(
                         current_document_label, {}
@@ -1009,45 +1460,9 @@ class TopicMatcher:
             ):
                 this_match_score *= self.ontology_penalty ** (abs(word_match.depth) + 1)
 
-            if (
-                match.search_phrase_label
-                in phraselet_labels_to_phraselet_activation_trackers
-            ):
-                phraselet_activation_tracker = (
-                    phraselet_labels_to_phraselet_activation_trackers[
-                        match.search_phrase_label
-                    ]
-                )
-                current_score = get_current_activation_for_phraselet(
-                    phraselet_activation_tracker, match.index_within_document
-                )
-                if this_match_score > current_score:
-                    phraselet_activation_tracker.score = this_match_score
-                else:
-                    phraselet_activation_tracker.score = current_score
-                phraselet_activation_tracker.position = match.index_within_document
-            else:
-                phraselet_labels_to_phraselet_activation_trackers[
-                    match.search_phrase_label
-                ] = PhraseletActivationTracker(
-                    match.index_within_document, this_match_score
-                )
-            match.topic_score = 0  # type:ignore[attr-defined]
-            for phraselet_label in list(
-                phraselet_labels_to_phraselet_activation_trackers
-            ):
-                phraselet_activation_tracker = (
-                    phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
-                )
-                current_activation = get_current_activation_for_phraselet(
-                    phraselet_activation_tracker, match.index_within_document
-                )
-                if current_activation <= 0:
-                    del phraselet_labels_to_phraselet_activation_trackers[
-                        phraselet_label
-                    ]
-                else:
-                    match.topic_score += current_activation  # type:ignore[attr-defined]
+            document_matches.append(match)
+            document_match_scores.append(this_match_score)
+        score_document_matches()
         return sorted(
             position_sorted_structural_matches,
             key=lambda match: 0 - match.topic_score,  # type:ignore[attr-defined]
@@ -1223,7 +1638,64 @@ class TopicMatcher:
             ),
         )
 
-    def get_topic_match_dictionaries(self):
+    def is_answer_word_match(self, word_match: WordMatch) -> bool:
+        """Returns *True* if *word_match* answers an initial question word."""
+        return (
+            word_match.search_phrase_token._.holmes.is_initial_question_word
+            or word_match.search_phrase_token._.holmes.has_initial_question_word_in_phrase
+        ) and not (
+            word_match.document_token._.holmes.is_initial_question_word
+            or word_match.document_token.tag_
+            in self.semantic_matching_helper.interrogative_pronoun_tags
+        )
+
+    def get_topic_match_summaries(self) -> List[TopicMatchSummary]:
+        """Returns a compact summary of each topic match for which
+        *get_topic_match_dictionaries()* would return a topic match dictionary. Each summary is a
+        tuple of the values *TopicMatchDictionaryOrderer* sorts on, i.e. the score, the number of
+        words in the text, the document label and the relative start index of the first word
+        info, followed by the index of the topic match within *self.topic_matches*.
+
+        The first word info starts at the earliest word match within the topic match because
+        word infos are only ever removed when they are contained within other word infos that
+        start at the same position or earlier.
+        """
+        topic_match_summaries = []
+        for topic_match_counter, topic_match in enumerate(self.topic_matches):
+            if self.initial_question_word_behaviour == "exclusive" and not any(
+                self.is_answer_word_match(word_match)
+                for match in topic_match.structural_matches
+                for word_match in match.word_matches
+            ):
+                continue
+            doc = self.document_labels_to_documents[topic_match.document_label]
+            first_word_info_start_index = min(
+                doc[word_match.document_subword.containing_token_index].idx
+                + word_match.document_subword.char_start_index
+                if word_match.document_subword is not None
+                else word_match.first_document_token.idx
+                for match in topic_match.structural_matches
+                for word_match in match.word_matches
+            )
+            topic_match_summaries.append(
+                (
+                    topic_match.score,
+                    len(topic_match.text.split()),
+                    topic_match.document_label,
+                    first_word_info_start_index
+                    - doc[topic_match.sentences_start_index].idx,
+                    topic_match_counter,
+                )
+            )
+        return topic_match_summaries
+
+    def get_topic_match_dictionaries(
+        self, topic_match_indexes: Optional[Iterable[int]] = None
+    ):
+        """Returns topic match dictionaries for the topic matches at *topic_match_indexes*
+        within *self.topic_matches*, or for all topic matches if *topic_match_indexes* is
+        *None*."""
+
         class WordInfo:
             def __init__(
                 self,
@@ -1276,8 +1748,15 @@ class TopicMatcher:
                     return other_word_info
             return None
 
+        if topic_match_indexes is not None:
+            topic_match_indexes = set(topic_match_indexes)
         topic_match_dicts = []
         for topic_match_counter, topic_match in enumerate(self.topic_matches):
+            if (
+                topic_match_indexes is not None
+                and topic_match_counter not in topic_match_indexes
+            ):
+                continue
             doc = self.document_labels_to_documents[topic_match.document_label]
             sentences_character_start_index_in_document = doc[
                 topic_match.sentences_start_index
@@ -1328,14 +1807,7 @@ class TopicMatcher:
                             "relation",
                             word_match.explanation,
                         )
-                    if (
-                        word_match.search_phrase_token._.holmes.is_initial_question_word
-                        or word_match.search_phrase_token._.holmes.has_initial_question_word_in_phrase
-                    ) and not (
-                        word_match.document_token._.holmes.is_initial_question_word
-                        or word_match.document_token.tag_
-                        in self.semantic_matching_helper.interrogative_pronoun_tags
-                    ):
+                    if self.is_answer_word_match(word_match):
                         if word_match.document_subword is not None:
                             answer_relative_start_index = (
                                 word_match.document_token.idx
@@ -1488,6 +1960,17 @@ class TopicMatcher:
 class TopicMatchDictionaryOrderer:
     # in its own class as it is called from the main process rather than from the workers
 
+    def select(
+        self, topic_match_summaries: List[TopicMatchSummary], number_of_results: int
+    ) -> List[TopicMatchSummary]:
+        """Returns the summaries of the topic matches whose dictionaries *order()* would return,
+        where *topic_match_summaries* is in the order in which the dictionaries would be passed
+        to *order()*."""
+        return sorted(
+            topic_match_summaries,
+            key=lambda summary: (0 - summary[0], 0 - summary[1], summary[2], summary[3]),
+        )[0:number_of_results]
+
     def order(
         self,
         topic_match_dicts: List[Dict],
@@ -1,7 +1,7 @@
 from typing import Dict, Optional, List
 from spacy.tokens import Token, Doc
 from .general import WordMatch, WordMatchingStrategy
-from ..parsing import CorpusWordPosition, MultiwordSpan, Subword, SearchPhrase
+from ..parsing import ReverseDictionary, MultiwordSpan, Subword, SearchPhrase
 
 
 class DerivationWordMatchingStrategy(WordMatchingStrategy):
@@ -148,20 +148,16 @@ class DerivationWordMatchingStrategy(WordMatchingStrategy):
                     )
         return None
 
-    def add_words_matching_search_phrase_root_token(
-        self, search_phrase: SearchPhrase
-    ) -> None:
-        if (
-            search_phrase.root_token._.holmes.derived_lemma
-            != search_phrase.root_token._.holmes.lemma
-        ):
-            search_phrase.add_word_information(
-                search_phrase.root_token._.holmes.derived_lemma,
-            )
+    def get_words_matching_search_phrase_token(
+        self, search_phrase_token: Token
+    ) -> List[str]:
+        if search_phrase_token._.holmes.derived_lemma != search_phrase_token._.holmes.lemma:
+            return [search_phrase_token._.holmes.derived_lemma]
+        return []
 
     def add_reverse_dict_entries(
         self,
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         doc: Doc,
         document_label: str,
     ) -> None:
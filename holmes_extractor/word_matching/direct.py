@@ -3,7 +3,7 @@ from spacy.tokens import Token, Doc
 from .general import WordMatch, WordMatchingStrategy
 from ..parsing import (
     MultiwordSpan,
-    CorpusWordPosition,
+    ReverseDictionary,
     Subword,
     SearchPhrase,
 )
@@ -111,15 +111,14 @@ class DirectWordMatchingStrategy(WordMatchingStrategy):
                     )
         return None
 
-    def add_words_matching_search_phrase_root_token(
-        self, search_phrase: SearchPhrase
-    ) -> None:
-        for word in search_phrase.root_token._.holmes.direct_matching_reprs:
-            search_phrase.add_word_information(word)
+    def get_words_matching_search_phrase_token(
+        self, search_phrase_token: Token
+    ) -> List[str]:
+        return search_phrase_token._.holmes.direct_matching_reprs
 
     def add_reverse_dict_entries(
         self,
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         doc: Doc,
         document_label: str,
     ) -> None:
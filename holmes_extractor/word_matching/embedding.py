@@ -1,4 +1,5 @@
 from typing import Optional
+from functools import partial
 from spacy.tokens import Token
 from .general import WordMatch, WordMatchingStrategy
 from ..parsing import SemanticMatchingHelper, Subword, SearchPhrase
@@ -7,6 +8,7 @@ from ..parsing import SemanticMatchingHelper, Subword, SearchPhrase
 class EmbeddingWordMatchingStrategy(WordMatchingStrategy):
 
     WORD_MATCH_TYPE_LABEL = "embedding"
+    MATCHES_ARE_INDEXED = False
 
     @staticmethod
     def _get_explanation(similarity: float, search_phrase_display_word: str) -> str:
@@ -127,8 +129,10 @@ class EmbeddingWordMatchingStrategy(WordMatchingStrategy):
                         document_subword=document_subword,
                         document_word=document_word,
                         word_match_type=self.WORD_MATCH_TYPE_LABEL,
-                        explanation=self._get_explanation(
-                            similarity_measure, search_phrase_display_word
+                        explanation=partial(
+                            self._get_explanation,
+                            similarity_measure,
+                            search_phrase_display_word,
                         ),
                     )
                     word_match.similarity_measure = similarity_measure
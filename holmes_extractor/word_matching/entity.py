@@ -1,7 +1,7 @@
 from typing import Dict, Optional, List
 from spacy.tokens import Token, Doc
 from .general import WordMatch, WordMatchingStrategy
-from ..parsing import MultiwordSpan, CorpusWordPosition, SearchPhrase
+from ..parsing import MultiwordSpan, ReverseDictionary, SearchPhrase
 
 
 class EntityWordMatchingStrategy(WordMatchingStrategy):
@@ -79,7 +79,7 @@ class EntityWordMatchingStrategy(WordMatchingStrategy):
 
     def add_reverse_dict_entries(
         self,
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         doc: Doc,
         document_label: str,
     ) -> None:
@@ -1,4 +1,5 @@
 from typing import Optional, List, Dict
+from functools import partial
 from spacy.tokens import Token
 from thinc.types import Floats1d
 from .general import WordMatch, WordMatchingStrategy
@@ -8,6 +9,7 @@ from ..parsing import SearchPhrase, MultiwordSpan, SemanticMatchingHelper
 class EntityEmbeddingWordMatchingStrategy(WordMatchingStrategy):
 
     WORD_MATCH_TYPE_LABEL = "entity_embedding"
+    MATCHES_ARE_INDEXED = False
 
     @staticmethod
     def _get_explanation(similarity: float, search_phrase_display_word: str) -> str:
@@ -165,8 +167,10 @@ class EntityEmbeddingWordMatchingStrategy(WordMatchingStrategy):
                 document_subword=None,
                 document_word=document_token.lemma_,
                 word_match_type=self.WORD_MATCH_TYPE_LABEL,
-                explanation=self._get_explanation(
-                    similarity_measure, search_phrase_display_word
+                explanation=partial(
+                    self._get_explanation,
+                    similarity_measure,
+                    search_phrase_display_word,
                 ),
             )
             word_match.similarity_measure = similarity_measure
@@ -1,7 +1,7 @@
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Union
 from spacy.tokens import Token, Doc
 from ..parsing import (
-    CorpusWordPosition,
+    ReverseDictionary,
     MultiwordSpan,
     SemanticMatchingHelper,
     Subword,
@@ -13,6 +13,11 @@ from ..parsing import (
 class WordMatchingStrategy:
     """Parent class for all word matching strategies. Each strategy only implements those methods that are relevant to it."""
 
+    # *True* if every document word the strategy matches to a search phrase token that is neither
+    # an entity placeholder nor an initial question word is indexed in the reverse dictionary
+    # under one of the words returned by *get_words_matching_search_phrase_token()*.
+    MATCHES_ARE_INDEXED = True
+
     def __init__(
         self,
         semantic_matching_helper: SemanticMatchingHelper,
@@ -54,30 +59,31 @@ class WordMatchingStrategy:
         self, search_phrase: SearchPhrase
     ) -> None:
         """Determines words that match a search phrase root token and notifies the *SearchPhrase* object of them."""
-        pass
+        for word in self.get_words_matching_search_phrase_token(search_phrase.root_token):
+            search_phrase.add_word_information(word)
+
+    def get_words_matching_search_phrase_token(
+        self, search_phrase_token: Token
+    ) -> List[str]:
+        """Returns words under which the reverse dictionary indexes document words that match a search phrase token."""
+        return []
 
     def add_reverse_dict_entries(
-        self, doc: Doc, document_label: str, reverse_dict: Dict[str, List[CorpusWordPosition]]
+        self, doc: Doc, document_label: str, reverse_dict: ReverseDictionary
     ) -> None:
         """Determines words that match each token within a document and adds corresponding entries to the reverse dictionary."""
         pass
 
     @staticmethod
     def add_reverse_dict_entry(
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         key_word: str,
         document_label: str,
         token_index: int,
         subword_index: int,
     ) -> None:
         """Adds a single entry to the reverse dictionary. Called by implementing classes."""
-        index = Index(token_index, subword_index)
-        corpus_word_position = CorpusWordPosition(document_label, index)
-        if key_word in reverse_dict.keys():
-            if corpus_word_position not in reverse_dict[key_word]:
-                reverse_dict[key_word].append(corpus_word_position)
-        else:
-            reverse_dict[key_word] = [corpus_word_position]
+        reverse_dict.add_entry(key_word, document_label, token_index, subword_index)
 
     def get_extracted_word_for_token(self, token: Token, document_word: str) -> str:
         """Gets the extracted word for a token. If the token is part of a coreference chain, the extracted word is the most specific
@@ -121,7 +127,9 @@ class WordMatch:
     extracted_word -- the most specific term that corresponded to *document_word* within the
         coreference chain.
     explanation -- a human-readable explanation of how the word match was determined designed
-        e.g. for use as a tooltip.
+        e.g. for use as a tooltip. Strategies whose explanations are expensive to format may
+        supply a function that returns the explanation instead of a string; the function is
+        then only called the first time the explanation is read.
     similarity_measure -- for type *embedding*, the similarity between the two tokens,
         otherwise 1.0.
     involves_coreference -- *True* if *document_token* and *structurally_matched_document_token*
@@ -141,7 +149,7 @@ class WordMatch:
         word_match_type: str,
         depth: int = 0,
         extracted_word: str = None,
-        explanation: str
+        explanation: Union[str, Callable[[], str]]
     ):
 
         self.search_phrase_token = search_phrase_token
@@ -162,7 +170,13 @@ class WordMatch:
         )
         self.depth = depth
         self.similarity_measure = 1.0
-        self.explanation = explanation
+        self._explanation = explanation
+
+    @property
+    def explanation(self) -> str:
+        if not isinstance(self._explanation, str):
+            self._explanation = self._explanation()
+        return self._explanation
 
     @property
     def involves_coreference(self) -> bool:
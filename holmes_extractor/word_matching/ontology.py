@@ -4,7 +4,7 @@ from spacy.tokens import Token, Doc
 from .general import WordMatch, WordMatchingStrategy
 from ..parsing import (
     HolmesDictionary,
-    CorpusWordPosition,
+    ReverseDictionary,
     MultiwordSpan,
     SemanticMatchingHelper,
     Subword,
@@ -161,25 +161,27 @@ class OntologyWordMatchingStrategy(WordMatchingStrategy):
                 )
         return None
 
-    def add_words_matching_search_phrase_root_token(
-        self, search_phrase: SearchPhrase
-    ) -> None:
-        search_phrase_reprs = search_phrase.root_token._.holmes.direct_matching_reprs[:]
+    def get_words_matching_search_phrase_token(
+        self, search_phrase_token: Token
+    ) -> List[str]:
+        search_phrase_reprs = search_phrase_token._.holmes.direct_matching_reprs[:]
         if (
             self.analyze_derivational_morphology
-            and search_phrase.root_token._.holmes.derivation_matching_reprs is not None
+            and search_phrase_token._.holmes.derivation_matching_reprs is not None
         ):
             search_phrase_reprs.extend(
-                search_phrase.root_token._.holmes.derivation_matching_reprs
+                search_phrase_token._.holmes.derivation_matching_reprs
             )
+        words = []
         for word in search_phrase_reprs:
             for entry in self.ontology.get_matching_entries(word):
                 for repr in entry.reprs:
-                    search_phrase.add_word_information(repr)
+                    words.append(repr)
+        return words
 
     def add_reverse_dict_entries(
         self,
-        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        reverse_dict: ReverseDictionary,
         doc: Doc,
         document_label: str,
     ) -> None:
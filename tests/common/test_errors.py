@@ -146,6 +146,23 @@ class ErrorsTest(unittest.TestCase):
             nocoref_holmes_manager.register_serialized_document(
                 doc.to_bytes(), 'pets2')
 
+    def test_deserialization_error_keeps_corpus_frequencies_of_other_documents(self):
+        nocoref_holmes_manager.remove_all_documents()
+        nocoref_holmes_manager.parse_and_register_document(
+            "The cat was chased by the dog", 'pets')
+        serialized_doc = nocoref_holmes_manager.serialize_document('pets')
+        frequency_information = nocoref_holmes_manager.get_corpus_frequency_information()
+        doc = nocoref_holmes_manager.get_document('pets')
+        doc._.holmes_document_info.serialized_document_version = 1
+        nocoref_holmes_manager.remove_all_documents()
+        with self.assertRaises(WrongVersionDeserializationError) as context:
+            nocoref_holmes_manager.register_serialized_documents(
+                {'pets': serialized_doc, 'pets2': doc.to_bytes()})
+        self.assertEqual(nocoref_holmes_manager.get_corpus_frequency_information(),
+            frequency_information)
+        nocoref_holmes_manager.remove_all_documents()
+        self.assertEqual(nocoref_holmes_manager.get_corpus_frequency_information(), ({}, 0))
+
     def test_wrong_model_deserialization_error_supervised_models(self):
         with self.assertRaises(WrongModelDeserializationError) as context:
             sttb = german_holmes_manager.get_supervised_topic_training_basis()
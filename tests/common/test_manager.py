@@ -1,7 +1,13 @@
 import unittest
+import asyncio
+from queue import Empty
 from packaging import version
 import holmes_extractor as holmes
-from holmes_extractor.errors import NoDocumentError
+from holmes_extractor.errors import NoDocumentError, DuplicateDocumentError
+from holmes_extractor.document_storage import DocumentArena, ArenaDocumentDictionary
+from holmes_extractor.parsing import ReverseDictionary
+from holmes_extractor.manager import Worker
+from spacy.tokens import Doc
 
 holmes_manager = holmes.Manager(
     'en_core_web_trf', perform_coreference_resolution=False, number_of_workers=2)
@@ -9,8 +15,26 @@ holmes_manager = holmes.Manager(
 lg_holmes_manager = holmes.Manager(
     'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2)
 
+class FailingRegistrationWorker(Worker):
+    """Fails the next registration on each worker process that has been told to do so."""
+
+    def fail_next_registration(self, state):
+        state['fail_next_registration'] = True
+        return None, "Next registration will fail"
+
+    def register_serialized_document(self, state, serialized_doc, document_label):
+        if state.pop('fail_next_registration', False):
+            raise RuntimeError("Registration failed")
+        return super().register_serialized_document(state, serialized_doc, document_label)
+
 class ManagerTest(unittest.TestCase):
 
+    def _create_manager(self, *args, **kwargs):
+        """Returns a new *Manager* that is closed when the test finishes, even if it fails."""
+        manager = holmes.Manager(*args, **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+
     def _register_multiple_documents_and_search_phrases(self):
         holmes_manager.remove_all_search_phrases()
         holmes_manager.remove_all_documents()
@@ -30,6 +54,236 @@ class ManagerTest(unittest.TestCase):
         self._register_multiple_documents_and_search_phrases()
         self.assertEqual(len(holmes_manager.match()), 2)
 
+    def test_match_documents(self):
+        self._register_multiple_documents_and_search_phrases()
+        document_texts = ["The dog chased the cat", "Nothing to see here",
+            "The lion ate the gnu", "The dog chased the cat"]
+        match_dicts_lists = holmes_manager.match_documents(document_texts, batch_size=1)
+        self.assertEqual(len(match_dicts_lists), 4)
+        for document_text, match_dicts in zip(document_texts, match_dicts_lists):
+            self.assertEqual(match_dicts, holmes_manager.match(document_text=document_text))
+        self.assertEqual([len(match_dicts) for match_dicts in match_dicts_lists], [1, 0, 1, 1])
+        self.assertEqual(holmes_manager.match_documents(["The lion ate the gnu"],
+            search_phrase_text="A dog chases a cat"), [[]])
+        self.assertEqual(holmes_manager.match_documents([]), [])
+
+    def test_chatbot_matching_only_considers_indexed_search_phrases(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.register_search_phrase("A dog chases a cat", label="dogs")
+        holmes_manager.register_search_phrase("ENTITYPERSON chases a cat", label="people")
+        holmes_manager.register_search_phrase("A lion eats a gnu", label="lions")
+        holmes_manager.register_search_phrase("ENTITYNOUN", label="nouns")
+        matches = holmes_manager.match(document_text="The dog chased a cat")
+        self.assertEqual({match['search_phrase_label'] for match in matches}, {'dogs', 'nouns'})
+        holmes_manager.remove_all_search_phrases_with_label("nouns")
+        matches = holmes_manager.match(document_text="Peter chased a cat")
+        self.assertEqual([match['search_phrase_label'] for match in matches], ['people'])
+        self.assertEqual(holmes_manager.match(document_text="Nothing happened"), [])
+
+    def test_share_dependency_tests(self):
+        sharing_holmes_manager = self._create_manager(
+            'en_core_web_lg', number_of_workers=1, share_dependency_tests=True)
+        non_sharing_holmes_manager = self._create_manager('en_core_web_lg', number_of_workers=1)
+        for manager in (sharing_holmes_manager, non_sharing_holmes_manager):
+            manager.parse_and_register_document(
+                "I saw a big dog. It was chasing a cat and a mouse, and then it chased a lion.")
+            for search_phrase_text in ("A dog chases a cat", "A dog chases a mouse",
+                    "A big dog chases a lion", "A dog chases", "Somebody sees a dog"):
+                manager.register_search_phrase(search_phrase_text)
+        matches = sharing_holmes_manager.match()
+        self.assertIn('A dog chases a mouse',
+            [match['search_phrase_text'] for match in matches])
+        self.assertEqual(matches, non_sharing_holmes_manager.match())
+        self.assertEqual(
+            sharing_holmes_manager.topic_match_documents_against("A big dog chased a mouse"),
+            non_sharing_holmes_manager.topic_match_documents_against("A big dog chased a mouse"))
+
+    def test_topic_matches_selected_across_workers(self):
+        single_worker_holmes_manager = self._create_manager('en_core_web_sm', number_of_workers=1)
+        multiple_worker_holmes_manager = self._create_manager('en_core_web_sm', number_of_workers=3)
+        for manager in (single_worker_holmes_manager, multiple_worker_holmes_manager):
+            for counter, document_text in enumerate((
+                    "A dog chased a cat.", "The big dog chased the cat and the mouse.",
+                    "A cat chased a dog.", "I saw a dog. It chased a cat.",
+                    "The dog was chasing the cat.", "Nothing happened.")):
+                manager.parse_and_register_document(document_text, str(counter))
+        for number_of_results in (1, 2, 10):
+            topic_match_dicts = multiple_worker_holmes_manager.topic_match_documents_against(
+                "A dog chases a cat", number_of_results=number_of_results)
+            self.assertEqual(len(topic_match_dicts), min(number_of_results,
+                len(single_worker_holmes_manager.topic_match_documents_against(
+                    "A dog chases a cat"))))
+            self.assertEqual(topic_match_dicts,
+                single_worker_holmes_manager.topic_match_documents_against(
+                    "A dog chases a cat", number_of_results=number_of_results))
+
+    def test_get_match_plans(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            "A dog has a cat. A dog has a cat. A dog has a zebra.", label='pets')
+        holmes_manager.register_search_phrase("A dog has a zebra")
+        holmes_manager.register_search_phrase("A dog has a cat")
+        holmes_manager.register_search_phrase("A dog has a lion")
+        plans = holmes_manager.get_match_plans()
+        self.assertEqual([plan['anchor_word'] for plan in plans], ['zebra', 'cat', 'lion'])
+        self.assertEqual([step['word'] for step in plans[0]['steps']], ['zebra', 'has', 'dog'])
+        self.assertEqual([step['posting_size'] for step in plans[0]['steps']], [1, 3, 3])
+        self.assertTrue(plans[0]['steps'][1]['is_root'])
+        self.assertEqual(plans[2]['steps'][0]['posting_size'], 0)
+        self.assertEqual(sorted(len(match['word_matches']) for match in holmes_manager.match()),
+            [3, 3, 3])
+        holmes_manager.register_search_phrase("A cat")
+        holmes_manager.register_search_phrase("ENTITYNOUN")
+        plans = holmes_manager.get_match_plans()
+        self.assertEqual(len(plans), 4)
+        self.assertEqual(plans[3]['steps'],
+            [{'token_index': 1, 'word': 'cat', 'is_root': True, 'posting_size': 2}])
+
+    def test_match_plan_anchored_on_root_skips_documents_without_children(self):
+        # A single worker process holds all the documents, so that they are planned together.
+        planning_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=1)
+
+        def match_and_get_word_match_misses():
+            statistics_before = planning_holmes_manager.get_match_memo_statistics()
+            self.assertEqual([match['document'] for match in planning_holmes_manager.match()],
+                ['pets'])
+            return (planning_holmes_manager.get_match_memo_statistics()['word_match_misses']
+                - statistics_before['word_match_misses'])
+
+        planning_holmes_manager.parse_and_register_document(
+            "A dog has a cat. Cats and dogs and cats.", label='pets')
+        planning_holmes_manager.parse_and_register_document(
+            "The cat has a toy. Cats and dogs.", label='toys')
+        planning_holmes_manager.register_search_phrase("A dog has a cat")
+        self.assertEqual(planning_holmes_manager.get_match_plans()[0]['anchor_word'], 'has')
+        word_match_misses = match_and_get_word_match_misses()
+        # A document without any word that can match 'cat' is skipped, so matching does no
+        # further work.
+        planning_holmes_manager.parse_and_register_document(
+            "A dog has a lion. Dogs and dogs and dogs.", label='zoo')
+        self.assertEqual(planning_holmes_manager.get_match_plans()[0]['anchor_word'], 'has')
+        self.assertEqual(match_and_get_word_match_misses(), word_match_misses)
+        # A document that contains 'cat' elsewhere is matched from its root token position.
+        planning_holmes_manager.parse_and_register_document(
+            "A dog has a lion. Cats.", label='safari')
+        self.assertGreater(match_and_get_word_match_misses(), word_match_misses)
+
+    def test_reverse_dictionary_get_document_ids_with_entries(self):
+        reverse_dict = ReverseDictionary()
+        for document_label, words in (('a', ['dog']), ('b', ['cat']), ('c', ['dog', 'cat']),
+                ('d', ['mouse']), ('e', ['dog'])):
+            for token_index, word in enumerate(words):
+                reverse_dict.add_entry(word, document_label, token_index, None)
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['dog'], []), [])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries([], [0, 1, 2]), [])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['lion'], [0, 1, 2]), [])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['cat'], [0, 3, 4]), [])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['dog'], [0, 1, 2, 3, 4]),
+            [0, 2, 4])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['dog'], [4]), [4])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['dog'], [5]), [])
+        self.assertEqual(reverse_dict.get_document_ids_with_entries(['cat', 'mouse'],
+            [1, 3, 4]), [1, 3])
+        single_document_reverse_dict = ReverseDictionary()
+        single_document_reverse_dict.add_entry('dog', 'a', 0, None)
+        single_document_reverse_dict.add_entry('dog', 'a', 2, None)
+        self.assertEqual(
+            single_document_reverse_dict.get_document_ids_with_entries(['dog'], [0]), [0])
+        self.assertEqual(
+            single_document_reverse_dict.get_document_ids_with_entries(['cat'], [0]), [])
+
+    def test_get_match_memo_statistics(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            "The big dog chased the cat and chased the cat and chased the cat.", label='pets')
+        holmes_manager.register_search_phrase("A big dog chases a cat")
+        statistics_before = holmes_manager.get_match_memo_statistics()
+        self.assertEqual(len(holmes_manager.match()), 3)
+        statistics_after = holmes_manager.get_match_memo_statistics()
+        self.assertGreater(statistics_after['word_match_hits'],
+            statistics_before['word_match_hits'])
+        self.assertGreater(statistics_after['word_match_misses'],
+            statistics_before['word_match_misses'])
+
+    def test_match_memo_with_long_coordinated_sentence(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document("".join(("The big dog, ",
+            ", ".join(("the big dog",) * 28), " and the big dog chased the cat.")), label='pets')
+        holmes_manager.register_search_phrase("A big dog chases a cat")
+        statistics_before = holmes_manager.get_match_memo_statistics()
+        matches = holmes_manager.match()
+        statistics_after = holmes_manager.get_match_memo_statistics()
+        doc = holmes_manager.get_document('pets')
+        self.assertEqual(len(matches), 30)
+        self.assertEqual(
+            sorted(match['word_matches'][1]['document_token_index'] for match in matches),
+            [token.i for token in doc if token.text == 'dog'])
+        # Each pair of a search phrase token and a document token is compared at most once.
+        self.assertLessEqual(
+            statistics_after['word_match_misses'] - statistics_before['word_match_misses'],
+            6 * len(doc))
+        self.assertGreater(statistics_after['word_match_hits'],
+            statistics_before['word_match_hits'])
+
+    def test_match_fields(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            "I saw a dog. The big dog chased the cat.", label='pets')
+        holmes_manager.register_search_phrase("A dog chases a cat")
+        full_match_dicts = holmes_manager.match()
+        match_dicts = holmes_manager.match(
+            fields=['sentences_within_document', 'word_matches.document_word'])
+        self.assertEqual(match_dicts, [{
+            'document': 'pets',
+            'sentences_within_document': 'The big dog chased the cat.',
+            'overall_similarity_measure': 1.0,
+            'word_matches': [{'document_word': 'dog'}, {'document_word': 'chase'},
+                {'document_word': 'cat'}]}])
+        self.assertEqual(full_match_dicts[0]['sentences_within_document'],
+            'The big dog chased the cat.')
+        self.assertEqual(
+            holmes_manager.match(fields=['word_matches'])[0]['word_matches'],
+            full_match_dicts[0]['word_matches'])
+        with self.assertRaises(ValueError):
+            holmes_manager.match(fields=['word_matches.sentences_within_document'])
+
+    def test_count_matches_and_any_match(self):
+        self._register_multiple_documents_and_search_phrases()
+        self.assertEqual(holmes_manager.count_matches(), {'pets': 1, 'safari': 1})
+        self.assertEqual(holmes_manager.count_matches("A dog chases a cat"),
+            {'pets': 1})
+        self.assertEqual(holmes_manager.count_matches(
+            document_text="All the time I am testing here, dogs keep on chasing cats."),
+            {'': 1})
+        self.assertTrue(holmes_manager.any_match())
+        self.assertTrue(holmes_manager.any_match("A dog chases a cat"))
+        self.assertFalse(holmes_manager.any_match("A zebra chases a lion"))
+        # Replies that arrive after any_match() has returned do not reach later requests.
+        self.assertTrue(holmes_manager.any_match())
+        self.assertEqual(holmes_manager.count_matches(), {'pets': 1, 'safari': 1})
+
+    def test_iter_matches(self):
+        self._register_multiple_documents_and_search_phrases()
+        holmes_manager.parse_and_register_document(
+            "A dog chased a cat. A dog chased a cat.", label='pets2')
+        match_dicts = holmes_manager.match()
+        self.assertEqual(len(match_dicts), 4)
+        iterated_match_dicts = list(holmes_manager.iter_matches())
+        self.assertEqual([{key: value for key, value in match_dict.items() if key != 'cursor'}
+            for match_dict in iterated_match_dicts], match_dicts)
+        first_page = list(holmes_manager.iter_matches(limit=3))
+        self.assertEqual(first_page, iterated_match_dicts[:3])
+        second_page = list(holmes_manager.iter_matches(limit=3,
+            cursor=first_page[-1]['cursor']))
+        self.assertEqual(second_page, iterated_match_dicts[3:])
+        with self.assertRaises(ValueError):
+            holmes_manager.iter_matches(limit=0)
+
     def test_remove_all_search_phrases(self):
         self._register_multiple_documents_and_search_phrases()
         holmes_manager.remove_all_search_phrases()
@@ -74,6 +328,66 @@ class ManagerTest(unittest.TestCase):
         self.assertEqual(len(matches), 1)
         self.assertEqual(matches[0]['document'], 'pets2')
 
+    def test_remove_documents(self):
+        self._register_multiple_documents_and_search_phrases()
+        holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.", label='pets2')
+        holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.", label='pets3')
+        self.assertEqual(len(holmes_manager.match()), 4)
+        holmes_manager.remove_documents(['pets', 'safari', 'pets3', 'unknown'])
+        self.assertEqual(holmes_manager.list_document_labels(), ['pets2'])
+        matches = holmes_manager.match()
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]['document'], 'pets2')
+
+    def test_parse_and_register_documents(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_documents({
+            'pets': "All the time I am testing here, dogs keep on chasing cats.",
+            'safari': "Everything I know suggests that lions enjoy eating gnu"})
+        holmes_manager.parse_and_register_documents(
+            (label, "Dogs chase cats.") for label in ('pets2', 'pets3', 'pets4'))
+        self.assertEqual(holmes_manager.list_document_labels(),
+            ['pets', 'pets2', 'pets3', 'pets4', 'safari'])
+        # The loads are measured in tokens, like those of documents registered in serialized form.
+        self.assertEqual(holmes_manager.document_labels_to_sizes['pets2'], 4)
+        self.assertEqual(sum(holmes_manager.worker_loads),
+            sum(holmes_manager.document_labels_to_sizes.values()))
+        holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual([match['document'] for match in holmes_manager.match()],
+            ['pets', 'pets2', 'pets3', 'pets4'])
+        self.assertEqual(holmes_manager.get_document('safari')[5]._.holmes.lemma, 'lion')
+        with self.assertRaises(DuplicateDocumentError):
+            holmes_manager.parse_and_register_documents({'pets5': "Dogs chase cats.",
+                'pets': "Dogs chase cats."})
+        self.assertEqual(len(holmes_manager.list_document_labels()), 5)
+
+    def test_register_serialized_documents_with_duplicate_label(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document("Dogs chase cats.", 'pets')
+        frequency_information = holmes_manager.get_corpus_frequency_information()
+        serialized_document = holmes_manager.serialize_document('pets')
+        with self.assertRaises(DuplicateDocumentError):
+            holmes_manager.register_serialized_documents({'pets2': serialized_document,
+                'pets': serialized_document})
+        self.assertEqual(holmes_manager.list_document_labels(), ['pets'])
+        self.assertEqual(holmes_manager.get_corpus_frequency_information(),
+            frequency_information)
+
+    def test_parse_and_register_documents_forgets_failed_batches(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_documents({'pets': "Dogs chase cats.",
+            'too_long': 'a ' * 500001, 'pets2': "Dogs chase cats."}, batch_size=1)
+        self.assertEqual(holmes_manager.list_document_labels(), ['pets', 'pets2'])
+        holmes_manager.parse_and_register_documents({'too_long': "Dogs chase cats."})
+        holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual([match['document'] for match in holmes_manager.match()],
+            ['pets', 'pets2', 'too_long'])
+
     def test_match_search_phrases_against(self):
         self._register_multiple_documents_and_search_phrases()
         self.assertEqual(len(holmes_manager.match(document_text=
@@ -158,4 +472,262 @@ class ManagerTest(unittest.TestCase):
         holmes_manager.register_serialized_document(doc.to_bytes(), 'test')
         matches = holmes_manager.match(search_phrase_text="ENTITYNOUN")
         self.assertEqual(len(matches), 1)
-        self.assertEqual(matches[0]["word_matches"][0]["document_word"], "this is a test")
\ No newline at end of file
+        self.assertEqual(matches[0]["word_matches"][0]["document_word"], "this is a test")
+
+    def test_shared_document_arena(self):
+        arena_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2,
+            use_shared_document_arena=True, arena_document_cache_size=1)
+        arena_holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.", label='pets')
+        arena_holmes_manager.parse_and_register_document(
+            document_text="Everything I know suggests that lions enjoy eating gnu", label='safari')
+        arena_holmes_manager.parse_and_register_document(
+            document_text="Dogs chase cats.", label='pets2')
+        arena_holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual(len(arena_holmes_manager.match()), 2)
+        arena_holmes_manager.remove_document('pets')
+        arena_holmes_manager.parse_and_register_document(
+            document_text="A dog chased a cat.", label='pets3')
+        self.assertEqual([match['document'] for match in arena_holmes_manager.match()],
+            ['pets2', 'pets3'])
+        self.assertEqual(arena_holmes_manager.get_document('safari')[5]._.holmes.lemma,
+            'lion')
+        self.assertEqual(len(arena_holmes_manager.topic_match_documents_against(
+            "A lion eats a gnu")), 1)
+        arena_holmes_manager.remove_all_documents('pets')
+        self.assertEqual(arena_holmes_manager.list_document_labels(), ['safari'])
+
+    def test_shared_document_arena_parse_and_register_documents(self):
+        arena_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2,
+            use_shared_document_arena=True)
+        arena_holmes_manager.parse_and_register_documents({'pets': "Dogs chase cats.",
+            'too_long': 'a ' * 500001, 'pets2': "Dogs chase cats."}, batch_size=1)
+        self.assertEqual(arena_holmes_manager.list_document_labels(), ['pets', 'pets2'])
+        self.assertEqual(arena_holmes_manager.document_labels_to_sizes['pets2'], 4)
+        self.assertEqual(sum(arena_holmes_manager.worker_loads),
+            sum(arena_holmes_manager.document_labels_to_sizes.values()))
+        with self.assertRaises(DuplicateDocumentError):
+            arena_holmes_manager.parse_and_register_documents({'pets3': "Dogs chase cats.",
+                'pets': "Dogs chase cats."})
+        arena_holmes_manager.parse_and_register_documents({'too_long': "Dogs chase cats."})
+        arena_holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual([match['document'] for match in arena_holmes_manager.match()],
+            ['pets', 'pets2', 'too_long'])
+
+    def test_arena_document_dictionary_releases_documents(self):
+        arena = DocumentArena()
+        self.addCleanup(arena.close)
+        documents = ArenaDocumentDictionary(arena.path,
+            lambda serialized_doc: Doc(lg_holmes_manager.nlp.vocab).from_bytes(serialized_doc),
+            1)
+        for label in ('a', 'b', 'c'):
+            serialized_doc = lg_holmes_manager.nlp("Dogs chase cats.").to_bytes()
+            documents.labels_to_locations[label] = arena.store(serialized_doc)
+        first_doc = documents['a']
+        self.assertIs(documents['a'], first_doc)
+        self.assertEqual(documents['b'].text, "Dogs chase cats.")
+        self.assertEqual(documents['c'].text, "Dogs chase cats.")
+        self.assertEqual(list(documents.cached_documents), ['c'])
+        # 'a' is still referred to, so the same object is returned, but 'b' and 'c' have been
+        # released.
+        self.assertIs(documents['a'], first_doc)
+        self.assertEqual(list(documents.live_documents.keys()), ['a'])
+        del first_doc
+        documents['b']
+        self.assertEqual(list(documents.live_documents.keys()), ['b'])
+
+    def test_placement_policy_and_rebalancing(self):
+        placement_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=3,
+            placement_policy=holmes.BalancedPlacementPolicy(label_prefix_separator='/'))
+        placement_holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.",
+            label='pets/1')
+        placement_holmes_manager.parse_and_register_document(
+            document_text="Dogs chase cats.", label='pets/2')
+        placement_holmes_manager.parse_and_register_document(
+            document_text="Everything I know suggests that lions enjoy eating gnu",
+            label='safari/1')
+        self.assertEqual(placement_holmes_manager.document_labels_to_worker_queues['pets/1'],
+            placement_holmes_manager.document_labels_to_worker_queues['pets/2'])
+        self.assertEqual(len(placement_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat", document_label_filter='pets/')), 2)
+        self.assertEqual(len(placement_holmes_manager.topic_match_documents_against(
+            "A lion eats a gnu", document_label_filter='safari/')), 1)
+        self.assertEqual(placement_holmes_manager.rebalance_documents(), 0)
+
+    def test_rebalance_documents(self):
+        rebalancing_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2)
+        for counter in range(4):
+            rebalancing_holmes_manager.parse_and_register_document(
+                document_text=" ".join(("Dogs chase cats.",) * (20 if counter % 2 == 0 else 1)),
+                label=str(counter))
+        rebalancing_holmes_manager.register_search_phrase("A dog chases a cat")
+        frequency_information = rebalancing_holmes_manager.get_corpus_frequency_information()
+        self.assertEqual(rebalancing_holmes_manager.rebalance_documents(), 1)
+        self.assertEqual(rebalancing_holmes_manager.rebalance_documents(), 0)
+        self.assertEqual(len(set(rebalancing_holmes_manager.document_labels_to_worker_queues[label]
+            for label in ('0', '2'))), 2)
+        self.assertEqual(len(rebalancing_holmes_manager.match()), 42)
+        self.assertEqual(rebalancing_holmes_manager.get_corpus_frequency_information(),
+            frequency_information)
+
+    def test_rebalance_documents_restores_failed_moves(self):
+        rebalancing_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2)
+        for counter in range(4):
+            rebalancing_holmes_manager.parse_and_register_document(
+                document_text=" ".join(("Dogs chase cats.",) * (20 if counter % 2 == 0 else 1)),
+                label=str(counter))
+        rebalancing_holmes_manager.register_search_phrase("A dog chases a cat")
+        frequency_information = rebalancing_holmes_manager.get_corpus_frequency_information()
+        worker_loads = list(rebalancing_holmes_manager.worker_loads)
+        source_worker_index = rebalancing_holmes_manager.document_labels_to_worker_queues['0']
+        rebalancing_holmes_manager.worker = FailingRegistrationWorker()
+        rebalancing_holmes_manager.input_queues[1 - source_worker_index].put(
+            (rebalancing_holmes_manager.worker.fail_next_registration, None, -1))
+        self.assertEqual(rebalancing_holmes_manager.rebalance_documents(), 0)
+        self.assertEqual(set(rebalancing_holmes_manager.document_labels_to_worker_queues[label]
+            for label in ('0', '2')), {source_worker_index})
+        self.assertEqual(rebalancing_holmes_manager.worker_loads, worker_loads)
+        self.assertEqual(len(rebalancing_holmes_manager.match()), 42)
+        self.assertEqual(rebalancing_holmes_manager.get_corpus_frequency_information(),
+            frequency_information)
+        self.assertEqual(rebalancing_holmes_manager.rebalance_documents(), 1)
+        self.assertEqual(len(rebalancing_holmes_manager.match()), 42)
+
+    def test_topic_match_cache(self):
+        caching_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2,
+            topic_match_cache_size=2)
+        caching_holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.", label='pets')
+        first_results = caching_holmes_manager.topic_match_documents_against("A dog chases a cat")
+        second_results = caching_holmes_manager.topic_match_documents_against(
+            " A dog  chases a cat")
+        self.assertEqual(first_results, second_results)
+        self.assertIsNot(first_results, second_results)
+        caching_holmes_manager.topic_match_documents_against("A dog chases a cat",
+            number_of_results=1)
+        caching_holmes_manager.topic_match_documents_against("A lion eats a gnu")
+        self.assertEqual(caching_holmes_manager.get_topic_match_cache_statistics(),
+            {'hits': 1, 'misses': 3, 'evictions': 1, 'size': 2, 'maximum_size': 2})
+        caching_holmes_manager.parse_and_register_document(
+            document_text="Everything I know suggests that lions enjoy eating gnu", label='safari')
+        self.assertEqual(len(caching_holmes_manager.topic_match_documents_against(
+            "A lion eats a gnu")), 1)
+        self.assertEqual(caching_holmes_manager.get_topic_match_cache_statistics()['hits'], 1)
+
+    def test_phraselet_match_cache(self):
+        with self.assertRaises(ValueError):
+            holmes.Manager('en_core_web_lg', phraselet_match_cache_size=-1)
+        caching_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=1,
+            phraselet_match_cache_size=100)
+        uncached_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=1)
+        self.assertIsNone(uncached_holmes_manager.get_phraselet_match_cache_statistics())
+        for manager in (caching_holmes_manager, uncached_holmes_manager):
+            manager.parse_and_register_document(
+                document_text="All the time I am testing here, dogs keep on chasing cats.",
+                label='pets')
+        first_results = caching_holmes_manager.topic_match_documents_against("A dog chases a cat")
+        statistics = caching_holmes_manager.get_phraselet_match_cache_statistics()
+        self.assertEqual(len(statistics), 1)
+        self.assertEqual(statistics[0]['hits'], 0)
+        self.assertGreater(statistics[0]['misses'], 0)
+        self.assertEqual(caching_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat"), first_results)
+        self.assertGreater(caching_holmes_manager.get_phraselet_match_cache_statistics()[0]
+            ['hits'], 0)
+        self.assertEqual(caching_holmes_manager.topic_match_documents_against(
+            "A dog chases a mouse"), uncached_holmes_manager.topic_match_documents_against(
+            "A dog chases a mouse"))
+        for manager in (caching_holmes_manager, uncached_holmes_manager):
+            manager.parse_and_register_document(
+                document_text="The dog chased a cat and a mouse.", label='more pets')
+        self.assertGreater(caching_holmes_manager.get_phraselet_match_cache_statistics()[0]
+            ['invalidations'], 0)
+        self.assertEqual(caching_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat"), uncached_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat"))
+        for manager in (caching_holmes_manager, uncached_holmes_manager):
+            manager.remove_document('pets')
+        self.assertEqual(caching_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat"), uncached_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat"))
+
+    def test_relation_index(self):
+        indexing_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2,
+            use_relation_index=True)
+        unindexed_holmes_manager = self._create_manager(
+            'en_core_web_lg', perform_coreference_resolution=False, number_of_workers=2)
+        for manager in (indexing_holmes_manager, unindexed_holmes_manager):
+            manager.parse_and_register_document(
+                document_text="All the time I am testing here, dogs keep on chasing cats.",
+                label='pets')
+            manager.parse_and_register_document(
+                document_text="The cat chased the dog. A dog was chased by a big cat.",
+                label='more pets')
+            manager.parse_and_register_document(
+                document_text="Lions eat gnu. A gnu is eaten by a lion.", label='safari')
+            manager.register_search_phrase("A dog chases a cat")
+            manager.register_search_phrase("A big cat chases a dog")
+            manager.register_search_phrase("A lion eats")
+        self.assertGreater(len(indexing_holmes_manager.match()), 0)
+        self.assertEqual(indexing_holmes_manager.match(), unindexed_holmes_manager.match())
+        self.assertEqual(indexing_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat", word_embedding_match_threshold=1.0,
+            initial_question_word_embedding_match_threshold=1.0),
+            unindexed_holmes_manager.topic_match_documents_against(
+            "A dog chases a cat", word_embedding_match_threshold=1.0,
+            initial_question_word_embedding_match_threshold=1.0))
+        for manager in (indexing_holmes_manager, unindexed_holmes_manager):
+            manager.remove_document('pets')
+        self.assertEqual(indexing_holmes_manager.match(), unindexed_holmes_manager.match())
+        for manager in (indexing_holmes_manager, unindexed_holmes_manager):
+            manager.remove_all_documents()
+            manager.parse_and_register_document(
+                document_text="A dog chased a cat.", label='pets')
+        self.assertGreater(len(indexing_holmes_manager.match()), 0)
+        self.assertEqual(indexing_holmes_manager.match(), unindexed_holmes_manager.match())
+
+    def test_async_manager(self):
+        self._register_multiple_documents_and_search_phrases()
+
+        async def run():
+            match_results, topic_match_results = await asyncio.gather(
+                holmes_manager.aio.match(),
+                holmes_manager.aio.topic_match_documents_against("A dog chases a cat"))
+            self.assertEqual(match_results, holmes_manager.match())
+            self.assertEqual(topic_match_results,
+                holmes_manager.topic_match_documents_against("A dog chases a cat"))
+            task = asyncio.ensure_future(
+                holmes_manager.aio.topic_match_documents_against("A lion eats a gnu"))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await holmes_manager.aio.remove_document('safari')
+            self.assertEqual(holmes_manager.list_document_labels(), ['pets'])
+            self.assertEqual((await holmes_manager.aio.get_document('pets')).text,
+                "All the time I am testing here, dogs keep on chasing cats.")
+            self.assertEqual(len(await holmes_manager.aio.match(
+                document_text="The dog chased the cat")), 1)
+
+        asyncio.run(run())
+
+    def test_reply_queue_timeouts(self):
+        reply_queue = holmes_manager.reply_dispatcher.open_request()
+        with self.assertRaises(Empty):
+            reply_queue.get(0.01)
+
+        async def run():
+            with self.assertRaises(Empty):
+                await reply_queue.get_async(0.01)
+
+        asyncio.run(run())
@@ -2,9 +2,12 @@ import unittest
 import holmes_extractor as holmes
 import os
 from threading import Thread
-from queue import Queue
+from queue import Queue, Empty
+from multiprocessing import Pipe
 from collections import OrderedDict
 from packaging import version
+from holmes_extractor.manager import ReplyDispatcher
+from holmes_extractor.errors import WrongVersionDeserializationError
 
 NUMBER_OF_THREADS = 10
 
@@ -1565,3 +1568,65 @@ class MultithreadingTest(unittest.TestCase):
         dictionary, maximum = manager.get_corpus_frequency_information()
         self.assertEqual(dictionary["irrelevancy"], NUMBER_OF_THREADS)
         self.assertEqual(maximum, NUMBER_OF_THREADS)
+
+    def test_reply_dispatcher_routes_out_of_order_replies(self):
+        connections = [Pipe(duplex=False) for _ in range(2)]
+        reply_dispatcher = ReplyDispatcher(
+            [receiving_connection for receiving_connection, _ in connections]
+        )
+        first_reply_queue = reply_dispatcher.open_request()
+        second_reply_queue = reply_dispatcher.open_request()
+        connections[1][1].send(
+            (second_reply_queue.request_id, "Worker 1", "second", None)
+        )
+        connections[0][1].send(
+            (first_reply_queue.request_id, "Worker 0", "first", None)
+        )
+        connections[0][1].send(
+            (second_reply_queue.request_id, "Worker 0", "third", None)
+        )
+        self.assertEqual(first_reply_queue.get(10), ("Worker 0", "first", None))
+        self.assertEqual(
+            sorted((second_reply_queue.get(10), second_reply_queue.get(10))),
+            [("Worker 0", "third", None), ("Worker 1", "second", None)],
+        )
+        with self.assertRaises(Empty):
+            first_reply_queue.get(0.1)
+        for _, sending_connection in connections:
+            sending_connection.close()
+
+    def test_reply_dispatcher_with_concurrent_callers(self):
+        def wait_for_reply(reply_queue, output_queue):
+            output_queue.put((reply_queue.request_id, reply_queue.get(60)))
+
+        receiving_connection, sending_connection = Pipe(duplex=False)
+        reply_dispatcher = ReplyDispatcher([receiving_connection])
+        output_queue = Queue()
+        reply_queues = [
+            reply_dispatcher.open_request() for _ in range(NUMBER_OF_THREADS)
+        ]
+        for reply_queue in reply_queues:
+            Thread(target=wait_for_reply, args=(reply_queue, output_queue)).start()
+        for reply_queue in reversed(reply_queues):
+            sending_connection.send(
+                (reply_queue.request_id, "Worker 0", reply_queue.request_id, None)
+            )
+        outputs = [output_queue.get(True, 60) for _ in range(NUMBER_OF_THREADS)]
+        self.assertEqual(
+            sorted(outputs),
+            [
+                (reply_queue.request_id, ("Worker 0", reply_queue.request_id, None))
+                for reply_queue in reply_queues
+            ],
+        )
+        sending_connection.close()
+
+    def test_worker_exception_travels_over_reply_connection(self):
+        doc = manager.nlp("People discuss irrelevancies")
+        doc._.holmes_document_info.serialized_document_version = 1
+        expected_matches = manager.match(search_phrase_text="A gnu is chased")
+        with self.assertRaises(WrongVersionDeserializationError):
+            manager.register_serialized_document(doc.to_bytes(), "wrong version")
+        self.assertEqual(
+            manager.match(search_phrase_text="A gnu is chased"), expected_matches
+        )
@@ -755,6 +755,17 @@ class EnglishStructuralMatchingTest(unittest.TestCase):
         self.assertEqual(len(matches), 1)
         self.assertEqual(matches[0]["word_matches"][0]["match_type"], "derivation")
 
+    def test_negation_and_uncertainty_on_single_word(self):
+        matches = self._get_matches(
+            nocoref_holmes_manager, "He did not like music. He liked music or art."
+        )
+        self.assertEqual(len(matches), 2)
+        self.assertTrue(matches[0]["negated"])
+        self.assertFalse(matches[0]["uncertain"])
+        self.assertFalse(matches[1]["negated"])
+        self.assertTrue(matches[1]["uncertain"])
+        self.assertEqual(matches[0]["word_matches"][0]["document_word"], "music")
+
     def test_derivation_in_document_on_single_word_with_ontology(self):
         matches = self._get_matches(nocoref_holmes_manager, "month")
         self.assertEqual(len(matches), 2)
@@ -1069,6 +1080,44 @@ class EnglishStructuralMatchingTest(unittest.TestCase):
         )
         self.assertEqual(maximum, 6)
 
+    def test_corpus_frequency_information_after_documents_removed(self):
+        holmes_manager_with_variable_search_phrases.remove_all_documents()
+        holmes_manager_with_variable_search_phrases.parse_and_register_document(
+            "Yesterday Fido chased Richard Paul Hudson in Prague with Fido and Balu.",
+            "1",
+        )
+        holmes_manager_with_variable_search_phrases.parse_and_register_document(
+            "Yesterday Balu chased Hudson in Munich.", "2"
+        )
+        holmes_manager_with_variable_search_phrases.remove_document("1")
+        (
+            dictionary,
+            maximum,
+        ) = (
+            holmes_manager_with_variable_search_phrases.get_corpus_frequency_information()
+        )
+        self.assertEqual(
+            dictionary,
+            {
+                "ENTITYDATE": 1,
+                "yesterday": 1,
+                "ENTITYPERSON": 2,
+                "chased": 1,
+                "chase": 1,
+                "hudson": 1,
+                "in": 1,
+                "ENTITYGPE": 1,
+                "balu": 1,
+                "munich": 1,
+            },
+        )
+        self.assertEqual(maximum, 2)
+        holmes_manager_with_variable_search_phrases.remove_all_documents()
+        self.assertEqual(
+            holmes_manager_with_variable_search_phrases.get_corpus_frequency_information(),
+            ({}, 0),
+        )
+
     def test_predicative_adjective_in_relative_clause(self):
         matches = self._get_matches(
             nocoref_holmes_manager, "He saw his son, who was excited."
@@ -1,6 +1,7 @@
 import unittest
+import random
 import holmes_extractor as holmes
-from holmes_extractor.topic_matching import TopicMatcher
+from holmes_extractor.topic_matching import TopicMatcher, ActivationScorer
 import os
 
 script_directory = os.path.dirname(os.path.realpath(__file__))
@@ -1275,3 +1276,40 @@ class EnglishTopicMatchingTest(unittest.TestCase):
                 "A dog")
         self.assertEqual(len(topic_match_dictionaries), 1)
         m.close()
+
+    def test_topic_match_documents_against_many(self):
+        ontology_for_sm_tests = holmes.Ontology(os.sep.join((script_directory, 'test_ontology.owl')))
+        m = holmes.Manager('en_core_web_sm', ontology=ontology_for_sm_tests, number_of_workers=2)
+        m.parse_and_register_document("I saw a dog. It was chasing a cat", 'specific')
+        m.parse_and_register_document("The dog chased the animal", 'exact')
+        m.parse_and_register_document("The cat chased the dog", 'specific-reversed')
+        m.parse_and_register_document("The animal chased the dog", 'exact-reversed')
+        texts_to_match = ["A dog chases an animal", "The dog chased the cat", "An animal",
+            "A dog chases an animal", "the"]
+        topic_match_dictss = m.topic_match_documents_against_many(texts_to_match,
+            relation_matching_frequency_threshold=0.2, number_of_results=3)
+        self.assertEqual(len(topic_match_dictss), 5)
+        for text_to_match, topic_match_dicts in zip(texts_to_match, topic_match_dictss):
+            self.assertEqual(topic_match_dicts, m.topic_match_documents_against(text_to_match,
+                relation_matching_frequency_threshold=0.2, number_of_results=3))
+        self.assertEqual(topic_match_dictss[4], [])
+        self.assertEqual(m.topic_match_documents_against_many([]), [])
+        m.close()
+
+    def test_activation_scorer_array_scores_identical_to_iterative_scores(self):
+        random_generator = random.Random(42)
+        for maximum_activation_distance in (1, 5, 75):
+            activation_scorer = ActivationScorer(maximum_activation_distance)
+            for number_of_matches in (0, 10, 200, 2000):
+                positions = sorted(random_generator.randrange(number_of_matches * 10 + 1)
+                    for _ in range(number_of_matches))
+                phraselet_labels = ['phraselet' + str(random_generator.randrange(50))
+                    for _ in range(number_of_matches)]
+                scores = [random_generator.choice((0.0, 5, 10.0, random_generator.random()))
+                    * random_generator.random() for _ in range(number_of_matches)]
+                topic_scores = activation_scorer.get_topic_scores(positions, phraselet_labels,
+                    scores)
+                self.assertEqual(len(topic_scores), number_of_matches)
+                self.assertEqual(repr(topic_scores), repr(
+                    activation_scorer.get_topic_scores_iteratively(positions,
+                    phraselet_labels, scores)))